@@ -0,0 +1,4 @@
+# ===============================================================================
+# Shared search infrastructure for the checkers players.
+# The player packages import the pieces they need from the modules below.
+# ===============================================================================
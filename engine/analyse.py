@@ -0,0 +1,227 @@
+# ===============================================================================
+# Imports
+# ===============================================================================
+import argparse
+import contextlib
+import importlib
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+from checkers.game_state import GameState
+from players.engine.game_record import GameRecordReader, MAGIC, parse_fen, pdn_fen, pdn_move, apply_move, \
+    played_move
+from players.engine.search import ALPHA_BETA, MTDF
+from utils import INFINITY
+
+# ===============================================================================
+# Globals
+# ===============================================================================
+DEFAULT_PLAYER = 'improved_better_h_player'
+DEFAULT_DEPTH = 6
+DEFAULT_WORKERS = os.cpu_count() or 1
+# Time of a position when it is searched to a fixed depth, long enough to never stop the search.
+FIXED_DEPTH_TIME = 24 * 3600
+# The setup time of the players of the workers, they are built once for each color.
+SETUP_TIME = 1
+
+# Settings and players of a worker process, set by init_worker.
+worker_settings = {}
+worker_players = {}
+
+
+# ===============================================================================
+# Positions
+# ===============================================================================
+
+"""
+    Read the positions to analyse from a file: a PDN or text file with a FEN on every line or in FEN tags,
+    or a binary game record, where every position before a move of a game is analysed.
+
+    :return: iterator over (source, board, player, played move or None), where source names the position.
+"""
+
+
+def read_positions(path):
+    with open(path, 'rb') as input_file:
+        binary = input_file.read(len(MAGIC)) == MAGIC
+    if binary:
+        yield from record_positions(path)
+        return
+    with open(path) as input_file:
+        for line_number, line in enumerate(input_file, 1):
+            line = line.strip()
+            if line.startswith('[FEN'):
+                line = line[len('[FEN'):].strip(' ]')
+            elif line.startswith('[') or ':' not in line:
+                continue
+            board, player = parse_fen(line)
+            yield '{}:{}'.format(path, line_number), board, player, None
+
+
+def record_positions(path):
+    with GameRecordReader(path) as reader:
+        for game in reader.games():
+            board = game.start.board
+            for move in game.moves:
+                played = move.origin, move.target, move.jumped
+                yield '{}:{}'.format(game.start.game_id, move.ply), board, move.player, played
+                board = apply_move(board, move.player, played)
+
+
+def new_state(board, player):
+    state = GameState()
+    state.board = dict(board)
+    state.curr_player = player
+    state.turns_since_last_jump = 0
+    return state
+
+
+# ===============================================================================
+# Workers
+# ===============================================================================
+
+def init_worker(player_name, depth, time_per_position, driver):
+    worker_settings.update(player=player_name, depth=depth, time=time_per_position, driver=driver)
+
+
+"""
+    A player of the worker for the color, built on first use and kept for the next positions,
+    so its transposition table and caches stay warm.
+"""
+
+
+def worker_player(color):
+    if color not in worker_players:
+        module = importlib.import_module('players.' + worker_settings['player'])
+        time_per_position = worker_settings['time'] or FIXED_DEPTH_TIME
+        with contextlib.redirect_stdout(io.StringIO()):
+            player = module.Player(SETUP_TIME, color, time_per_position, 1)
+        if not hasattr(player, 'last_search_info'):
+            raise ValueError('{} does not report its search'.format(worker_settings['player']))
+        player.max_depth = None if worker_settings['time'] else worker_settings['depth']
+        player.search_forced_moves = True
+        if worker_settings['driver'] is not None:
+            if not hasattr(player, 'search_driver'):
+                raise ValueError('{} has a single search driver'.format(worker_settings['player']))
+            if worker_settings['driver'] == MTDF and getattr(player, 'transposition_table', None) is None:
+                raise ValueError('{} keeps no transposition table for MTD(f)'.format(worker_settings['player']))
+            player.search_driver = worker_settings['driver']
+        worker_players[color] = player
+    return worker_players[color]
+
+
+def analyse_position(task):
+    index, (source, board, player, played) = task
+    result = {'index': index, 'source': source, 'fen': pdn_fen(board, player)}
+    state = new_state(board, player)
+    moves = state.get_possible_moves()
+    if not moves:
+        result['result'] = 'no moves'
+        return result
+    searcher = worker_player(player)
+    searcher.reset_game()
+    with contextlib.redirect_stdout(io.StringIO()):
+        searcher.get_move(state, moves)
+    info = searcher.last_search_info
+    principal_variation = [pdn_move(played_move(move)) for move in info['principal_variation']]
+    score = info['score']
+    # The framework's INFINITY is a finite number, the search scores a won or lost position with it.
+    decided = bool(info['depth']) and abs(score) >= INFINITY
+    result.update(move=principal_variation[0], score=score if -INFINITY < score < INFINITY else None,
+                  depth=info['depth'], nodes=info['nodes'], principal_variation=principal_variation,
+                  time=round(info['time'], 4))
+    if info.get('zero_window_passes'):
+        result['zero_window_passes'] = info['zero_window_passes']
+    if decided:
+        result['result'] = 'win' if score > 0 else 'loss'
+    if played is not None:
+        result['played'] = pdn_move(played)
+    return result
+
+
+# ===============================================================================
+# Analysis
+# ===============================================================================
+
+"""
+    Count the results already in the output, dropping a last line cut by an interruption.
+
+    :return: the number of positions to skip.
+"""
+
+
+def completed_positions(path):
+    if not os.path.exists(path):
+        return 0
+    with open(path, 'rb+') as output_file:
+        data = output_file.read()
+        complete = data.rfind(b'\n') + 1
+        if complete < len(data):
+            output_file.truncate(complete)
+    return data[:complete].count(b'\n')
+
+
+"""
+    Analyse the positions of the input files in a pool of processes and write a JSON line for each,
+    in the order of the input. When the output already has results the analysis resumes after them.
+
+    Arguments:
+    paths: the input files.
+    output: the output file, None for the standard output.
+    player_name: the player module whose search is used.
+    depth: the depth of the search of every position, when time_per_position is not given.
+    time_per_position: seconds of search for every position.
+    workers: the number of processes.
+    driver: ALPHA_BETA or MTDF, the driver of the iterations of the search, None for the one of the player.
+"""
+
+
+def analyse(paths, output=None, player_name=DEFAULT_PLAYER, depth=DEFAULT_DEPTH, time_per_position=None,
+            workers=DEFAULT_WORKERS, driver=None):
+    skip = completed_positions(output) if output else 0
+    positions = itertools.chain.from_iterable(read_positions(path) for path in paths)
+    tasks = itertools.islice(enumerate(positions), skip, None)
+    output_file = open(output, 'a') if output else sys.stdout
+    context = multiprocessing.get_context('spawn')
+    start = time.time()
+    analysed = 0
+    try:
+        with context.Pool(workers, init_worker, (player_name, depth, time_per_position, driver)) as pool:
+            # imap keeps the order of the input while the workers take the next positions as they finish.
+            for result in pool.imap(analyse_position, tasks):
+                output_file.write(json.dumps(result) + '\n')
+                output_file.flush()
+                analysed += 1
+    finally:
+        if output:
+            output_file.close()
+    elapsed = time.time() - start
+    print('analysed {} positions in {:.1f} seconds, skipped {} done before'.format(analysed, elapsed, skip),
+          file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Analyse checkers positions in parallel.')
+    parser.add_argument('inputs', nargs='+', help='PDN or FEN files, or binary game records')
+    parser.add_argument('--output', default=None, help='JSON lines output, resumed if it exists')
+    parser.add_argument('--player', default=DEFAULT_PLAYER, help='the player module whose search is used')
+    limit = parser.add_mutually_exclusive_group()
+    limit.add_argument('--depth', type=int, default=DEFAULT_DEPTH, help='search every position to this depth')
+    limit.add_argument('--time', type=float, default=None, help='search every position for this many seconds')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--driver', choices=(ALPHA_BETA, MTDF), default=None,
+                        help='the driver of the iterations of the search, the player default if not given')
+    args = parser.parse_args()
+    try:
+        analyse(args.inputs, args.output, args.player, args.depth, args.time, args.workers, args.driver)
+    except KeyboardInterrupt:
+        # The output ends with whole lines, running the same command again resumes.
+        sys.exit(130)
+
+
+if __name__ == '__main__':
+    main()
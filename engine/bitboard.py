@@ -0,0 +1,266 @@
+# ===============================================================================
+# Imports
+# ===============================================================================
+from checkers.consts import EM, PAWN_COLOR, KING_COLOR, OPPONENT_COLOR, MAX_TURNS_NO_JUMP
+from players.engine.search import PROMOTION_ROW
+from players.engine.transposition import move_key, find_move
+
+# ===============================================================================
+# Globals
+# ===============================================================================
+# Square (row, col) is bit row * 8 + col, so a diagonal step is the same shift from every square.
+ALL_SQUARES = (1 << 64) - 1
+COLUMN_0 = sum(1 << (row * 8) for row in range(8))
+COLUMN_1 = COLUMN_0 << 1
+COLUMN_6 = COLUMN_0 << 6
+COLUMN_7 = COLUMN_0 << 7
+# Squares a piece can leave in a direction, by column step: one step for a move, two for a jump.
+STEP_FROM = {-1: ALL_SQUARES & ~COLUMN_0, 1: ALL_SQUARES & ~COLUMN_7}
+JUMP_FROM = {-1: ALL_SQUARES & ~(COLUMN_0 | COLUMN_1), 1: ALL_SQUARES & ~(COLUMN_6 | COLUMN_7)}
+
+# Directions as (row step, col step), pawns only move forward.
+FORWARD = {'r': ((1, -1), (1, 1)), 'b': ((-1, -1), (-1, 1))}
+ALL_DIRECTIONS = ((1, -1), (1, 1), (-1, -1), (-1, 1))
+
+# Packed move: origin in bits 0-5, target in bits 6-11, jumped squares mask from bit 12.
+TARGET_SHIFT = 6
+JUMPED_SHIFT = 12
+SQUARE_MASK = 63
+
+LOCATIONS = [divmod(square, 8) for square in range(64)]
+
+
+def jump_table(direction):
+    row_step, col_step = direction
+    table = {}
+    for row in range(8):
+        for col in range(8):
+            if 0 <= row + 2 * row_step < 8 and 0 <= col + 2 * col_step < 8:
+                table[row * 8 + col] = ((row + row_step) * 8 + col + col_step,
+                                        (row + 2 * row_step) * 8 + col + 2 * col_step)
+    return table
+
+
+# For every direction and square: the square jumped over and the landing square.
+JUMPS = {direction: jump_table(direction) for direction in ALL_DIRECTIONS}
+
+
+# ===============================================================================
+# Helpers
+# ===============================================================================
+
+def shift(mask, amount):
+    return mask << amount if amount > 0 else mask >> -amount
+
+
+"""
+    :return: iterator over the squares of the set bits of a mask.
+"""
+
+
+def squares(mask):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class PackedMove(int):
+    """
+        A move packed in an int, with the attributes of a framework move computed when they are read.
+    """
+
+    __slots__ = ()
+
+    @property
+    def origin_loc(self):
+        return LOCATIONS[self & SQUARE_MASK]
+
+    @property
+    def target_loc(self):
+        return LOCATIONS[self >> TARGET_SHIFT & SQUARE_MASK]
+
+    @property
+    def jumped_locs(self):
+        return [LOCATIONS[square] for square in squares(self >> JUMPED_SHIFT)]
+
+    def __repr__(self):
+        return '{}->{} x{}'.format(self.origin_loc, self.target_loc, self.jumped_locs)
+
+
+def pack_move(origin, target, jumped):
+    return PackedMove(origin | target << TARGET_SHIFT | jumped << JUMPED_SHIFT)
+
+
+# ===============================================================================
+# Bitboard state
+# ===============================================================================
+
+class BitboardState:
+    """
+        A game state kept as bit masks of the red pieces, black pieces and kings, for the search.
+        It has the interface of the framework state that the search uses: get_possible_moves returns
+        PackedMove objects, perform_move plays them, and a copy only copies a few ints.
+        board is built from the masks when it is read, once for every position, with the same
+        squares as the board of the framework state it was made from.
+
+        The moves follow the rules of the framework: jumps are forced, pawns move and jump forward,
+        a jump continues while it can and ends when a pawn is crowned, and there are no moves once
+        MAX_TURNS_NO_JUMP turns passed without a jump.
+    """
+
+    __slots__ = ('pieces', 'kings', 'curr_player', 'turns_since_last_jump', 'empty_board', 'squares_mask',
+                 'cached_board')
+
+    def __init__(self, pieces, kings, curr_player, turns_since_last_jump, empty_board, squares_mask):
+        # Masks of the pieces of every color.
+        self.pieces = pieces
+        self.kings = kings
+        self.curr_player = curr_player
+        self.turns_since_last_jump = turns_since_last_jump
+        self.empty_board = empty_board
+        self.squares_mask = squares_mask
+        self.cached_board = None
+
+    @classmethod
+    def from_state(cls, game_state):
+        pieces = {'r': 0, 'b': 0}
+        kings = 0
+        for (row, col), value in game_state.board.items():
+            bit = 1 << (row * 8 + col)
+            for color in pieces:
+                if value == PAWN_COLOR[color] or value == KING_COLOR[color]:
+                    pieces[color] |= bit
+            if value == KING_COLOR['r'] or value == KING_COLOR['b']:
+                kings |= bit
+        empty_board = dict.fromkeys(game_state.board, EM)
+        squares_mask = sum(1 << (row * 8 + col) for row, col in game_state.board)
+        return cls(pieces, kings, game_state.curr_player, game_state.turns_since_last_jump, empty_board,
+                   squares_mask)
+
+    @property
+    def board(self):
+        if self.cached_board is None:
+            board = self.empty_board.copy()
+            for color, mask in self.pieces.items():
+                for square in squares(mask):
+                    board[LOCATIONS[square]] = KING_COLOR[color] if self.kings >> square & 1 else PAWN_COLOR[color]
+            self.cached_board = board
+        return self.cached_board
+
+    def __deepcopy__(self, memo):
+        # The board of a position is never changed in place, the copy can share it.
+        state = BitboardState(dict(self.pieces), self.kings, self.curr_player, self.turns_since_last_jump,
+                              self.empty_board, self.squares_mask)
+        state.cached_board = self.cached_board
+        return state
+
+    __copy__ = __deepcopy__
+
+    def get_possible_moves(self):
+        if self.turns_since_last_jump >= MAX_TURNS_NO_JUMP:
+            return []
+        color = self.curr_player
+        own = self.pieces[color]
+        opponent = self.pieces[OPPONENT_COLOR[color]]
+        empty = self.squares_mask & ~(own | opponent)
+        pawns, kings = own & ~self.kings, own & self.kings
+
+        jumps = []
+        for mask, directions, pawn in ((pawns, FORWARD[color], True), (kings, ALL_DIRECTIONS, False)):
+            jumpers = 0
+            for row_step, col_step in directions:
+                step = row_step * 8 + col_step
+                jumpers |= mask & JUMP_FROM[col_step] & shift(opponent, -step) & shift(empty, -2 * step)
+            for origin in squares(jumpers):
+                self.jump_chains(origin, directions, pawn, opponent, empty | 1 << origin, jumps)
+        if jumps:
+            # Chains that jump the same pieces along different paths are the same move.
+            return list(dict.fromkeys(jumps))
+
+        moves = []
+        for mask, directions in ((pawns, FORWARD[color]), (kings, ALL_DIRECTIONS)):
+            for row_step, col_step in directions:
+                step = row_step * 8 + col_step
+                for target in squares(shift(mask & STEP_FROM[col_step], step) & empty):
+                    moves.append(pack_move(target - step, target, 0))
+        return moves
+
+    """
+        Follow every jump chain of a piece through the jump tables.
+
+        Arguments:
+        origin: the square the piece starts from.
+        directions: the directions the piece jumps in.
+        pawn: True for a pawn, whose chain ends when it reaches the promotion row.
+        opponent: the pieces that can be jumped.
+        empty: the empty squares, with the origin of the piece.
+        moves: the list the chains are added to.
+    """
+
+    def jump_chains(self, origin, directions, pawn, opponent, empty, moves):
+        promotion_row = PROMOTION_ROW[PAWN_COLOR[self.curr_player]]
+        chains = [(origin, 0)]
+        while chains:
+            square, jumped = chains.pop()
+            extended = False
+            for direction in directions:
+                jump = JUMPS[direction].get(square)
+                if jump is None:
+                    continue
+                over, landing = jump
+                if opponent >> over & 1 and not jumped >> over & 1 and empty >> landing & 1:
+                    extended = True
+                    if pawn and landing >> 3 == promotion_row:
+                        moves.append(pack_move(origin, landing, jumped | 1 << over))
+                    else:
+                        chains.append((landing, jumped | 1 << over))
+            if not extended and jumped:
+                moves.append(pack_move(origin, square, jumped))
+
+    def perform_move(self, move):
+        color = self.curr_player
+        opponent_color = OPPONENT_COLOR[color]
+        origin = move & SQUARE_MASK
+        target = move >> TARGET_SHIFT & SQUARE_MASK
+        jumped = move >> JUMPED_SHIFT
+        king = self.kings >> origin & 1 or target >> 3 == PROMOTION_ROW[PAWN_COLOR[color]]
+        self.pieces[color] = self.pieces[color] & ~(1 << origin) | 1 << target
+        self.pieces[opponent_color] &= ~jumped
+        self.kings &= ~(jumped | 1 << origin)
+        if king:
+            self.kings |= 1 << target
+        self.turns_since_last_jump = 0 if jumped else self.turns_since_last_jump + 1
+        self.curr_player = opponent_color
+        self.cached_board = None
+
+
+# ===============================================================================
+# Root
+# ===============================================================================
+
+"""
+    The state to search from. The bitboard generator is only used when it finds exactly the moves of the
+    framework in the root position, otherwise the framework state is searched.
+
+    :return: a BitboardState, or game_state itself.
+"""
+
+
+def search_state(game_state, possible_moves):
+    state = BitboardState.from_state(game_state)
+    if {move_key(move) for move in state.get_possible_moves()} != {move_key(move) for move in possible_moves}:
+        print('the bitboard moves differ from the framework moves, searching the framework state')
+        return game_state
+    return state
+
+
+"""
+    :return: the framework move for a move the search chose, None if there is no such move.
+"""
+
+
+def root_move(move, possible_moves):
+    if isinstance(move, PackedMove):
+        return find_move(possible_moves, move_key(move))
+    return move
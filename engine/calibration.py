@@ -0,0 +1,127 @@
+# ===============================================================================
+# Imports
+# ===============================================================================
+import copy
+import time
+from utils import run_with_limited_time, ExceededTimeError
+from checkers.game_state import GameState
+
+# ===============================================================================
+# Globals
+# ===============================================================================
+# Part of the setup time that the benchmark may use, and an upper limit for it in seconds.
+SETUP_TIME_FRACTION = 0.25
+MAX_BENCHMARK_TIME = 0.2
+OVERHEAD_SAMPLES = 5
+# The safety margin is the worst measured overhead times SAFETY_FACTOR, and never less than MIN_SAFETY_MARGIN.
+SAFETY_FACTOR = 3
+MIN_SAFETY_MARGIN = 0.005
+# Weight of a new measurement of the search speed against the previous estimate.
+SPEED_SMOOTHING = 0.3
+# The overhead of run_with_limited_time is measured again every RECALIBRATION_MOVES moves.
+RECALIBRATION_MOVES = 10
+# Ratio between the nodes of two consecutive depths, until the search measured it, and the range of a measurement.
+DEFAULT_BRANCHING_FACTOR = 3
+MIN_BRANCHING_FACTOR = 2
+MAX_BRANCHING_FACTOR = 8
+
+
+def _noop():
+    return None
+
+
+# ===============================================================================
+# Calibration
+# ===============================================================================
+
+class Calibration:
+    """
+        How fast this host searches, measured when the player is built and refreshed during the game.
+
+        nodes_per_second starts from a benchmark of copying a state and evaluating it on the
+        opening position, which is what every node of the search pays for, and is then corrected
+        by the speed of the real searches.
+        safety_margin is the time kept aside for every move so that the overhead of
+        run_with_limited_time never makes the player exceed its time.
+
+        Arguments:
+        evaluate: the function the search calls on its leaves, usually the utility of the player.
+                  It is given a game state, so it may also generate moves.
+        setup_time: the setup time of the player, the benchmark uses a small part of it.
+    """
+
+    def __init__(self, evaluate, setup_time):
+        self.evaluate = evaluate
+        self.nodes_per_second = None
+        self.overhead = 0
+        self.safety_margin = MIN_SAFETY_MARGIN
+        self.branching_factor = DEFAULT_BRANCHING_FACTOR
+        self.moves = 0
+        self.benchmark(min(MAX_BENCHMARK_TIME, SETUP_TIME_FRACTION * setup_time))
+        self.measure_overhead()
+
+    """
+        Run the evaluation and a state copy on the opening position for the given time.
+    """
+
+    def benchmark(self, benchmark_time):
+        state = GameState()
+        nodes = 0
+        start = time.process_time()
+        while True:
+            self.evaluate(copy.deepcopy(state))
+            nodes += 1
+            elapsed = time.process_time() - start
+            if elapsed >= benchmark_time:
+                break
+        self.nodes_per_second = nodes / max(elapsed, 1e-6)
+
+    """
+        Time run_with_limited_time around a function that does nothing, and set the safety margin
+        from the worst of a few calls.
+    """
+
+    def measure_overhead(self):
+        worst = 0
+        for _ in range(OVERHEAD_SAMPLES):
+            start = time.process_time()
+            try:
+                run_with_limited_time(_noop, (), {}, 1)
+            except ExceededTimeError:
+                pass
+            worst = max(worst, time.process_time() - start)
+        self.overhead = worst
+        self.safety_margin = max(MIN_SAFETY_MARGIN, SAFETY_FACTOR * worst)
+
+    """
+        Correct the estimates after a search of the game.
+
+        Arguments:
+        nodes: the number of nodes the search visited.
+        seconds: the time it took.
+        branching_factor: the measured ratio between the nodes of two consecutive depths searched from scratch,
+                          or None. It is clamped to [MIN_BRANCHING_FACTOR, MAX_BRANCHING_FACTOR].
+    """
+
+    def update(self, nodes, seconds, branching_factor=None):
+        self.moves += 1
+        if nodes > 0 and seconds > 0:
+            speed = nodes / seconds
+            self.nodes_per_second += SPEED_SMOOTHING * (speed - self.nodes_per_second)
+        if branching_factor is not None:
+            branching_factor = min(MAX_BRANCHING_FACTOR, max(MIN_BRANCHING_FACTOR, branching_factor))
+            self.branching_factor += SPEED_SMOOTHING * (branching_factor - self.branching_factor)
+        if self.moves % RECALIBRATION_MOVES == 0:
+            self.measure_overhead()
+
+    """
+        Predict the time of the next iteration of the iterative deepening.
+
+        Arguments:
+        last_iteration_nodes: the nodes of the last completed iteration.
+
+        :return: the predicted time in seconds.
+    """
+
+    def predict_time(self, last_iteration_nodes):
+        return last_iteration_nodes * self.branching_factor / self.nodes_per_second
@@ -0,0 +1,410 @@
+# ===============================================================================
+# Imports
+# ===============================================================================
+import copy
+import math
+import time
+import weakref
+from utils import INFINITY, run_with_limited_time, ExceededTimeError
+from checkers.consts import EM
+from players.engine.search import AlphaBetaSearch, is_reversible, ALPHA_BETA, MTDF
+from players.engine.keys import position_key
+from players.engine.transposition import find_move
+from players.engine.calibration import Calibration
+from players.engine.game_record import GameLogger
+from players.engine.memory import process_budget, TABLE
+from players.engine.round_planner import RoundPlanner, turn_weight
+from players.engine.bitboard import search_state, root_move
+
+# ===============================================================================
+# Globals
+# ===============================================================================
+# Search features, switched off to compare against the plain alpha-beta search.
+PRINCIPAL_VARIATION_SEARCH = True
+LATE_MOVE_REDUCTIONS = True
+# Generate the moves of the search with bitboards instead of the framework game state.
+BITBOARD_MOVES = True
+# Part of the time for the move after which the search is no longer extended beyond the horizon.
+SELECTIVE_DEEPENING_TIME = 0.8
+# Part of the time for the move that must be left to always start the next depth, whatever its predicted time.
+NEXT_DEPTH_TIME = 0.5
+
+
+# ===============================================================================
+# Iterative deepening player
+# ===============================================================================
+
+class DeepeningPlayer:
+    """
+        The iterative deepening search and the time management that the searching players share.
+        A player inherits from it and from engine.heuristic.Heuristic before players.simple_player.Player,
+        and is only a configuration: its utility, whether it keeps a transposition table between
+        moves, and the driver of the iterations. init_search is called at the end of its __init__,
+        once the utility can be called.
+
+        Without a transposition table the search keeps nothing between moves, so it neither resumes
+        the search of the expected position nor saves anything at the end of a game.
+    """
+
+    """
+        Arguments:
+        name: the name of the player in the game records.
+        setup_time: the setup time of the player, the calibration uses a small part of it.
+        search_utility: the function the search calls on its leaves, the utility or a cache of it.
+        transposition_table: the table kept between moves, None for none.
+        search_driver: ALPHA_BETA or MTDF, MTD(f) is only worth it with a transposition table.
+    """
+
+    def init_search(self, name, setup_time, search_utility, transposition_table=None, search_driver=ALPHA_BETA):
+        self.search_utility = search_utility
+        # Positions played since the last jump, used by the search to detect repetitions.
+        self.game_history = []
+        self.last_turns_since_last_jump = 0
+        self.last_pieces = 0
+        # Search results kept between moves, and the position we expect to see on our next move
+        # together with the depth its subtree was already searched to.
+        self.transposition_table = transposition_table
+        self.expected_key = None
+        self.proven_depth = 0
+        self.reuse_stats = {'searches': 0, 'reused': 0, 'saved_iterations': 0}
+        # The move lists of the search and the table share the memory budget of the process
+        # with the other players in it.
+        self.memory_budget = process_budget()
+        if transposition_table is not None:
+            self.memory_budget.add(transposition_table, TABLE)
+            # The results of a game are saved by game_over, or when the player is collected or the process exits.
+            self.save_results = weakref.finalize(self, transposition_table.save)
+        # Shares the time of every round between its turns.
+        self.round_planner = RoundPlanner()
+        # Speed of this host, used for the safety margin and to predict the time of the next depth.
+        self.calibration = Calibration(self.utility, setup_time)
+        # Binary record of our games, when AI2_GAME_RECORD names a record file.
+        self.game_logger = GameLogger.from_environment(name, self.color, self.time_per_k_turns, self.k)
+        # Settings of the batch analyser: the deepest iteration of the search, None for no limit,
+        # and whether positions with a single move or a jump are searched instead of played at once.
+        self.max_depth = None
+        self.search_forced_moves = False
+        self.search_driver = search_driver
+        # move, score, depth, nodes, principal variation and time of the last get_move.
+        self.last_search_info = None
+
+    """
+              Choose the best next move for the player and set the time to
+              choose the next best move according to different criteria.
+
+              Arguments:
+              game_state: current game state which include board state, palyer color and number of turns since last jump.
+              possible_moves: empty dictionary.
+
+              :return: the best next move
+       """
+
+    def get_move(self, game_state, possible_moves):
+        self.clock = time.process_time()
+        self.update_game_history(game_state)
+        self.time_for_current_move = self.time_for_state(game_state, possible_moves)
+        self.memory_budget.new_move()
+        if self.transposition_table is not None:
+            self.transposition_table.new_move()
+        if len(possible_moves) == 1 and not self.search_forced_moves:
+            self.record_move(game_state, possible_moves[0])
+            self.end_turn()
+            return possible_moves[0]
+
+        prev_alpha = -INFINITY
+
+        # Choosing an arbitrary move in case Minimax does not return an answer:
+        best_move = possible_moves[0]
+
+        # Initialize Minimax algorithm, still not running anything
+        minimax = AlphaBetaSearch(self.search_utility, self.color, self.no_more_time,
+                                  self.selective_deepening_criterion, self.game_history,
+                                  principal_variation=PRINCIPAL_VARIATION_SEARCH,
+                                  late_move_reductions=LATE_MOVE_REDUCTIONS,
+                                  is_tactical=self.is_tactical,
+                                  transposition_table=self.transposition_table,
+                                  memory_budget=self.memory_budget)
+
+        # We will return the move that yields the most jumps and we will not
+        # perform a minmax search, thus saving search time.
+        max_jump = 0
+        jump_move = None
+        for move in possible_moves:
+            if len(move.jumped_locs) > max_jump:
+                jump_move = move
+                max_jump = len(move.jumped_locs)
+        if max_jump > 0 and not self.search_forced_moves:
+            best_move = jump_move
+            self.record_move(game_state, best_move)
+            self.end_turn()
+            return best_move
+
+        # When the opponent played the reply we expected, the subtree of this position was already
+        # searched on the previous move. Depth 1 is still searched first, so a move is proven
+        # within this move even if the time runs out, and then the iterative deepening resumes
+        # from the depth of the previous search.
+        resumed_depth = self.resume_depth(game_state)
+        current_depth = 1
+        # The depths the table already holds for this position are served from it and are not searched from scratch.
+        table_depth = 0
+        if self.transposition_table is not None:
+            entry = self.transposition_table.lookup(game_state)
+            if entry is not None:
+                best_move = find_move(possible_moves, entry[3]) or best_move
+                table_depth = entry[0]
+        completed_depth = 0
+        iteration_nodes = 0
+        branching_factor = None
+        search_start = time.process_time()
+
+        # The search plays on bitboards and its moves are turned into framework moves here.
+        root_state = search_state(game_state, possible_moves) if BITBOARD_MOVES else game_state
+        # The best move of the last completed iteration, as a move of root_state.
+        search_move = None
+        # The move the table proved for this position on the previous move, depth 1 replaces it in the table.
+        proven_move = minimax.table_move(root_state)
+
+        # Iterative deepening until the time runs out.
+        while True:
+            print('going to depth: {}, remaining time: {}, prev_alpha: {}, best_move: {}, nodes: {}'.format(
+                current_depth,
+                self.time_for_current_move - (time.process_time() - self.clock),
+                prev_alpha,
+                best_move,
+                minimax.nodes))
+
+            nodes_before = minimax.nodes
+            if self.search_driver == MTDF:
+                driver, arguments = minimax.mtdf, (root_state, current_depth, prev_alpha, search_move)
+            else:
+                driver, arguments = minimax.search, (root_state, current_depth, -INFINITY, INFINITY, True)
+            try:
+                (alpha, move), run_time = run_with_limited_time(
+                    driver, arguments, {}, self.time_for_current_move - (time.process_time() - self.clock))
+            except (ExceededTimeError, MemoryError):
+                print('no more time, achieved depth {}'.format(current_depth))
+                break
+
+            if self.memory_budget.exhausted:
+                print('memory budget reached, achieved depth {}'.format(current_depth - 1))
+                break
+
+            if self.no_more_time():
+                print('no more time')
+                break
+
+            prev_alpha = alpha
+            search_move = move if move is not None else search_move
+            best_move = root_move(move, possible_moves) or best_move
+            # Only consecutive depths searched from scratch measure the branching factor, not a resumed depth
+            # or one served from the table.
+            iteration_nodes, prev_iteration_nodes = minimax.nodes - nodes_before, iteration_nodes
+            if current_depth <= table_depth or current_depth != completed_depth + 1:
+                iteration_nodes = 0
+            elif prev_iteration_nodes:
+                branching_factor = iteration_nodes / prev_iteration_nodes
+            completed_depth = current_depth
+
+            if alpha == INFINITY:
+                print('the move: {} will guarantee victory.'.format(best_move))
+                break
+
+            if alpha == -INFINITY:
+                print('all is lost')
+                break
+
+            if self.max_depth is not None and current_depth >= self.max_depth:
+                break
+
+            # Don't start a depth that the measured speed of this host says can't be completed,
+            # unless most of the time for the move is left.
+            remaining_time = self.time_for_current_move - (time.process_time() - self.clock)
+            if remaining_time < NEXT_DEPTH_TIME * self.time_for_current_move and \
+                    self.calibration.predict_time(minimax.nodes - nodes_before) > remaining_time:
+                print('not enough time for depth {}'.format(current_depth + 1))
+                break
+
+            if resumed_depth > current_depth + 1:
+                # If the resumed depth runs out of time, the move proven to the depth it resumes from
+                # is played, not the move of depth 1.
+                search_move = proven_move or search_move
+                best_move = root_move(proven_move, possible_moves) or best_move
+            current_depth = max(current_depth + 1, resumed_depth)
+
+        self.calibration.update(minimax.nodes, time.process_time() - search_start, branching_factor)
+        if self.memory_budget.diagnostic:
+            self.memory_budget.report()
+
+        next_state = copy.deepcopy(game_state)
+        next_state.perform_move(best_move)
+        if is_reversible(game_state, best_move):
+            self.game_history.append(position_key(next_state))
+        self.expect_reply(minimax, next_state, completed_depth)
+        if self.transposition_table is not None:
+            print('reused the search tree in {} of {} searches, saving {} iterations'.format(
+                self.reuse_stats['reused'], self.reuse_stats['searches'], self.reuse_stats['saved_iterations']))
+        if self.search_driver == MTDF:
+            print('{} zero-window searches'.format(minimax.zero_window_passes))
+        # Following the line through the table costs a copy of the state per move, only the analyser reads it.
+        principal_variation = None
+        if self.max_depth is not None or self.search_forced_moves:
+            principal_variation = [best_move] + minimax.principal_variation_moves(next_state, completed_depth - 1)
+        self.record_move(game_state, best_move, completed_depth, prev_alpha, minimax.nodes, principal_variation,
+                         minimax.zero_window_passes)
+
+        self.end_turn()
+        return best_move
+
+    """
+            Count the turn in the round, a new round starts after the last one.
+    """
+
+    def end_turn(self):
+        if self.turns_remaining_in_round == 1:
+            self.turns_remaining_in_round = self.k
+            self.time_remaining_in_round = self.time_per_k_turns
+        else:
+            self.turns_remaining_in_round -= 1
+            self.time_remaining_in_round -= (time.process_time() - self.clock)
+
+    """
+            Keep the result of the search in last_search_info, and write the move to the game record
+            with the time spent on it so far.
+
+            Arguments:
+            depth: the depth the search completed, None if the move was not searched.
+            score: the value the search found for the move.
+            nodes: the number of nodes searched.
+            principal_variation: the moves the search expects, starting with move, None for move alone.
+            zero_window_passes: the number of zero-window searches of the MTDF driver.
+    """
+
+    def record_move(self, game_state, move, depth=None, score=math.nan, nodes=0, principal_variation=None,
+                    zero_window_passes=0):
+        time_spent = time.process_time() - self.clock
+        self.last_search_info = {'move': move, 'score': score, 'depth': depth, 'nodes': nodes,
+                                 'principal_variation': principal_variation or [move], 'time': time_spent,
+                                 'zero_window_passes': zero_window_passes}
+        if self.game_logger is not None:
+            self.game_logger.record(game_state, move, time_spent, depth, score)
+
+    """
+            Save what was learnt in the game to the persistent store.
+            The framework does not tell the player that the game ended, so this is called by the harnesses
+            that know when their games end, outside the clock of the moves, and otherwise when the player
+            is collected or the process exits. Writing the store takes longer than a move may.
+    """
+
+    def game_over(self):
+        if self.transposition_table is None:
+            return
+        self.save_results()
+        self.save_results = weakref.finalize(self, self.transposition_table.save)
+
+    """
+            Forget the game played so far, for a player that is given unrelated positions.
+    """
+
+    def reset_game(self):
+        self.game_history = []
+        self.last_turns_since_last_jump = 0
+        self.last_pieces = 0
+        self.expected_key = None
+        self.proven_depth = 0
+
+    """
+            Choose the depth the iterative deepening starts from.
+            If the position is the one expected after our previous move and the reply the search
+            predicted for the opponent, it was already searched to proven_depth.
+
+            Arguments:
+            game_state: current game state which include board state, palyer color and number of turns since last jump.
+
+            :return: the depth to search after depth 1.
+    """
+
+    def resume_depth(self, game_state):
+        self.reuse_stats['searches'] += 1
+        if self.expected_key is None or self.proven_depth < 3 or position_key(game_state) != self.expected_key:
+            return 2
+        self.reuse_stats['reused'] += 1
+        self.reuse_stats['saved_iterations'] += self.proven_depth - 2
+        return self.proven_depth
+
+    """
+            Remember the position expected on our next move: the one after the reply of the
+            opponent on the principal variation. Its subtree was searched 2 plies shallower
+            than the depth the move was chosen with.
+
+            Arguments:
+            minimax: the search used to choose the move.
+            next_state: the state after our move.
+            completed_depth: the deepest search that was completed for the move.
+    """
+
+    def expect_reply(self, minimax, next_state, completed_depth):
+        self.expected_key = None
+        self.proven_depth = completed_depth - 2
+        reply = minimax.principal_variation_moves(next_state, 1)
+        if reply:
+            expected_state = copy.deepcopy(next_state)
+            expected_state.perform_move(reply[0])
+            self.expected_key = position_key(expected_state)
+
+    """
+            Keep the positions of the game since the last jump.
+            A jump can never be undone, so when the number of turns since last jump goes down
+            the earlier positions can't appear again and are forgotten.
+            A position that can't follow the previous one starts a new game. Its results stay in the
+            transposition table and are saved by game_over.
+
+            Arguments:
+            game_state: current game state which include board state, palyer color and number of turns since last jump.
+    """
+
+    def update_game_history(self, game_state):
+        # Pieces are never added during a game, and the number of turns since last jump only goes
+        # down with a jump, which takes a piece.
+        pieces = sum(1 for value in game_state.board.values() if value != EM)
+        if pieces > self.last_pieces or game_state.turns_since_last_jump < self.last_turns_since_last_jump:
+            self.game_history = []
+        self.last_turns_since_last_jump = game_state.turns_since_last_jump
+        self.last_pieces = pieces
+        self.game_history.append(position_key(game_state))
+
+    """
+            Calculating the time for choosing the next move.
+            The round planner shares the time left in the round between the turns left in it,
+            by the weight of this turn and the weights it expects for the next ones.
+            A move that is played without a search gets no weight, its time goes to the other turns.
+
+            Arguments:
+            game_state: current game state which include board state, palyer color and number of turns since last jump.
+            possible_moves: the moves of the player.
+
+            :return: time to choose the next move.
+    """
+
+    def time_for_state(self, game_state, possible_moves):
+        forced = len(possible_moves) == 1 or (not self.search_forced_moves and
+                                                  any(move.jumped_locs for move in possible_moves))
+        weight = 0.0 if forced else turn_weight(self.threat_weight(game_state), len(possible_moves))
+        return self.round_planner.time_for_turn(weight, self.turns_remaining_in_round, self.time_remaining_in_round,
+                                                self.calibration.safety_margin)
+
+    """
+            Extend the search beyond the horizon in tactical positions, where a piece is vulnerable
+            or can be rescued, and where a pawn is about to become a king.
+            Nothing is extended once SELECTIVE_DEEPENING_TIME of the time for the move was used,
+            so the extensions never make the player miss the deadline.
+
+            Arguments:
+            state: the position at the horizon.
+
+            :return: True if the search should continue from this position.
+    """
+
+    def selective_deepening_criterion(self, state):
+        if time.process_time() - self.clock >= SELECTIVE_DEEPENING_TIME * self.time_for_current_move:
+            return False
+        return self.is_tactical(state) or self.promotion_imminent(state)
@@ -0,0 +1,320 @@
+# ===============================================================================
+# Imports
+# ===============================================================================
+import argparse
+import contextlib
+import copy
+import importlib
+import io
+import json
+import math
+import multiprocessing
+import os
+import platform
+import random
+import sys
+import time
+from collections import defaultdict
+from checkers.consts import EM, PAWN_COLOR, KING_COLOR
+from checkers.game_state import GameState
+from players.engine.game_record import pdn_fen
+from players.engine.persistent_store import STORE_DIR
+from players.engine.reference import ReferencePlayer, ReferenceThreatPlayer
+
+# ===============================================================================
+# Globals
+# ===============================================================================
+# Frozen copies of the evaluator of better_h_player and of the threat detection of improved_player,
+# the players themselves share engine.heuristic and would only be checked against themselves.
+REFERENCE_PLAYER = ReferencePlayer
+REFERENCE_THREAT_PLAYER = ReferenceThreatPlayer
+# Name of the reference in the speed baseline.
+REFERENCE_NAME = 'reference'
+# Evaluators checked against the reference, by player module.
+BACKENDS = ['better_h_player', 'improved_better_h_player']
+
+# Features of the utility, each returns the values of the player and of the rival.
+FEATURES = ['pawns_utility', 'kings_utility', 'last_row', 'center_board', 'middle_rows_not_center',
+            'protected_player', 'vulnerable_player']
+# Helpers that count pieces by type into the dictionary they are given.
+THREAT_HELPERS = ['center_pieces', 'can_be_rescued_black', 'can_be_rescued_red', 'vulnerable_black_pawn',
+                  'vulnerable_red_pawn']
+# Threat functions of a state that must give the result of the threat reference.
+THREAT_FUNCTIONS = ['threat_weight', 'is_tactical']
+# Functions of a state that must give the utility of the reference.
+EVALUATORS = ['utility', 'evaluation_cache']
+
+TOLERANCE = 1e-9
+DEFAULT_POSITIONS = 1000000
+# A random game is cut after this many plies, most games end or draw before.
+MAX_PLAYOUT_PLIES = 200
+# Positions given to a worker at a time.
+CHUNK_SIZE = 1000
+# Mismatches reported for every backend and check.
+MAX_REPORTED = 5
+# The speed of a backend may be this much below its baseline before the gate fails, for the noise of timing.
+SPEED_TOLERANCE = 0.1
+BENCHMARK_POSITIONS = 20000
+# The baseline keeps the speeds of every host apart, the speed measured on one machine says nothing of another.
+DEFAULT_BASELINE = os.path.join(STORE_DIR, 'evaluation_baseline.json')
+HOST = platform.node() or 'unknown'
+
+# Players of a worker process, by module and color.
+worker_players = {}
+
+
+# ===============================================================================
+# Positions
+# ===============================================================================
+
+def new_state(board, player):
+    state = GameState()
+    state.board = board
+    state.curr_player = player
+    return state
+
+
+"""
+    Play random legal games from the opening and take every position of them, the last one of a
+    finished game included, so the positions are the ones the players meet in their games.
+
+    :return: iterator over count game states.
+"""
+
+
+def random_positions(rng, count):
+    produced = 0
+    while produced < count:
+        state = GameState()
+        for _ in range(MAX_PLAYOUT_PLIES):
+            if produced == count:
+                return
+            yield state
+            produced += 1
+            moves = state.get_possible_moves()
+            if not moves:
+                break
+            state = copy.deepcopy(state)
+            state.perform_move(rng.choice(moves))
+
+
+# ===============================================================================
+# Checks
+# ===============================================================================
+
+def player_of(module_name, color):
+    if (module_name, color) not in worker_players:
+        module = importlib.import_module('players.' + module_name)
+        with contextlib.redirect_stdout(io.StringIO()):
+            worker_players[(module_name, color)] = module.Player(0, color, 1, 1)
+    return worker_players[(module_name, color)]
+
+
+def reference_of(reference_class, color):
+    if (reference_class, color) not in worker_players:
+        worker_players[(reference_class, color)] = reference_class(color)
+    return worker_players[(reference_class, color)]
+
+
+def same(first, second):
+    if isinstance(first, dict):
+        return {key: value for key, value in first.items() if value} == \
+               {key: value for key, value in second.items() if value}
+    if isinstance(first, tuple):
+        return len(first) == len(second) and all(same(a, b) for a, b in zip(first, second))
+    return first == second or math.isclose(first, second, rel_tol=TOLERANCE, abs_tol=TOLERANCE)
+
+
+"""
+    Find the checks a backend fails on a position.
+
+    :return: list of the names of the failed checks, a check is a feature, a threat helper, a threat function
+             or an evaluator seen by one of the colors, such as 'last_row/r'.
+"""
+
+
+def failed_checks(backend, state):
+    failed = []
+    for color in 'rb':
+        reference = reference_of(REFERENCE_PLAYER, color)
+        threat_reference = reference_of(REFERENCE_THREAT_PLAYER, color)
+        player = player_of(backend, color)
+        expected_utility = reference.utility(state)
+        for name in FEATURES:
+            if hasattr(player, name) and not same(getattr(reference, name)(state), getattr(player, name)(state)):
+                failed.append('{}/{}'.format(name, color))
+        for name in THREAT_HELPERS:
+            if hasattr(player, name) and not same(getattr(threat_reference, name)(state, defaultdict(lambda: 0)),
+                                                  getattr(player, name)(state, defaultdict(lambda: 0))):
+                failed.append('{}/{}'.format(name, color))
+        for name in THREAT_FUNCTIONS:
+            if hasattr(player, name) and not same(getattr(threat_reference, name)(state), getattr(player, name)(state)):
+                failed.append('{}/{}'.format(name, color))
+        for name in EVALUATORS:
+            if hasattr(player, name) and not same(expected_utility, getattr(player, name)(state)):
+                failed.append('{}/{}'.format(name, color))
+    return failed
+
+
+"""
+    Shrink a position on which a check fails: remove pieces and turn kings into pawns for as long as
+    the check still fails.
+
+    :return: the smallest position found.
+"""
+
+
+def shrink(backend, state, check):
+    board = dict(state.board)
+    changed = True
+    while changed:
+        changed = False
+        for loc in sorted(board):
+            value = board[loc]
+            if value == EM:
+                continue
+            candidates = [EM]
+            for color in 'rb':
+                crown_row = 7 if color == 'r' else 0
+                if value == KING_COLOR[color] and loc[0] != crown_row:
+                    candidates.append(PAWN_COLOR[color])
+            for candidate in candidates:
+                smaller = dict(board)
+                smaller[loc] = candidate
+                if check in failed_checks(backend, new_state(smaller, state.curr_player)):
+                    board = smaller
+                    changed = True
+                    break
+    return new_state(board, state.curr_player)
+
+
+def check_chunk(task):
+    backend, seed, first, count = task
+    rng = random.Random('{}:{}'.format(seed, first))
+    mismatches = []
+    for state in random_positions(rng, count):
+        for check in failed_checks(backend, state):
+            mismatches.append((check, pdn_fen(shrink(backend, state, check).board, state.curr_player)))
+    return count, mismatches
+
+
+"""
+    Compare a backend with the reference on the positions of random games, in a pool of processes.
+
+    :return: dictionary from failed check to the number of positions it failed on and the smallest boards, as FEN.
+"""
+
+
+def check_backend(backend, positions, seed, workers):
+    tasks = [(backend, seed, first, min(CHUNK_SIZE, positions - first)) for first in range(0, positions, CHUNK_SIZE)]
+    failures = {}
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(workers) as pool:
+        for count, mismatches in pool.imap_unordered(check_chunk, tasks):
+            for check, fen in mismatches:
+                failure = failures.setdefault(check, [0, []])
+                failure[0] += 1
+                if len(failure[1]) < MAX_REPORTED and fen not in failure[1]:
+                    failure[1].append(fen)
+    return failures
+
+
+# ===============================================================================
+# Speed
+# ===============================================================================
+
+"""
+    :return: evaluations per second of a utility over the positions. The utility is called directly,
+             an evaluation cache would time the hits of repeated positions.
+"""
+
+
+def evaluations_per_second(evaluate, states):
+    start = time.process_time()
+    for state in states:
+        evaluate(state)
+    return len(states) / max(time.process_time() - start, 1e-9)
+
+
+def read_baselines(path):
+    try:
+        with open(path) as baseline_file:
+            return json.load(baseline_file)
+    except (OSError, ValueError):
+        return {}
+
+
+"""
+    :return: the baseline speeds of the host, by player module.
+"""
+
+
+def load_baseline(path, host=HOST):
+    return read_baselines(path).get(host, {})
+
+
+def save_baseline(path, speeds, host=HOST):
+    baselines = read_baselines(path)
+    baselines.setdefault(host, {}).update(speeds)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as baseline_file:
+        json.dump(baselines, baseline_file, indent=2, sort_keys=True)
+
+
+# ===============================================================================
+# Gate
+# ===============================================================================
+
+"""
+    Check every backend against the reference and against its speed baseline on this host.
+
+    :return: True if all the backends passed.
+"""
+
+
+def run_gate(backends, positions, seed, workers, baseline_path, record_baseline):
+    passed = True
+    for backend in backends:
+        failures = check_backend(backend, positions, seed, workers)
+        for check, (count, boards) in sorted(failures.items()):
+            passed = False
+            print('{}: {} differs from the reference on {} of {} positions, smallest boards:'.format(
+                backend, check, count, positions))
+            for fen in boards:
+                print('    ' + fen)
+        if not failures:
+            print('{}: same results as the reference on {} positions'.format(backend, positions))
+
+    states = list(random_positions(random.Random(seed), BENCHMARK_POSITIONS))
+    speeds = {name: evaluations_per_second(player_of(name, 'r').utility, states) for name in backends}
+    speeds[REFERENCE_NAME] = evaluations_per_second(reference_of(REFERENCE_PLAYER, 'r').utility, states)
+    baseline = load_baseline(baseline_path)
+    for backend in backends:
+        print('{}: {:.0f} evaluations per second, {:.2f} times the reference'.format(
+            backend, speeds[backend], speeds[backend] / speeds[REFERENCE_NAME]))
+        if backend in baseline and speeds[backend] < baseline[backend] * (1 - SPEED_TOLERANCE):
+            passed = False
+            print('{}: slower than its baseline of {:.0f} evaluations per second on {}'.format(
+                backend, baseline[backend], HOST))
+    if record_baseline:
+        save_baseline(baseline_path, speeds)
+        print('recorded the baseline of {} in {}'.format(HOST, baseline_path))
+    return passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check optimised evaluators against the reference players.')
+    parser.add_argument('--backend', action='append', help='player module to check, all the backends by default')
+    parser.add_argument('--positions', type=int, default=DEFAULT_POSITIONS)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='JSON file of evaluations per second by host')
+    parser.add_argument('--record-baseline', action='store_true', help='save the measured speeds as the baseline')
+    args = parser.parse_args()
+    passed = run_gate(args.backend or BACKENDS, args.positions, args.seed, args.workers, args.baseline,
+                      args.record_baseline)
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == '__main__':
+    main()
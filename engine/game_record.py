@@ -0,0 +1,518 @@
+# ===============================================================================
+# Imports
+# ===============================================================================
+import atexit
+import collections
+import copy
+import math
+import mmap
+import os
+import struct
+from checkers.consts import EM, PAWN_COLOR, KING_COLOR, OPPONENT_COLOR
+from players.engine.search import PROMOTION_ROW
+
+# ===============================================================================
+# Globals
+# ===============================================================================
+MAGIC = b'AI2GR\x00\x00\x02'
+# Every record is a type, the length of its payload and the payload.
+RECORD_HEADER = struct.Struct('<BH')
+GAME_START = 1
+MOVE = 2
+GAME_END = 3
+# game id, first player to move, time per k turns, k, then the 64 squares of the starting board
+# and the names of the red and black players.
+START = struct.Struct('<Qcf H64s')
+# game id, ply, player, origin, target, depth, time spent, score, number of jumps,
+# then the square every jump lands on, in the order of the jumps
+MOVE_HEAD = struct.Struct('<QHcBBBffB')
+# game id, result: 'r' or 'b' for the winner, 'd' for a draw
+END = struct.Struct('<Qc')
+NO_DEPTH = 255
+# Board codes of the squares in the starting board.
+PIECE_CODE = {EM: b'.', PAWN_COLOR['r']: b'r', KING_COLOR['r']: b'R', PAWN_COLOR['b']: b'b', KING_COLOR['b']: b'B'}
+CODE_PIECE = {code: piece for piece, code in PIECE_CODE.items()}
+OFF_BOARD = b' '
+# The writer sends whole records to the file once this many bytes are waiting.
+BUFFER_SIZE = 1 << 16
+# Players log their games into the record file named in this environment variable.
+GAME_RECORD_ENV = 'AI2_GAME_RECORD'
+
+GameStart = collections.namedtuple('GameStart', 'game_id first_player time_per_k_turns k board red black')
+MoveRecord = collections.namedtuple('MoveRecord', 'game_id ply player origin target jumped time depth score')
+GameEnd = collections.namedtuple('GameEnd', 'game_id result')
+Game = collections.namedtuple('Game', 'start moves end')
+
+
+# ===============================================================================
+# Squares
+# ===============================================================================
+
+def pack_square(loc):
+    return loc[0] * 8 + loc[1]
+
+
+def unpack_square(square):
+    return divmod(square, 8)
+
+
+"""
+    Number of a square in PDN. Black starts on squares 1-12 and red, which is white in PDN,
+    on squares 21-32: row 7 holds squares 1-4, row 0 squares 29-32, and within a row the
+    squares are numbered by increasing column, so square (0, 0) is 29.
+"""
+
+
+def pdn_square(loc):
+    return (7 - loc[0]) * 4 + loc[1] // 2 + 1
+
+
+"""
+    The square of a PDN number, the dark squares are those where row + col is even.
+"""
+
+
+def pdn_location(number):
+    row = 7 - (number - 1) // 4
+    return row, 2 * ((number - 1) % 4) + row % 2
+
+
+"""
+    :return: the squares the jumps of a move land on, from the jumped squares in the order of the jumps.
+"""
+
+
+def jump_landings(origin, jumped):
+    landings = []
+    loc = origin
+    for piece in jumped:
+        loc = 2 * piece[0] - loc[0], 2 * piece[1] - loc[1]
+        landings.append(loc)
+    return landings
+
+
+"""
+    :return: the jumped squares in the order of the jumps, from the squares the jumps land on.
+"""
+
+
+def jumped_squares(origin, landings):
+    jumped = []
+    loc = origin
+    for landing in landings:
+        jumped.append(((loc[0] + landing[0]) // 2, (loc[1] + landing[1]) // 2))
+        loc = landing
+    return tuple(jumped)
+
+
+"""
+    The squares of a move of the framework, with the jumped squares in the order of the jumps,
+    which the move keys of the search do not keep.
+"""
+
+
+def played_move(move):
+    return move.origin_loc, move.target_loc, tuple(move.jumped_locs)
+
+
+def pack_board(board):
+    return b''.join(PIECE_CODE[board[(row, col)]] if (row, col) in board else OFF_BOARD
+                    for row in range(8) for col in range(8))
+
+
+def unpack_board(data):
+    return {unpack_square(square): CODE_PIECE[data[square:square + 1]]
+            for square in range(64) if data[square:square + 1] != OFF_BOARD}
+
+
+# ===============================================================================
+# Writer
+# ===============================================================================
+
+class GameRecordWriter:
+    """
+        Append games to a record file.
+        Records are collected in memory and written in one write of whole records, to a file opened
+        in append mode, so several processes can log into the same file without mixing records.
+
+        Arguments:
+        path: the record file, created with its header if it does not exist.
+    """
+
+    def __init__(self, path):
+        self.descriptor = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self.buffer = bytearray()
+        self.plies = {}
+        if os.fstat(self.descriptor).st_size == 0:
+            self.buffer += MAGIC
+            self.flush()
+
+    def append(self, record_type, payload):
+        self.buffer += RECORD_HEADER.pack(record_type, len(payload)) + payload
+        if len(self.buffer) >= BUFFER_SIZE:
+            self.flush()
+
+    """
+        Arguments:
+        game_id: a 64 bit number that identifies the game in the file.
+        first_player: the color of the player to move in the starting board.
+        board: the starting board, a dictionary like the board of a game state.
+        red, black: the names of the players.
+    """
+
+    def start_game(self, game_id, first_player, time_per_k_turns, k, board, red='', black=''):
+        names = b''.join(bytes([len(name)]) + name for name in (red.encode()[:255], black.encode()[:255]))
+        self.plies[game_id] = 0
+        self.append(GAME_START, START.pack(game_id, first_player.encode(), time_per_k_turns, k,
+                                           pack_board(board)) + names)
+
+    """
+        Arguments:
+        game_id: the game of the move.
+        player: the color of the player that moved.
+        move: a move of the framework, or (origin, target, jumped squares) with the jumped squares
+              in the order of the jumps.
+        time_spent: seconds the player used for the move.
+        depth: the depth the search reached, None if unknown.
+        score: the value of the move for the player, nan if unknown.
+    """
+
+    def move(self, game_id, player, move, time_spent=0.0, depth=None, score=math.nan):
+        if not isinstance(move, tuple):
+            move = played_move(move)
+        origin, target, jumped = move
+        landings = jump_landings(origin, jumped)
+        squares = [origin] + landings
+        if landings and (landings[-1] != target or any(abs(loc[0] - previous[0]) != 2 or abs(loc[1] - previous[1]) != 2
+                                                       for previous, loc in zip(squares, landings))):
+            raise ValueError('the jumped squares of {} are not in the order of the jumps'.format(move))
+        ply = self.plies.get(game_id, 0)
+        self.plies[game_id] = ply + 1
+        self.append(MOVE, MOVE_HEAD.pack(game_id, ply, player.encode(), pack_square(origin), pack_square(target),
+                                         NO_DEPTH if depth is None else min(depth, NO_DEPTH - 1),
+                                         time_spent, score, len(landings)) +
+                    bytes(pack_square(loc) for loc in landings))
+
+    def end_game(self, game_id, result):
+        self.plies.pop(game_id, None)
+        self.append(GAME_END, END.pack(game_id, result.encode()))
+
+    def flush(self):
+        if self.buffer:
+            os.write(self.descriptor, bytes(self.buffer))
+            self.buffer.clear()
+
+    def close(self):
+        self.flush()
+        os.close(self.descriptor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# ===============================================================================
+# Reader
+# ===============================================================================
+
+class GameRecordReader:
+    """
+        Read a record file through a memory map, without copying or parsing text.
+
+        Arguments:
+        path: the record file.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as record_file:
+            self.mapping = mmap.mmap(record_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.mapping[:len(MAGIC)] != MAGIC:
+            raise ValueError('{} is not a game record file'.format(path))
+
+    """
+        :return: iterator over GameStart, MoveRecord and GameEnd tuples in file order,
+                 the jumped squares of a move are in the order of the jumps.
+                 A record cut at the end of the file, by a writer that is still running, is skipped.
+    """
+
+    def records(self):
+        mapping = self.mapping
+        offset = len(MAGIC)
+        end = len(mapping)
+        while offset + RECORD_HEADER.size <= end:
+            record_type, length = RECORD_HEADER.unpack_from(mapping, offset)
+            offset += RECORD_HEADER.size
+            if offset + length > end:
+                return
+            if record_type == MOVE:
+                game_id, ply, player, origin, target, depth, time_spent, score, jumps = \
+                    MOVE_HEAD.unpack_from(mapping, offset)
+                landings_offset = offset + MOVE_HEAD.size
+                landings = [unpack_square(square) for square in mapping[landings_offset:landings_offset + jumps]]
+                yield MoveRecord(game_id, ply, player.decode(), unpack_square(origin), unpack_square(target),
+                                 jumped_squares(unpack_square(origin), landings), time_spent,
+                                 None if depth == NO_DEPTH else depth, score)
+            elif record_type == GAME_START:
+                game_id, first_player, time_per_k_turns, k, board = START.unpack_from(mapping, offset)
+                names_offset = offset + START.size
+                red_length = mapping[names_offset]
+                red = mapping[names_offset + 1:names_offset + 1 + red_length].decode()
+                black_offset = names_offset + 1 + red_length
+                black = mapping[black_offset + 1:black_offset + 1 + mapping[black_offset]].decode()
+                yield GameStart(game_id, first_player.decode(), time_per_k_turns, k, unpack_board(board), red, black)
+            elif record_type == GAME_END:
+                game_id, result = END.unpack_from(mapping, offset)
+                yield GameEnd(game_id, result.decode())
+            offset += length
+
+    """
+        Group the records into games. A game is yielded when its end record is read, and the games
+        that have no end record are yielded at the end of the file.
+
+        :return: iterator over Game tuples.
+    """
+
+    def games(self):
+        open_games = {}
+        for record in self.records():
+            if isinstance(record, GameStart):
+                open_games[record.game_id] = (record, [])
+            elif record.game_id not in open_games:
+                continue
+            elif isinstance(record, MoveRecord):
+                open_games[record.game_id][1].append(record)
+            else:
+                start, moves = open_games.pop(record.game_id)
+                yield Game(start, moves, record)
+        for start, moves in open_games.values():
+            yield Game(start, moves, None)
+
+    def close(self):
+        self.mapping.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# ===============================================================================
+# Player logging
+# ===============================================================================
+
+# One writer for every record file of the process, flushed when the process exits.
+writers = {}
+
+
+def open_writer(path):
+    if path not in writers:
+        writers[path] = GameRecordWriter(path)
+        atexit.register(writers[path].close)
+    return writers[path]
+
+
+"""
+    Find the move that turned one board into the other.
+
+    :return: (origin, target, jumped squares in the order of the jumps),
+             None if the boards are not one move of color apart.
+"""
+
+
+def infer_move(before, after, color):
+    pieces = (PAWN_COLOR[color], KING_COLOR[color])
+    origins = [loc for loc, value in before.items() if value in pieces and after.get(loc) == EM]
+    targets = [loc for loc, value in after.items() if value in pieces and before.get(loc) == EM]
+    jumped = {loc for loc, value in before.items() if value != EM and value not in pieces and after.get(loc) == EM}
+    if len(origins) != 1 or len(targets) != 1:
+        return None
+    order = jump_order(before, origins[0], targets[0], jumped)
+    if order is None:
+        return None
+    return origins[0], targets[0], order
+
+
+"""
+    Find the order of the jumps of a move from the pieces it took: every jump goes over a piece
+    next to the piece that jumps, to the empty square beyond it, and the last one lands on target.
+
+    :return: the jumped squares in the order of the jumps, None if no order leads to target.
+"""
+
+
+def jump_order(board, origin, target, jumped):
+    def extend(loc, remaining):
+        if not remaining:
+            return () if loc == target else None
+        for piece in remaining:
+            if abs(piece[0] - loc[0]) != 1 or abs(piece[1] - loc[1]) != 1:
+                continue
+            landing = 2 * piece[0] - loc[0], 2 * piece[1] - loc[1]
+            if landing == origin or board.get(landing) == EM:
+                rest = extend(landing, remaining - {piece})
+                if rest is not None:
+                    return (piece,) + rest
+        return None
+    return extend(origin, frozenset(jumped))
+
+
+class GameLogger:
+    """
+        Log the game of a player as it sees it.
+        The player only sees the board on its own turns, so the move of the opponent is found from
+        the board it left after its previous move. When that fails, as for the first move, a new
+        game is started from the board it got. The player does not know how the game ended and the
+        games it logs have no end record.
+
+        Arguments:
+        writer: the GameRecordWriter.
+        name: the name of the player.
+        color: the color of the player.
+    """
+
+    def __init__(self, writer, name, color, time_per_k_turns, k):
+        self.writer = writer
+        self.name = name
+        self.color = color
+        self.time_per_k_turns = time_per_k_turns
+        self.k = k
+        self.game_id = None
+        # The board after our last move.
+        self.board = None
+
+    """
+        :return: a logger writing into the file named in AI2_GAME_RECORD, None if it is not set.
+    """
+
+    @classmethod
+    def from_environment(cls, name, color, time_per_k_turns, k):
+        path = os.environ.get(GAME_RECORD_ENV)
+        if not path:
+            return None
+        return cls(open_writer(path), name, color, time_per_k_turns, k)
+
+    def start_game(self, state):
+        self.game_id = int.from_bytes(os.urandom(8), 'little')
+        names = {self.color: self.name, OPPONENT_COLOR[self.color]: ''}
+        self.writer.start_game(self.game_id, self.color, self.time_per_k_turns, self.k, state.board,
+                               names['r'], names['b'])
+
+    def record(self, state, move, time_spent, depth=None, score=math.nan):
+        reply = None
+        if self.board is not None:
+            reply = infer_move(self.board, state.board, OPPONENT_COLOR[self.color])
+        if reply is None:
+            self.start_game(state)
+        else:
+            self.writer.move(self.game_id, OPPONENT_COLOR[self.color], reply)
+        self.writer.move(self.game_id, self.color, move, time_spent, depth, score)
+        next_state = copy.deepcopy(state)
+        next_state.perform_move(move)
+        self.board = dict(next_state.board)
+
+
+# ===============================================================================
+# PDN
+# ===============================================================================
+
+"""
+    Write a move (origin, target, jumped squares in the order of the jumps) in PDN:
+    the squares it passes through, separated by x for a jump.
+"""
+
+
+def pdn_move(move):
+    origin, target, jumped = move
+    if not jumped:
+        return '{}-{}'.format(pdn_square(origin), pdn_square(target))
+    return 'x'.join(str(pdn_square(loc)) for loc in [origin] + jump_landings(origin, jumped))
+
+
+"""
+    Play a move key on a board without a game state.
+
+    :return: the new board.
+"""
+
+
+def apply_move(board, player, move):
+    origin, target, jumped = move
+    board = dict(board)
+    piece = board[origin]
+    if piece == PAWN_COLOR[player] and target[0] == PROMOTION_ROW[PAWN_COLOR[player]]:
+        piece = KING_COLOR[player]
+    board[origin] = EM
+    for loc in jumped:
+        board[loc] = EM
+    board[target] = piece
+    return board
+
+
+def pdn_fen(board, player):
+    sides = []
+    for color, side in (('r', 'W'), ('b', 'B')):
+        squares = sorted((pdn_square(loc), value == KING_COLOR[color]) for loc, value in board.items()
+                         if value in (PAWN_COLOR[color], KING_COLOR[color]))
+        sides.append(side + ','.join(('K' if king else '') + str(square) for square, king in squares))
+    return '{}:{}:{}'.format('W' if player == 'r' else 'B', sides[0], sides[1])
+
+
+"""
+    Export a game in PDN, starting from the board the record starts from. Red is white in PDN.
+
+    :return: the PDN text of the game.
+"""
+
+
+def to_pdn(game):
+    start = game.start
+    result = '*'
+    if game.end is not None:
+        result = {'r': '1-0', 'b': '0-1'}.get(game.end.result, '1/2-1/2')
+    lines = ['[Event "{}"]'.format(start.game_id),
+             '[Black "{}"]'.format(start.black),
+             '[White "{}"]'.format(start.red),
+             '[Result "{}"]'.format(result),
+             '[SetUp "1"]',
+             '[FEN "{}"]'.format(pdn_fen(start.board, start.first_player))]
+    text = []
+    player = start.first_player
+    for index, move in enumerate(game.moves):
+        if index % 2 == 0:
+            text.append('{}.'.format(index // 2 + 1) if player == start.first_player else '{}...'.format(index // 2 + 1))
+        text.append(pdn_move((move.origin, move.target, move.jumped)))
+        player = OPPONENT_COLOR[player]
+    text.append(result)
+    return '\n'.join(lines) + '\n\n' + ' '.join(text) + '\n'
+
+
+"""
+    Read a PDN FEN such as W:W21,22,K30:B1-12, with the player to move first.
+
+    :return: the board and the player to move.
+"""
+
+
+def parse_fen(fen):
+    fen = fen.strip().strip('"').rstrip('.')
+    fields = fen.split(':')
+    player = 'r' if fields[0].upper() == 'W' else 'b'
+    board = {pdn_location(number): EM for number in range(1, 33)}
+    for field in fields[1:]:
+        if not field:
+            continue
+        color = 'r' if field[0].upper() == 'W' else 'b'
+        for square in field[1:].split(','):
+            square = square.strip()
+            if not square:
+                continue
+            piece = PAWN_COLOR[color]
+            if square[0].upper() == 'K':
+                piece, square = KING_COLOR[color], square[1:]
+            first, _, last = square.partition('-')
+            for number in range(int(first), int(last or first) + 1):
+                board[pdn_location(number)] = piece
+    return board, player
@@ -0,0 +1,431 @@
+# ===============================================================================
+# Imports
+# ===============================================================================
+from collections import defaultdict
+from checkers.consts import EM, PAWN_COLOR, KING_COLOR, OPPONENT_COLOR
+from players.engine.round_planner import NORMAL_WEIGHT
+from players.engine.piece_square import PAWN, KING, LAST_ROW, CENTER, MIDDLE_ROW, LAST_ROW_SQUARES, \
+    CENTER_SQUARES, MIDDLE_ROW_SQUARES
+
+
+# ===============================================================================
+# Heuristic
+# ===============================================================================
+
+class Heuristic:
+    """
+        The terms of the heuristic and the threat detection that all the players share.
+        A player is a thin configuration on top: it inherits from Heuristic before
+        players.simple_player.Player, and its utility chooses the terms and how they are combined,
+        so a change to a term reaches every player at once.
+        The terms are computed from the board and self.color only, and weighted by the class
+        attributes below, which a player can override.
+    """
+
+    PAWN_WEIGHT = 1
+    KING_WEIGHT = 1.5
+    LAST_ROW_PAWN = 0.8
+    CENTER_BOARD_PAWN = 0.5
+    MIDDLE_ROW_PAWN = 0.1
+    VULNERABLE_PAWN = -0.6
+    PROTECTED_PAWN = 0.6
+
+    """
+        :return: the material and region weights, to be compiled into piece-square tables.
+    """
+
+    def table_weights(self):
+        return {PAWN: self.PAWN_WEIGHT, KING: self.KING_WEIGHT, LAST_ROW: self.LAST_ROW_PAWN,
+                CENTER: self.CENTER_BOARD_PAWN, MIDDLE_ROW: self.MIDDLE_ROW_PAWN}
+
+    """
+    Calculate the number of pawns the player and rival have on the board
+    and returns both
+    """
+
+    def pawns_utility(self, state):
+        piece_counts = defaultdict(lambda: 0)
+        for loc_val in state.board.values():
+            if loc_val != EM:
+                piece_counts[loc_val] += 1
+
+        opponent_color = OPPONENT_COLOR[self.color]
+
+        my_u = self.PAWN_WEIGHT * piece_counts[PAWN_COLOR[self.color]]
+        op_u = self.PAWN_WEIGHT * piece_counts[PAWN_COLOR[opponent_color]]
+        return my_u, op_u
+
+    """
+        Calculate the number of kings the player and rival have on the board
+        and returns both
+    """
+
+    def kings_utility(self, state):
+        piece_counts = defaultdict(lambda: 0)
+        for loc_val in state.board.values():
+            if loc_val != EM:
+                piece_counts[loc_val] += 1
+
+        opponent_color = OPPONENT_COLOR[self.color]
+
+        my_u = self.KING_WEIGHT * piece_counts[KING_COLOR[self.color]]
+        op_u = self.KING_WEIGHT * piece_counts[KING_COLOR[opponent_color]]
+        return my_u, op_u
+
+    """
+        Calculate the number of pieces the player and the rival have on the last row of the board
+        for red player its the 0 row and for black player its the 7 row
+        and returns both
+    """
+
+    def last_row(self, state):
+        piece_counts = defaultdict(lambda: 0)
+        for color in ('r', 'b'):
+            for key in LAST_ROW_SQUARES[color]:
+                value = state.board.get(key, EM)
+                if value == PAWN_COLOR[color] or value == KING_COLOR[color]:
+                    piece_counts[value] += 1
+
+        opponent_color = OPPONENT_COLOR[self.color]
+
+        my_u = self.LAST_ROW_PAWN * (piece_counts[KING_COLOR[self.color]] + piece_counts[PAWN_COLOR[self.color]])
+        op_u = self.LAST_ROW_PAWN * (piece_counts[KING_COLOR[opponent_color]] +
+                                     piece_counts[PAWN_COLOR[opponent_color]])
+        return my_u, op_u
+
+    """
+        Calculate the number of pieces the player and the rival have on the center of the board
+        the center is the 3,4 rows and the 2,3,4,5 columns
+        and returns both
+    """
+
+    def center_board(self, state):
+        piece_counts = self.center_pieces(state, defaultdict(lambda: 0))
+
+        opponent_color = OPPONENT_COLOR[self.color]
+
+        my_u = self.CENTER_BOARD_PAWN * (piece_counts[KING_COLOR[self.color]] + piece_counts[PAWN_COLOR[self.color]])
+        op_u = self.CENTER_BOARD_PAWN * (piece_counts[KING_COLOR[opponent_color]] +
+                                         piece_counts[PAWN_COLOR[opponent_color]])
+        return my_u, op_u
+
+    """
+        Calculate the number of pieces the player and the rival have on the middle but not in the center
+        the middle is the 3,4 rows and the 0,1,6,7 columns
+        and returns both
+    """
+
+    def middle_rows_not_center(self, state):
+        piece_counts = defaultdict(lambda: 0)
+        for key in MIDDLE_ROW_SQUARES:
+            value = state.board.get(key, EM)
+            if value != EM:
+                piece_counts[value] += 1
+
+        opponent_color = OPPONENT_COLOR[self.color]
+
+        my_u = self.MIDDLE_ROW_PAWN * (piece_counts[KING_COLOR[self.color]] + piece_counts[PAWN_COLOR[self.color]])
+        op_u = self.MIDDLE_ROW_PAWN * (piece_counts[KING_COLOR[opponent_color]] +
+                                       piece_counts[PAWN_COLOR[opponent_color]])
+        return my_u, op_u
+
+    """
+        Calculate the number of protected pieces the player and the rival have on the board
+        protected pawn is a pawn that can't be jumped over on the next turn
+        it calculate it for the black and red player
+        and returns both
+    """
+
+    def protected_player(self, state):
+        piece_counts = defaultdict(lambda: 0)
+        piece_counts = self.protected_player_black(state, piece_counts)
+        piece_counts = self.protected_player_red(state, piece_counts)
+        opponent_color = OPPONENT_COLOR[self.color]
+        my_u = self.PROTECTED_PAWN * (piece_counts[KING_COLOR[self.color]] + piece_counts[PAWN_COLOR[self.color]])
+        op_u = self.PROTECTED_PAWN * (piece_counts[KING_COLOR[opponent_color]] +
+                                      piece_counts[PAWN_COLOR[opponent_color]])
+        return my_u, op_u
+
+    """
+        Calculate the number of protected pieces the black player has
+        and returns it
+    """
+
+    def protected_player_black(self, state, piece_counts):
+        for key, value in state.board.items():
+            if value != EM and key[0] < 7:
+                if key[1] == 0 or key[1] == 7:
+                    piece_counts[value] += 1
+                elif (value == 'b' or value == 'B') and state.board[(key[0] + 1, key[1] - 1)] != EM and \
+                        (state.board[(key[0] + 1, key[1] - 1)] != 'R'
+                         and (state.board[(key[0] + 1, key[1] + 1)] != EM
+                              and state.board[(key[0] + 1, key[1] + 1)] != 'R')):
+                    piece_counts[value] += 1
+        return piece_counts
+
+    """
+        Calculate the number of protected pieces the red player has
+        and returns it
+    """
+
+    def protected_player_red(self, state, piece_counts):
+        for key, value in state.board.items():
+            if value != EM and key[0] > 0:
+                if key[1] == 0 or key[1] == 7:
+                    piece_counts[value] += 1
+                elif (value == 'r' or value == 'R') and state.board[(key[0] - 1, key[1] - 1)] != EM and \
+                        (state.board[(key[0] - 1, key[1] - 1)] != 'B'
+                         and (state.board[(key[0] - 1, key[1] + 1)] != EM
+                              and state.board[(key[0] - 1, key[1] + 1)] != 'B')):
+                    piece_counts[value] += 1
+        return piece_counts
+
+    """
+    Count the amount of pieces in board that are vulnerable.
+    Vulnerable player is a player that can't save himself and the rival will jump on him in his next move. 
+    :return: the number of pieces vulnerable on the board for the player and for the rival
+    """
+
+    def vulnerable_player(self, state):
+        piece_counts = defaultdict(lambda: 0)
+        piece_counts = self.vulnerable_black_pawn(state, piece_counts)
+        piece_counts = self.vulnerable_red_pawn(state, piece_counts)
+        opponent_color = OPPONENT_COLOR[self.color]
+        my_u = self.VULNERABLE_PAWN * (piece_counts[KING_COLOR[self.color]] + piece_counts[PAWN_COLOR[self.color]])
+        op_u = self.VULNERABLE_PAWN * (piece_counts[KING_COLOR[opponent_color]] +
+                                       piece_counts[PAWN_COLOR[opponent_color]])
+        return my_u, op_u
+
+    """
+            The motivation behind the method is to invest in critical situations where player
+            can be attacked and in situations where the player can attack the opponent.
+
+            Arguments:
+            game_state: current game state which include board state, palyer color and number of turns since last jump.
+
+            :return: how much more time than a normal turn the turn deserves.
+    """
+
+    def threat_weight(self, game_state):
+        center = self.center_pieces(game_state, piece_counts=defaultdict(lambda: 0))
+        if self.color == 'r':
+            rescued_red = self.can_be_rescued_red(game_state, piece_counts=defaultdict(lambda: 0))
+            rescued_pieces = sum(rescued_red.values())
+            if rescued_pieces >= 1:
+                """
+                A situation in the board where there is at least one red player that will be attacked
+                and the he has escape route.
+                In this situation the turn weighs 180% of a normal turn.
+                """
+                return 1.8
+            vulnerable_red = self.vulnerable_red_pawn(game_state, piece_counts=defaultdict(lambda: 0))
+            vulnerable_pieces = sum(vulnerable_red.values())
+            if vulnerable_pieces >= 1:
+                """
+                A situation where in the next turn the black opponent will jump over red player
+                and in such a situation the turn weighs more in order to maximize future actions.
+                The turn weighs 150% of a normal turn.
+                """
+                return 1.5
+            if center['r'] + center['R'] >= 2:
+                """
+                A situation in which there are at least two red player in the center of the board.
+                Control of the center of the board is an advantage of maneuvering and attacking
+                so the turn weighs more in such a situation.
+                The turn weighs 130% of a normal turn. 
+                """
+                return 1.3
+        else:
+            rescued_black = self.can_be_rescued_black(game_state, piece_counts=defaultdict(lambda: 0))
+            rescued_pieces = sum(rescued_black.values())
+            if rescued_pieces >= 1:
+                """
+                A situation in the board where there is at least one black player that will be attacked
+                and the he has escape route.
+                In this situation the turn weighs 180% of a normal turn.
+                """
+                return 1.8
+            vulnerable_black = self.vulnerable_black_pawn(game_state, piece_counts=defaultdict(lambda: 0))
+            vulnerable_pieces = sum(vulnerable_black.values())
+            if vulnerable_pieces > 1:
+                """
+                A situation where in the next turn the red opponent will jump over black player
+                and in such a situation the turn weighs more in order to maximize future actions.
+                The turn weighs 150% of a normal turn.
+                """
+                return 1.5
+            if center['b'] + center['B'] >= 2:
+                """
+                A situation in which there are at least two black player in the center of the board.
+                Control of the center of the board is an advantage of maneuvering and attacking
+                so the turn weighs more in such a situation.
+                The turn weighs 130% of a normal turn.
+                """
+                return 1.3
+
+        return NORMAL_WEIGHT
+
+    """
+            A pawn is about to become a king if it is one row before the last row
+            and one of the squares in front of it is empty.
+
+            Arguments:
+            state: current game state which include board state, palyer color and number of turns since last jump.
+
+            :return: True if a pawn of one of the players can become a king in its next move.
+    """
+
+    def promotion_imminent(self, state):
+        for key, value in state.board.items():
+            if value == 'r' and key[0] == 6:
+                row = 7
+            elif value == 'b' and key[0] == 1:
+                row = 0
+            else:
+                continue
+            if state.board.get((row, key[1] - 1)) == EM or state.board.get((row, key[1] + 1)) == EM:
+                return True
+        return False
+
+    """
+            A position is tactical when a piece of one of the players is vulnerable or can be rescued.
+            The search never reduces the depth of such positions.
+
+            Arguments:
+            state: current game state which include board state, palyer color and number of turns since last jump.
+
+            :return: True if the position is tactical.
+    """
+
+    def is_tactical(self, state):
+        return bool(sum(self.vulnerable_black_pawn(state, defaultdict(lambda: 0)).values()) or
+                    sum(self.vulnerable_red_pawn(state, defaultdict(lambda: 0)).values()) or
+                    sum(self.can_be_rescued_black(state, defaultdict(lambda: 0)).values()) or
+                    sum(self.can_be_rescued_red(state, defaultdict(lambda: 0)).values()))
+
+    """
+            Count the amount of pawn and kings in board center.
+            Board center is between lines 3 and 4 and between columns 2 and 5.
+
+            Arguments:
+            state: current game state which include board state, palyer color and number of turns since last jump.
+            piece_counts: empty dictionary.
+            :return: dictionary where the key is the player type and the value is the amount of them in board center.
+    """
+
+    def center_pieces(self, state, piece_counts):
+        for key in CENTER_SQUARES:
+            value = state.board.get(key, EM)
+            if value != EM:
+                piece_counts[value] += 1
+        return piece_counts
+
+    """
+           Count the amount of black pawn and kings in board that can be rescued.
+           Can be rescued is a state where the black player cam make a move to be rescued
+           from the red opponent that may jump on him in his turn.
+
+           Arguments:
+           state: current game state which include board state, palyer color and number of turns since last jump.
+           piece_counts: empty dictionary.
+           :return: dictionary where the key is the player type and the value is the amount of them that can be rescued.
+           """
+
+    def can_be_rescued_black(self, state, piece_counts):
+        for key, value in state.board.items():
+            if value != EM and 0 < key[0] < 7 and 0 < key[1] < 7:
+                if (value == 'b' or value == 'B') and (bool(state.board[(key[0] + 1, key[1] - 1)] == EM and
+                                                            (state.board[(key[0] - 1, key[1] + 1)] == 'r' or
+                                                             state.board[(key[0] - 1, key[1] + 1)] == 'R'))
+                                                       ^ bool(state.board[(key[0] + 1, key[1] + 1)] == EM and
+                                                              (state.board[(key[0] - 1, key[1] - 1)] == 'r' or
+                                                               state.board[(key[0] - 1, key[1] - 1)] == 'R'))):
+                    piece_counts[value] += 1
+                if (value == 'b' or value == 'B') and (bool(state.board[(key[0] - 1, key[1] + 1)] == EM and
+                                                            (state.board[(key[0] + 1, key[1] - 1)] == 'R'))
+                                                       ^ (bool(state.board[(key[0] - 1, key[1] - 1)] == EM and
+                                                               (state.board[(key[0] + 1, key[1] + 1)] == 'R')))):
+                    piece_counts[value] += 1
+        return piece_counts
+
+    """
+            Count the amount of red pawn and kings in board that can be rescued.
+            Can be rescued is a state where the red player cam make a move to be rescued
+            from the black opponent that may jump on him in his turn.
+
+            Arguments:
+            state: current game state which include board state, palyer color and number of turns since last jump.
+            piece_counts: empty dictionary.
+            :return: dictionary where the key is the player type and the value is the amount of them that can be rescued.
+    """
+
+    def can_be_rescued_red(self, state, piece_counts):
+        for key, value in state.board.items():
+            if value != EM and 0 < key[0] < 7 and 0 < key[1] < 7:
+                if (value == 'r' or value == 'R') and (bool(state.board[(key[0] - 1, key[1] + 1)] == EM and
+                                                            (state.board[(key[0] + 1, key[1] - 1)] == 'b' or
+                                                             state.board[(key[0] + 1, key[1] - 1)] == 'B'))
+                                                       ^ (bool(state.board[(key[0] - 1, key[1] - 1)] == EM and
+                                                               (state.board[(key[0] + 1, key[1] + 1)] == 'b' or
+                                                                state.board[(key[0] + 1, key[1] + 1)] == 'B')))):
+                    piece_counts[value] += 1
+                if (value == 'r' or value == 'R') and (bool(state.board[(key[0] + 1, key[1] - 1)] == EM and
+                                                            (state.board[(key[0] - 1, key[1] + 1)] == 'B'))
+                                                       ^ (bool(state.board[(key[0] + 1, key[1] + 1)] == EM and
+                                                               (state.board[(key[0] - 1, key[1] - 1)] == 'B')))):
+                    piece_counts[value] += 1
+        return piece_counts
+
+    """
+            Count the amount of black pawn and kings in board that are vulnerable.
+            Vulnerable palyer is a palyer that can't save himself and the red opponent will jump on him in his next move. 
+
+            Arguments:
+            state: current game state which include board state, palyer color and number of turns since last jump.
+            piece_counts: empty dictionary.
+            :return: dictionary where the key is the player type and the value is the amount of them that are vulnerable.
+            """
+
+    def vulnerable_black_pawn(self, state, piece_counts):
+        for key, value in state.board.items():
+            if value != EM and 0 < key[0] < 7 and 0 < key[1] < 7:
+                if (value == 'b' or value == 'B') and (state.board[(key[0] + 1, key[1] - 1)] == EM and
+                                                       (state.board[(key[0] - 1, key[1] + 1)] == 'r' or
+                                                        state.board[(key[0] - 1, key[1] + 1)] == 'R')) \
+                        and (state.board[(key[0] + 1, key[1] + 1)] == EM and
+                             (state.board[(key[0] - 1, key[1] - 1)] == 'r' or
+                              state.board[(key[0] - 1, key[1] - 1)] == 'R')):
+                    piece_counts[value] += 1
+                if (value == 'b' or value == 'B') and (state.board[(key[0] - 1, key[1] + 1)] == EM and
+                                                       (state.board[(key[0] + 1, key[1] - 1)] == 'R')) \
+                        and (state.board[(key[0] - 1, key[1] - 1)] == EM and
+                             (state.board[(key[0] + 1, key[1] + 1)] == 'R')):
+                    piece_counts[value] += 1
+        return piece_counts
+
+    """
+            Count the amount of red pawn and kings in board that are vulnerable.
+            Vulnerable palyer is a palyer that can't save himself and the black opponent will jump on him in his next move. 
+
+            Arguments:
+            state: current game state which include board state, palyer color and number of turns since last jump.
+            piece_counts: empty dictionary.
+            :return: dictionary where the key is the player type and the value is the amount of them that are vulnerable.
+            """
+
+    def vulnerable_red_pawn(self, state, piece_counts):
+        for key, value in state.board.items():
+            if value != EM and 0 < key[0] < 7 and 0 < key[1] < 7:
+                if (value == 'r' or value == 'R') and (state.board[(key[0] - 1, key[1] + 1)] == EM and
+                                                       (state.board[(key[0] + 1, key[1] - 1)] == 'b' or
+                                                        state.board[(key[0] + 1, key[1] - 1)] == 'B')) \
+                        and (state.board[(key[0] - 1, key[1] - 1)] == EM and
+                             (state.board[(key[0] + 1, key[1] + 1)] == 'b' or
+                              state.board[(key[0] + 1, key[1] + 1)] == 'B')):
+                    piece_counts[value] += 1
+                if (value == 'r' or value == 'R') and (state.board[(key[0] + 1, key[1] - 1)] == EM and
+                                                       (state.board[(key[0] - 1, key[1] + 1)] == 'B')) \
+                        and (state.board[(key[0] + 1, key[1] + 1)] == EM and
+                             (state.board[(key[0] - 1, key[1] - 1)] == 'B')):
+                    piece_counts[value] += 1
+        return piece_counts
@@ -0,0 +1,115 @@
+# ===============================================================================
+# Imports
+# ===============================================================================
+from checkers.consts import EM, PAWN_COLOR, KING_COLOR, OPPONENT_COLOR
+
+# ===============================================================================
+# Globals
+# ===============================================================================
+# A checkers position has the negated value of the position with the colors swapped and the board
+# turned around. Mirroring the board left-right or top-bottom moves the pieces to the light squares,
+# so the game has no other symmetry. The symmetries are:
+IDENTITY = 0
+ROTATE = 1          # (row, col) -> (7 - row, 7 - col), colors swapped
+SYMMETRIES = (IDENTITY, ROTATE)
+# Every symmetry is its own inverse.
+SQUARE_TRANSFORM = {
+    IDENTITY: lambda loc: loc,
+    ROTATE: lambda loc: (7 - loc[0], 7 - loc[1]),
+}
+SWAPS_COLORS = {IDENTITY: False, ROTATE: True}
+
+SQUARES = [(row, col) for row in range(8) for col in range(8)]
+# The character of a square that is not on the board, the board of a state may only hold the dark squares.
+OFF_BOARD = '\0'
+SWAP_COLOR = {OFF_BOARD: OFF_BOARD, EM: EM}
+for _color in ('r', 'b'):
+    SWAP_COLOR[PAWN_COLOR[_color]] = PAWN_COLOR[OPPONENT_COLOR[_color]]
+    SWAP_COLOR[KING_COLOR[_color]] = KING_COLOR[OPPONENT_COLOR[_color]]
+    SWAP_COLOR[_color] = OPPONENT_COLOR[_color]
+
+
+# ===============================================================================
+# Keys
+# ===============================================================================
+
+"""
+    Build a hashable key for the position: the player to move and the content of every square.
+
+    Arguments:
+    state: game state which include board state, palyer color and number of turns since last jump.
+
+    :return: a key that is equal for two identical positions.
+"""
+
+
+def position_key(state):
+    return state.curr_player, tuple(sorted(state.board.items()))
+
+
+"""
+    Write the board as seen through a symmetry, one character for every square of the 8x8 board.
+"""
+
+
+def board_string(board, symmetry):
+    transform = SQUARE_TRANSFORM[symmetry]
+    if SWAPS_COLORS[symmetry]:
+        return ''.join(SWAP_COLOR[board.get(transform(loc), OFF_BOARD)] for loc in SQUARES)
+    return ''.join(board.get(transform(loc), OFF_BOARD) for loc in SQUARES)
+
+
+"""
+    Key of the board alone, equal for all the boards that are symmetric to each other.
+    Used for the evaluation, which does not depend on the player to move.
+
+    Arguments:
+    board: the board of a game state.
+
+    :return: the key and the symmetry that turns the board into the board of the key.
+"""
+
+
+def canonical_board(board):
+    return min((board_string(board, symmetry), symmetry) for symmetry in SYMMETRIES)
+
+
+"""
+    Key of the position, equal for all the positions that are symmetric to each other.
+    When the symmetry swaps the colors it also swaps the player to move.
+
+    Arguments:
+    state: game state which include board state, palyer color and number of turns since last jump.
+
+    :return: the key and the symmetry that turns the position into the position of the key.
+"""
+
+
+def canonical_key(state):
+    player = state.curr_player
+    return min(((SWAP_COLOR[player] if SWAPS_COLORS[symmetry] else player, board_string(state.board, symmetry)),
+                symmetry) for symmetry in SYMMETRIES)
+
+
+"""
+    :return: the value of a position from the value of its symmetric position, negated if the colors were swapped.
+"""
+
+
+def transform_value(value, symmetry):
+    return -value if SWAPS_COLORS[symmetry] else value
+
+
+"""
+    Move a move key (origin, target, jumped squares) through a symmetry, in either direction.
+"""
+
+
+def transform_move_key(key, symmetry):
+    if key is None or symmetry == IDENTITY:
+        return key
+    transform = SQUARE_TRANSFORM[symmetry]
+    origin, target, jumped = key
+    if jumped is not None:
+        jumped = tuple(sorted(transform(loc) for loc in jumped))
+    return transform(origin), transform(target), jumped
@@ -0,0 +1,180 @@
+# ===============================================================================
+# Imports
+# ===============================================================================
+import os
+import weakref
+
+# ===============================================================================
+# Globals
+# ===============================================================================
+# Bytes the searches of the process may keep, a number with an optional K, M or G suffix.
+MEMORY_BUDGET_ENV = 'AI2_MEMORY_BUDGET'
+DEFAULT_MEMORY_BUDGET = '256M'
+# Set to 1 to measure the memory with tracemalloc instead of trusting the estimates.
+MEMORY_DIAGNOSTIC_ENV = 'AI2_MEMORY_DIAGNOSTIC'
+
+# Estimated bytes of an entry of each structure, measured with tracemalloc on the opening and middle game.
+TABLE_ENTRY_BYTES = 500
+CACHE_ENTRY_BYTES = 160
+MOVE_BYTES = 250
+# A copy of the state is kept for every ply of the current line.
+STATE_BYTES = 1500
+
+# The search checks the budget every CHECK_INTERVAL nodes.
+CHECK_INTERVAL = 1000
+# When the budget is exceeded the structures are shrunk until the memory is below this part of it.
+SHRINK_TARGET = 0.75
+# Part of its entries a structure gives up every time it is shrunk.
+SHRINK_FRACTION = 0.5
+# Order in which the structures are shrunk: caches are cheap to fill again, tables keep deep results.
+CACHE = 0
+TABLE = 1
+# In diagnostic mode tracemalloc is read every SAMPLE_INTERVAL checks.
+SAMPLE_INTERVAL = 10
+TOP_ALLOCATIONS = 10
+
+UNITS = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+
+# Imported by the first budget in diagnostic mode, the other players never need it.
+tracemalloc = None
+
+
+# ===============================================================================
+# Helpers
+# ===============================================================================
+
+def parse_size(text):
+    text = text.strip().upper().rstrip('B')
+    if text and text[-1] in UNITS:
+        return int(float(text[:-1]) * UNITS[text[-1]])
+    return int(text)
+
+
+# ===============================================================================
+# Memory budget
+# ===============================================================================
+
+class MemoryBudget:
+    """
+        A byte budget shared by the transposition tables, evaluation caches and move lists of all
+        the players of a process, so that many games in one process keep a predictable size.
+
+        The structures are registered with add and report their estimated size with memory_usage.
+        The search calls check every CHECK_INTERVAL nodes with the size of its own move lists and
+        state copies. When the total is over the limit, the caches and then the tables are asked to
+        shrink, until the total is below SHRINK_TARGET of the limit. If that is not enough,
+        exhausted is set and the players stop deepening and play the best move found so far.
+        exhausted stays set for the rest of the move, even if the search frees its memory as it
+        unwinds, and is cleared when the player starts its next move with new_move.
+
+        In diagnostic mode tracemalloc traces the allocations of the process, and the traced size
+        is used whenever it is bigger than the estimate. report prints the estimates, the traced
+        size and the lines that allocated the most.
+
+        The structures are held by weak references, so the budget does not keep alive the tables
+        and caches of players that are gone.
+
+        Arguments:
+        limit: the budget in bytes.
+        diagnostic: measure the memory with tracemalloc.
+    """
+
+    def __init__(self, limit, diagnostic=False):
+        self.limit = limit
+        self.diagnostic = diagnostic
+        self.consumers = weakref.WeakKeyDictionary()
+        self.exhausted = False
+        self.checks = 0
+        self.shrinks = 0
+        self.traced = 0
+        self.peak = 0
+        if diagnostic:
+            global tracemalloc
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+
+    """
+        Arguments:
+        consumer: an object with memory_usage() that returns its size in bytes, and shrink(fraction)
+                  that drops that part of its entries.
+        priority: CACHE or TABLE, the structures with the lower priority are shrunk first.
+    """
+
+    def add(self, consumer, priority):
+        self.consumers[consumer] = priority
+
+    """
+        :return: the estimated bytes of the registered structures and the given search bytes,
+                 or the traced bytes in diagnostic mode if they are more.
+    """
+
+    def usage(self, search_bytes=0):
+        estimate = sum(consumer.memory_usage() for consumer in list(self.consumers.keys())) + search_bytes
+        if self.diagnostic and self.checks % SAMPLE_INTERVAL == 0:
+            self.traced, peak = tracemalloc.get_traced_memory()
+            self.peak = max(self.peak, peak)
+        return max(estimate, self.traced) if self.diagnostic else estimate
+
+    """
+        Shrink the structures if the budget is exceeded.
+
+        Arguments:
+        search_bytes: the bytes held by the search that is running.
+
+        :return: False if the memory is still over the budget, or was earlier in the move.
+    """
+
+    def check(self, search_bytes=0):
+        self.checks += 1
+        used = self.usage(search_bytes)
+        if used <= self.limit:
+            return not self.exhausted
+        target = SHRINK_TARGET * self.limit
+        for consumer, _ in sorted(list(self.consumers.items()), key=lambda item: item[1]):
+            while used > target and consumer.memory_usage() > 0:
+                consumer.shrink(SHRINK_FRACTION)
+                self.shrinks += 1
+                if self.diagnostic:
+                    # The traced size only goes down when it is measured again.
+                    self.traced = tracemalloc.get_traced_memory()[0]
+                used = self.usage(search_bytes)
+        self.exhausted = self.exhausted or used > self.limit
+        return not self.exhausted
+
+    """
+        Start a move: forget that the budget was exhausted during the previous one, and shrink the
+        structures at once if they are over it.
+
+        :return: False if the memory is still over the budget.
+    """
+
+    def new_move(self):
+        self.exhausted = False
+        return self.check()
+
+    def report(self):
+        print('memory budget {} bytes, estimated use {} bytes, shrunk {} times'.format(
+            self.limit, self.usage(), self.shrinks))
+        if not self.diagnostic:
+            return
+        print('traced {} bytes, peak {} bytes'.format(*tracemalloc.get_traced_memory()))
+        for statistic in tracemalloc.take_snapshot().statistics('lineno')[:TOP_ALLOCATIONS]:
+            print('    {}'.format(statistic))
+
+
+# The budget of this process, created by process_budget.
+budget = None
+
+
+"""
+    :return: the MemoryBudget of this process, sized from AI2_MEMORY_BUDGET.
+"""
+
+
+def process_budget():
+    global budget
+    if budget is None:
+        budget = MemoryBudget(parse_size(os.environ.get(MEMORY_BUDGET_ENV, DEFAULT_MEMORY_BUDGET)),
+                              os.environ.get(MEMORY_DIAGNOSTIC_ENV) == '1')
+    return budget
@@ -0,0 +1,238 @@
+# ===============================================================================
+# Imports
+# ===============================================================================
+import mmap
+import os
+import struct
+try:
+    import fcntl
+except ImportError:
+    # No file locks on this platform, the atomic replace of the file still keeps readers safe.
+    fcntl = None
+
+# ===============================================================================
+# Globals
+# ===============================================================================
+STORE_DIR = os.environ.get('AI2_STORE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'ai2_checkers'))
+STORE_SIZE = 1000000
+# Only entries searched at least this deep are worth keeping between games.
+PERSIST_MIN_DEPTH = 3
+# When the store is full an entry loses one ply of priority for every AGE_PENALTY games it was not refreshed.
+AGE_PENALTY = 4
+
+MAGIC = b'AI2TT\x00\x00\x03'
+# magic, generation, number of records
+HEADER = struct.Struct('<8sII')
+# hash, value, jumped squares mask, depth, flag, origin, target, generation, check
+RECORD = struct.Struct('<QdQBBBBHH')
+KEY = struct.Struct('<Q')
+# The hash of a key and 16 more bits of the same digest, kept in the record to tell apart keys with the same hash.
+HASH_AND_CHECK = struct.Struct('<QH')
+NO_SQUARE = 255
+
+
+# ===============================================================================
+# Helpers
+# ===============================================================================
+
+"""
+    A 64 bit hash of a canonical key (player, board, turns since last jump) that is the same
+    in every process, unlike the built in hash of strings, and a 16 bit check of the key.
+
+    :return: the hash and the check.
+"""
+
+
+def hash_and_check(key):
+    # hashlib loads OpenSSL, which is slower to import than a player, so it is only imported once a store is used.
+    import hashlib
+    player, board, turns_since_last_jump = key
+    digest = hashlib.blake2b((player + board + str(turns_since_last_jump)).encode('latin-1'),
+                             digest_size=HASH_AND_CHECK.size).digest()
+    return HASH_AND_CHECK.unpack(digest)
+
+
+def stable_hash(key):
+    return hash_and_check(key)[0]
+
+
+"""
+    Pack a move key (origin, target, jumped squares) into the origin, target and jumped squares mask of a record.
+"""
+
+
+def pack_move(move):
+    if move is None:
+        return NO_SQUARE, NO_SQUARE, 0
+    origin, target, jumped = move
+    mask = 0
+    for loc in jumped:
+        mask |= 1 << (loc[0] * 8 + loc[1])
+    return origin[0] * 8 + origin[1], target[0] * 8 + target[1], mask
+
+
+def unpack_move(origin, target, mask):
+    if origin == NO_SQUARE:
+        return None
+    jumped = tuple(divmod(square, 8) for square in range(64) if mask >> square & 1)
+    return divmod(origin, 8), divmod(target, 8), jumped
+
+
+# ===============================================================================
+# Persistent store
+# ===============================================================================
+
+class PersistentStore:
+    """
+        Deep search results kept on disk between games and processes.
+        The file is a header and records sorted by position hash, every record holds the hash,
+        check, depth, bound, value and move of one canonical position. A probe only returns a
+        record whose check matches too, so a wrong record is returned only when two positions
+        have the same 80 bits of hash and check, which is rare but possible.
+        Two positions with the same hash share a record, the deeper result is kept. The value is from the point of view
+        of the player to move in the canonical position, so red and black players can share it.
+
+        The file is memory mapped on the first probe and searched in place. merge writes a new
+        file next to it and replaces it atomically, under a lock when the platform has one, so
+        players of parallel games keep reading the version they mapped until they reopen it.
+        When the store is full the entries with the least depth, minus their age in games divided
+        by AGE_PENALTY, are dropped.
+
+        Arguments:
+        name: name of the store file, usually the name of the player.
+        size: the maximal number of records.
+        directory: where the file is kept.
+    """
+
+    def __init__(self, name, size=STORE_SIZE, directory=STORE_DIR):
+        self.path = os.path.join(directory, name + '.bin')
+        self.size = size
+        self.mapping = None
+        self.generation = 0
+        self.count = 0
+        self.opened = False
+
+    """
+        Map the file, once. A missing or damaged file is an empty store.
+    """
+
+    def open(self):
+        self.opened = True
+        try:
+            with open(self.path, 'rb') as store_file:
+                mapping = mmap.mmap(store_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return
+        if len(mapping) < HEADER.size:
+            mapping.close()
+            return
+        magic, generation, count = HEADER.unpack_from(mapping, 0)
+        if magic != MAGIC or len(mapping) < HEADER.size + count * RECORD.size:
+            mapping.close()
+            return
+        self.mapping, self.generation, self.count = mapping, generation, count
+
+    """
+        Find a position by binary search over the mapped records.
+
+        :return: (depth, flag, value, move key) or None.
+    """
+
+    def probe(self, key):
+        if not self.opened:
+            self.open()
+        if self.mapping is None:
+            return None
+        position_hash, check = hash_and_check(key)
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            record_hash = KEY.unpack_from(self.mapping, HEADER.size + middle * RECORD.size)[0]
+            if record_hash < position_hash:
+                low = middle + 1
+            elif record_hash > position_hash:
+                high = middle
+            else:
+                _, value, mask, depth, flag, origin, target, _, record_check = \
+                    RECORD.unpack_from(self.mapping, HEADER.size + middle * RECORD.size)
+                if record_check != check:
+                    return None
+                return depth, flag, value, unpack_move(origin, target, mask)
+        return None
+
+    """
+        Read all the records of the file as it is now.
+
+        :return: the generation of the file and a dictionary from hash to record tuple.
+    """
+
+    def read_records(self):
+        try:
+            with open(self.path, 'rb') as store_file:
+                data = store_file.read()
+        except OSError:
+            return 0, {}
+        if len(data) < HEADER.size:
+            return 0, {}
+        magic, generation, count = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or len(data) < HEADER.size + count * RECORD.size:
+            return 0, {}
+        return generation, {record[0]: record for record in RECORD.iter_unpack(
+            data[HEADER.size:HEADER.size + count * RECORD.size])}
+
+    """
+        Add the results of a game to the file.
+
+        Arguments:
+        entries: iterable of (canonical key, depth, flag, value, move key), with the value from the
+                 point of view of the player to move in the canonical position.
+                 Without entries the file is left as it is.
+    """
+
+    def merge(self, entries):
+        entries = list(entries)
+        if not entries:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path + '.lock', 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                generation, records = self.read_records()
+                generation = (generation + 1) % 0x10000
+                for key, depth, flag, value, move in entries:
+                    position_hash, check = hash_and_check(key)
+                    old = records.get(position_hash)
+                    if old is not None and old[3] > depth:
+                        continue
+                    origin, target, mask = pack_move(move)
+                    records[position_hash] = (position_hash, value, mask, min(depth, 255), flag,
+                                              origin, target, generation, check)
+                kept = list(records.values())
+                if len(kept) > self.size:
+                    kept.sort(key=lambda record: record[3] - ((generation - record[7]) % 0x10000) / AGE_PENALTY,
+                              reverse=True)
+                    kept = kept[:self.size]
+                kept.sort()
+                self.write(generation, kept)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def write(self, generation, records):
+        # Only needed when the store is saved, at the end of the process.
+        import tempfile
+        descriptor, temporary_path = tempfile.mkstemp(dir=os.path.dirname(self.path))
+        try:
+            with os.fdopen(descriptor, 'wb') as store_file:
+                store_file.write(HEADER.pack(MAGIC, generation, len(records)))
+                for record in records:
+                    store_file.write(RECORD.pack(*record))
+                store_file.flush()
+                os.fsync(store_file.fileno())
+            os.chmod(temporary_path, 0o644)
+            os.replace(temporary_path, self.path)
+        except OSError:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
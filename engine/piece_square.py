@@ -0,0 +1,90 @@
+# ===============================================================================
+# Imports
+# ===============================================================================
+from checkers.consts import EM, PAWN_COLOR, KING_COLOR, OPPONENT_COLOR
+
+# ===============================================================================
+# Globals
+# ===============================================================================
+# Regions of the board with a positional weight.
+LAST_ROW = 'last_row'
+CENTER = 'center'
+MIDDLE_ROW = 'middle_row'
+# Material weights, the same on every square.
+PAWN = 'pawn'
+KING = 'king'
+
+# Red guards row 0 and black row 7.
+LAST_ROW_SQUARES = {'r': tuple((0, col) for col in range(8)), 'b': tuple((7, col) for col in range(8))}
+# Rows 3 and 4, columns 2-5 are the center and columns 0, 1, 6 and 7 the sides of the middle rows.
+CENTER_SQUARES = tuple((row, col) for row in (3, 4) for col in range(2, 6))
+MIDDLE_ROW_SQUARES = tuple((row, col) for row in (3, 4) for col in (0, 1, 6, 7))
+
+# Tables already built in this process, by weights and color.
+built_tables = {}
+
+
+# ===============================================================================
+# Tables
+# ===============================================================================
+
+"""
+    Build the value of every piece on every square for a player: the material weight of the piece
+    plus the weights of the regions the square is in for the color of the piece, positive for the
+    pieces of the player and negative for those of the rival.
+
+    Arguments:
+    weights: dictionary from PAWN, KING, LAST_ROW, CENTER and MIDDLE_ROW to the weights.
+    color: the color of the player.
+
+    :return: dictionary from piece to a dictionary from square to value, shared by all the players of the
+             process with the same weights and color, so it must not be changed.
+"""
+
+
+def build_table(weights, color):
+    key = (tuple(sorted(weights.items())), color)
+    if key not in built_tables:
+        built_tables[key] = compile_table(weights, color)
+    return built_tables[key]
+
+
+def compile_table(weights, color):
+    table = {}
+    for piece_color, sign in ((color, 1), (OPPONENT_COLOR[color], -1)):
+        for piece, material in ((PAWN_COLOR[piece_color], weights[PAWN]), (KING_COLOR[piece_color], weights[KING])):
+            values = {(row, col): material for row in range(8) for col in range(8)}
+            for region, squares in ((LAST_ROW, LAST_ROW_SQUARES[piece_color]), (CENTER, CENTER_SQUARES),
+                                    (MIDDLE_ROW, MIDDLE_ROW_SQUARES)):
+                for loc in squares:
+                    values[loc] += weights[region]
+            table[piece] = {loc: sign * value for loc, value in values.items()}
+    return table
+
+
+class PieceSquareTables:
+    """
+        The material and positional terms of the utility as one value per piece and square,
+        so the board is evaluated with one lookup for every occupied square.
+        The table is built again by set_weights, so the weights can be tuned without any cost during the search.
+
+        Arguments:
+        weights: the weights of build_table.
+        color: the color of the player.
+    """
+
+    def __init__(self, weights, color):
+        self.color = color
+        self.table = None
+        self.set_weights(weights)
+
+    def set_weights(self, weights):
+        self.table = build_table(weights, self.color)
+
+    """
+        :return: the material and positional value of the board for the player.
+    """
+
+    def evaluate(self, board):
+        table = self.table
+        return sum(table[value][loc] for loc, value in board.items() if value != EM)
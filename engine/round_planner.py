@@ -0,0 +1,94 @@
+# ===============================================================================
+# Imports
+# ===============================================================================
+import math
+
+# ===============================================================================
+# Globals
+# ===============================================================================
+# Criticality of a turn with the usual number of moves and no threats.
+NORMAL_WEIGHT = 1.0
+# The number of moves of a typical position, the weight of a turn grows with the square root of its moves
+# relative to it, within the limits.
+TYPICAL_MOVES = 8
+MIN_BRANCHING_FACTOR = 0.5
+MAX_BRANCHING_FACTOR = 2.0
+# How much of the difference between the criticality of this turn and the usual one is expected
+# to remain on the next turn, threats last a few moves.
+PERSISTENCE = 0.5
+# Weight of the criticality of a new turn in the usual criticality of the game.
+WEIGHT_SMOOTHING = 0.2
+# Every later turn of the round keeps at least this part of an even share of the time.
+MIN_TURN_SHARE = 0.3
+
+
+# ===============================================================================
+# Round planner
+# ===============================================================================
+
+"""
+    Criticality of a turn from its threats and its moves.
+
+    Arguments:
+    threat_weight: how much the threats on the board call for time, 1 when there are none.
+    moves: the number of possible moves, a forced move gets no weight.
+
+    :return: the weight of the turn.
+"""
+
+
+def turn_weight(threat_weight, moves):
+    if moves <= 1:
+        return 0.0
+    branching = min(MAX_BRANCHING_FACTOR, max(MIN_BRANCHING_FACTOR, math.sqrt(moves / TYPICAL_MOVES)))
+    return threat_weight * branching
+
+
+class RoundPlanner:
+    """
+        Share the time of a round of k turns between its turns according to how critical they are.
+
+        On every turn the planner forecasts the weights of the turns left in the round: the current
+        turn has its own weight, and the weight of the later turns goes back from it to the usual
+        weight of the game, which is learnt from the turns played so far, forced moves included.
+        The current turn gets its part of the time left after the safety margins of all the turns,
+        never less than MIN_TURN_SHARE of an even share and never so much that a later turn gets less.
+        The plan is made again on every turn, so time saved by a forced move or by an early answer
+        goes to the turns that are left, and the last turn gets what remains.
+    """
+
+    def __init__(self):
+        self.usual_weight = NORMAL_WEIGHT
+
+    """
+        :return: the forecast weights of the turns left in the round, starting with the current one.
+    """
+
+    def forecast(self, weight, turns_remaining):
+        return [weight] + [self.usual_weight + (weight - self.usual_weight) * PERSISTENCE ** turn
+                           for turn in range(1, turns_remaining)]
+
+    """
+        Plan the round and learn from the weight of the turn.
+
+        Arguments:
+        weight: the weight of the current turn, from turn_weight.
+        turns_remaining: the turns left in the round, the current one included.
+        time_remaining: the time left in the round.
+        safety_margin: the time to keep aside for the overhead of every turn.
+
+        :return: the time for the current turn.
+    """
+
+    def time_for_turn(self, weight, turns_remaining, time_remaining, safety_margin):
+        self.usual_weight += WEIGHT_SMOOTHING * (weight - self.usual_weight)
+        available = time_remaining - turns_remaining * safety_margin
+        if turns_remaining <= 1:
+            return time_remaining - safety_margin
+        if available <= 0:
+            return max(0.0, time_remaining / turns_remaining - safety_margin)
+        weights = self.forecast(weight, turns_remaining)
+        total = sum(weights)
+        share = available * weight / total if total > 0 else available / turns_remaining
+        floor = MIN_TURN_SHARE * available / turns_remaining
+        return min(max(share, floor), available - (turns_remaining - 1) * floor)
@@ -0,0 +1,400 @@
+# ===============================================================================
+# Imports
+# ===============================================================================
+import copy
+from utils import INFINITY
+from checkers.consts import PAWN_COLOR, KING_COLOR, MAX_TURNS_NO_JUMP
+from players.engine.keys import position_key
+from players.engine.transposition import EXACT, LOWER_BOUND, UPPER_BOUND, move_key, find_move
+from players.engine.memory import CHECK_INTERVAL, MOVE_BYTES, STATE_BYTES
+
+# ===============================================================================
+# Globals
+# ===============================================================================
+DRAW_SCORE = 0
+# How much of a leaf score is given up when the no-jump counter is about to run out.
+NO_JUMP_DAMPING = 0.5
+KINGS = frozenset(KING_COLOR.values())
+# Red pawns become kings on row 7, black pawns on row 0.
+PROMOTION_ROW = {PAWN_COLOR['r']: 7, PAWN_COLOR['b']: 0}
+
+# Width of the window used to test a move against the best move found so far.
+NULL_WINDOW = 1e-6
+# Drivers of the iterations of the iterative deepening: one search with the full window, or MTD(f).
+ALPHA_BETA = 'alpha_beta'
+MTDF = 'mtdf'
+# MTD(f) stops after this many zero-window searches even if the bounds did not meet.
+MTDF_MAX_PASSES = 32
+# Late move reductions: the first moves of every node are always searched to full depth,
+# and only nodes with enough depth left are reduced.
+LMR_FULL_DEPTH_MOVES = 3
+LMR_MIN_DEPTH = 3
+LMR_REDUCTION = 1
+
+# Selective deepening: a line is extended by at most this many plies beyond the horizon,
+# and at most EXTENSION_BUDGET positions are extended while choosing a move.
+MAX_EXTENSION_PLIES = 4
+EXTENSION_BUDGET = 5000
+
+
+# ===============================================================================
+# Helpers
+# ===============================================================================
+
+"""
+    A move can only lead back to an earlier position if it is a king move that does not jump,
+    pawns never move backwards and a jump removes a piece for good.
+
+    :return: True if the move may repeat an earlier position.
+"""
+
+
+def is_reversible(state, move):
+    return not move.jumped_locs and state.board[move.origin_loc] in KINGS
+
+
+"""
+    :return: True if the move turns a pawn into a king.
+"""
+
+
+def is_promotion(state, move):
+    return PROMOTION_ROW.get(state.board[move.origin_loc]) == move.target_loc[0]
+
+
+# ===============================================================================
+# Search
+# ===============================================================================
+
+class AlphaBetaSearch:
+    """
+        Minimax with alpha-beta pruning, with the same interface as utils.MiniMaxWithAlphaBetaPruning.
+
+        Draws: a position where MAX_TURNS_NO_JUMP turns passed without a jump is a draw, and so is a
+        position that already appeared on the current path or earlier in the game.
+        Both are scored as DRAW_SCORE immediately instead of being expanded.
+        Leaf scores are pulled towards a draw as the no-jump counter grows, so when the player is
+        ahead it prefers the moves that reset the counter.
+
+        The search fails soft: a value outside the window is a bound on the value of the state,
+        not the edge of the window, so the table and the MTD(f) driver get the tightest bound found.
+
+        Principal variation search: the first move of a node is searched with the full window and
+        the others with a null window, a move that fails high is searched again with the full window.
+
+        Late move reductions: quiet moves that are ordered late are searched one ply shallower,
+        and searched again to full depth if they turn out to be better than the best move so far.
+        Jumps, promotions and positions where is_tactical is True are never reduced.
+
+        Selective deepening: a position at the horizon for which selective_deepening is True is
+        expanded instead of evaluated, up to max_extension_plies beyond the horizon.
+        The number of extended positions is limited by max_extensions for the whole life of the
+        search object, which is created once for every move, and selective_deepening is expected
+        to return False when the time for the move is about to run out.
+
+        Transposition table: the result of every completed node is stored in transposition_table,
+        and a later visit of the same position below the root uses it to narrow or skip the
+        search. The stored best move is searched first. The table can outlive the search object,
+        so what was learnt while choosing one move is used when choosing the next one.
+        A value that depends on the line that led to the position, because a repetition below it
+        was scored as a draw, is not stored.
+
+        Memory: every CHECK_INTERVAL nodes the search gives memory_budget the size of the move lists
+        and state copies of the current line, and the budget shrinks the tables and caches if needed.
+        When even that is not enough the search stops as if the time ran out.
+
+        Arguments:
+        utility: evaluation function of a state from my_color point of view.
+        my_color: the color of the searching player.
+        no_more_time: function that returns True when the search must stop.
+        selective_deepening: criterion for extending the search beyond depth 0.
+        history: keys of the positions that were already played since the last irreversible move.
+        principal_variation: use null windows for all the moves but the first.
+        late_move_reductions: reduce the depth of late quiet moves.
+        is_tactical: function that returns True for a state that must not be reduced.
+        max_extension_plies: how far beyond the horizon a line can be extended.
+        max_extensions: how many positions can be extended.
+        transposition_table: a players.engine.transposition.TranspositionTable, or None.
+        memory_budget: a players.engine.memory.MemoryBudget, or None.
+    """
+
+    def __init__(self, utility, my_color, no_more_time, selective_deepening, history=(),
+                 principal_variation=False, late_move_reductions=False, is_tactical=None,
+                 max_extension_plies=MAX_EXTENSION_PLIES, max_extensions=EXTENSION_BUDGET,
+                 transposition_table=None, memory_budget=None):
+        self.utility = utility
+        self.my_color = my_color
+        self.no_more_time = no_more_time
+        self.selective_deepening = selective_deepening
+        self.path = set(history)
+        self.principal_variation = principal_variation
+        self.late_move_reductions = late_move_reductions
+        self.is_tactical = is_tactical if is_tactical is not None else (lambda state: False)
+        self.max_extension_plies = max_extension_plies
+        self.max_extensions = max_extensions
+        self.extensions = 0
+        self.transposition_table = transposition_table
+        self.memory_budget = memory_budget
+        if memory_budget is not None:
+            self.no_more_time = lambda: no_more_time() or memory_budget.exhausted
+        # Moves generated by the nodes of the current line.
+        self.live_moves = 0
+        self.nodes = 0
+        # Repetitions scored as a draw, a node that sees this change has a value that depends on its path.
+        self.repetitions = 0
+        # Zero-window searches made by mtdf.
+        self.zero_window_passes = 0
+        # Distance from the root of the position being searched.
+        self.ply = 0
+
+    """
+        Score a leaf, scaled down towards a draw according to the number of turns since last jump.
+    """
+
+    def evaluate(self, state):
+        value = self.utility(state)
+        if -INFINITY < value < INFINITY:
+            value *= 1 - NO_JUMP_DAMPING * state.turns_since_last_jump / MAX_TURNS_NO_JUMP
+        return value
+
+    """
+        The best move from the transposition table first, then jumps and promotions.
+        The framework already forces a jump when there is one, so apart from the table move
+        this only matters for the order of the quiet moves.
+    """
+
+    def order_moves(self, state, moves, best_key=None):
+        return sorted(moves, key=lambda move: (best_key is None or move_key(move) != best_key,
+                                               -len(move.jumped_locs), not is_promotion(state, move)))
+
+    """
+        Same interface as utils.MiniMaxWithAlphaBetaPruning.search.
+
+        Arguments:
+        state: the state to search from.
+        depth: the remaining depth.
+        alpha, beta: the alpha-beta window.
+        maximizing_player: True if my_color is the player to move.
+
+        :return: the minimax value of the state and the best move (None for a minimizing node).
+    """
+
+    def search(self, state, depth, alpha, beta, maximizing_player):
+        self.nodes += 1
+        if self.memory_budget is not None and self.nodes % CHECK_INTERVAL == 0:
+            self.memory_budget.check(self.live_moves * MOVE_BYTES + self.ply * STATE_BYTES)
+        if state.turns_since_last_jump >= MAX_TURNS_NO_JUMP:
+            return DRAW_SCORE, None
+
+        if self.no_more_time() or (depth <= 0 and not self.extend(state, depth)):
+            return self.evaluate(state), None
+
+        next_moves = state.get_possible_moves()
+        if not next_moves:
+            # The player to move has no moves left, so the other player won.
+            return (INFINITY if state.curr_player != self.my_color else -INFINITY), None
+
+        entry = None
+        use_table = self.transposition_table is not None and depth > 0
+        if use_table:
+            entry = self.transposition_table.probe(state, depth)
+            if entry is not None and self.ply > 0:
+                value = self.transposition_table.cutoff(entry, depth, alpha, beta)
+                if value is not None:
+                    return value, None
+        original_alpha, original_beta = alpha, beta
+        repetitions = self.repetitions
+
+        next_moves = self.order_moves(state, next_moves, entry[3] if entry is not None else None)
+        self.live_moves += len(next_moves)
+        selected_move = next_moves[0]
+        best_value = -INFINITY if maximizing_player else INFINITY
+        for index, move in enumerate(next_moves):
+            new_state = copy.deepcopy(state)
+            new_state.perform_move(move)
+
+            child_key = None
+            if is_reversible(state, move):
+                child_key = position_key(new_state)
+            if child_key is not None and child_key in self.path:
+                value = DRAW_SCORE
+                self.repetitions += 1
+            else:
+                if child_key is not None:
+                    self.path.add(child_key)
+                self.ply += 1
+                value = self.search_child(state, move, new_state, index, depth, alpha, beta, maximizing_player)
+                self.ply -= 1
+                if child_key is not None:
+                    self.path.discard(child_key)
+
+            if maximizing_player:
+                if value > best_value:
+                    best_value = value
+                    selected_move = move
+                alpha = max(alpha, value)
+            else:
+                if value < best_value:
+                    best_value = value
+                    selected_move = move
+                beta = min(beta, value)
+            if beta <= alpha or self.no_more_time():
+                break
+        self.live_moves -= len(next_moves)
+
+        if use_table and not self.no_more_time() and self.repetitions == repetitions:
+            if best_value <= original_alpha:
+                flag = UPPER_BOUND
+            elif best_value >= original_beta:
+                flag = LOWER_BOUND
+            else:
+                flag = EXACT
+            self.transposition_table.store(state, depth, flag, best_value, move_key(selected_move))
+
+        if maximizing_player:
+            return best_value, selected_move
+        return best_value, None
+
+    """
+        MTD(f): find the value of the state with a series of zero-window searches, each one moving
+        a bound towards the value, starting from a guess. The transposition table keeps what every
+        search learnt, so the next one goes over much less of the tree. The series stops when the
+        bounds meet, after MTDF_MAX_PASSES searches, or when the time runs out.
+
+        Arguments:
+        state: the state to search from, my_color is the player to move.
+        depth: the remaining depth.
+        first_guess: the expected value, usually the value of the previous iteration.
+                     The evaluation of the state is used when it is not finite.
+        fallback_move: the best move of the previous iteration. When no search failed high,
+                       no move was proven, and this move is returned instead, or the move of the
+                       transposition table when there is none.
+
+        :return: the value of the state and the best move, like search. The move is None when
+                 no search failed high and there is no move to fall back on.
+    """
+
+    def mtdf(self, state, depth, first_guess, fallback_move=None):
+        if fallback_move is None:
+            fallback_move = self.table_move(state)
+        value = first_guess if -INFINITY < first_guess < INFINITY else self.evaluate(state)
+        lower, upper = -INFINITY, INFINITY
+        best_move = None
+        passes = 0
+        while lower < upper and passes < MTDF_MAX_PASSES:
+            beta = value + NULL_WINDOW if value == lower else value
+            value, move = self.search(state, depth, beta - NULL_WINDOW, beta, True)
+            passes += 1
+            if value < beta:
+                upper = value
+            else:
+                # Only a search that fails high proves that its move reaches the bound.
+                lower = value
+                best_move = move
+            if self.no_more_time():
+                break
+        self.zero_window_passes += passes
+        return value, best_move if best_move is not None else fallback_move
+
+    """
+        :return: the best move stored in the transposition table for the state, None if there is none.
+    """
+
+    def table_move(self, state):
+        if self.transposition_table is None:
+            return None
+        entry = self.transposition_table.lookup(state)
+        if entry is None:
+            return None
+        return find_move(state.get_possible_moves(), entry[3])
+
+    """
+        Follow the best moves stored in the transposition table from a position.
+
+        Arguments:
+        state: the position to start from, it is not changed.
+        depth: the maximal number of moves to follow.
+
+        :return: the list of moves of the principal variation.
+    """
+
+    def principal_variation_moves(self, state, depth):
+        moves = []
+        seen = set()
+        while self.transposition_table is not None and len(moves) < depth:
+            key = position_key(state)
+            entry = self.transposition_table.lookup(state)
+            if entry is None or key in seen:
+                break
+            seen.add(key)
+            move = find_move(state.get_possible_moves(), entry[3])
+            if move is None:
+                break
+            moves.append(move)
+            state = copy.deepcopy(state)
+            state.perform_move(move)
+        return moves
+
+    """
+        Decide whether a position at the horizon is expanded, and charge it to the budget.
+
+        Arguments:
+        state: the position at the horizon.
+        depth: the remaining depth, zero at the horizon and negative beyond it.
+
+        :return: True if the position is expanded.
+    """
+
+    def extend(self, state, depth):
+        if depth <= -self.max_extension_plies or self.extensions >= self.max_extensions:
+            return False
+        if not self.selective_deepening(state):
+            return False
+        self.extensions += 1
+        return True
+
+    """
+        Search the state after a move.
+        The first move gets the full window and full depth, the other moves are first tested
+        with a null window and a reduced depth and searched again only if they may be better.
+
+        :return: the minimax value of new_state.
+    """
+
+    def search_child(self, state, move, new_state, index, depth, alpha, beta, maximizing_player):
+        child_depth = depth - 1
+        if index == 0 or not (self.principal_variation or self.late_move_reductions):
+            return self.search(new_state, child_depth, alpha, beta, not maximizing_player)[0]
+
+        if not self.principal_variation:
+            window = (alpha, beta)
+        elif maximizing_player:
+            window = (alpha, alpha + NULL_WINDOW)
+        else:
+            window = (beta - NULL_WINDOW, beta)
+
+        reduced_depth = child_depth - self.reduction(state, move, new_state, index, depth)
+        value = self.search(new_state, reduced_depth, window[0], window[1], not maximizing_player)[0]
+        if reduced_depth < child_depth and self.improves(value, alpha, beta, maximizing_player):
+            value = self.search(new_state, child_depth, window[0], window[1], not maximizing_player)[0]
+        if self.principal_variation and alpha < value < beta:
+            value = self.search(new_state, child_depth, alpha, beta, not maximizing_player)[0]
+        return value
+
+    """
+        :return: True if the value is better for the player to move than the best value so far.
+    """
+
+    def improves(self, value, alpha, beta, maximizing_player):
+        return value > alpha if maximizing_player else value < beta
+
+    """
+        :return: the number of plies the move is reduced by.
+    """
+
+    def reduction(self, state, move, new_state, index, depth):
+        if not self.late_move_reductions or index < LMR_FULL_DEPTH_MOVES or depth < LMR_MIN_DEPTH:
+            return 0
+        if move.jumped_locs or is_promotion(state, move) or self.is_tactical(new_state):
+            return 0
+        return LMR_REDUCTION
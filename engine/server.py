@@ -0,0 +1,461 @@
+# ===============================================================================
+# Imports
+# ===============================================================================
+import argparse
+import asyncio
+import contextlib
+import importlib
+import io
+import itertools
+import multiprocessing
+import os
+import pickle
+import signal
+import socket
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+from players.engine.transposition import move_key
+from players.engine.shared_table import SharedTranspositionTable, SHARED_TABLE_ENV
+
+# ===============================================================================
+# Globals
+# ===============================================================================
+DEFAULT_SOCKET = '/tmp/ai2_checkers.sock'
+DEFAULT_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+MAX_SESSIONS = 256
+# get_move calls waiting for a worker, beyond this the server stops reading from the clients.
+MAX_PENDING_MOVES = 64
+# Messages are pickled and sent with their length in front.
+LENGTH = struct.Struct('>I')
+# Only the user that runs the server may connect to its socket, since a pickled message can run any code.
+SOCKET_MODE = 0o600
+
+
+# ===============================================================================
+# Messages
+# ===============================================================================
+# The socket is a unix socket only its owner can connect to, and the server trusts its clients,
+# the messages are pickled objects:
+#   {'op': 'open', 'player': 'improved_better_h_player', 'color': 'r', 'setup_time': 2,
+#    'time_per_k_turns': 1.0, 'k': 5}                      -> {'ok': True, 'session': id, 'warm': bool}
+#   {'op': 'move', 'session': id, 'state': state, 'moves': possible_moves}
+#                                                          -> {'ok': True, 'move': index, 'time': seconds}
+#   {'op': 'close', 'session': id}                         -> {'ok': True}
+# A failed request is answered with {'ok': False, 'error': reason}.
+
+def send_message(sock, message):
+    data = pickle.dumps(message, pickle.HIGHEST_PROTOCOL)
+    sock.sendall(LENGTH.pack(len(data)) + data)
+
+
+def receive_message(sock):
+    header = receive_exactly(sock, LENGTH.size)
+    return pickle.loads(receive_exactly(sock, LENGTH.unpack(header)[0]))
+
+
+def receive_exactly(sock, size):
+    data = b''
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError('connection closed')
+        data += chunk
+    return data
+
+
+async def read_message(reader):
+    header = await reader.readexactly(LENGTH.size)
+    return pickle.loads(await reader.readexactly(LENGTH.unpack(header)[0]))
+
+
+async def write_message(writer, message):
+    data = pickle.dumps(message, pickle.HIGHEST_PROTOCOL)
+    writer.write(LENGTH.pack(len(data)) + data)
+    await writer.drain()
+
+
+# ===============================================================================
+# Worker processes
+# ===============================================================================
+
+"""
+    Give a player of a finished game a new one: a full round clock for the time control of the
+    session, and no history of the previous game. Its tables, caches and calibration stay warm.
+
+    Arguments:
+    player: a player whose session was closed.
+    payload: the open request of the new session.
+"""
+
+
+def reset_player(player, payload):
+    player.time_per_k_turns = payload['time_per_k_turns']
+    player.k = payload['k']
+    player.time_remaining_in_round = payload['time_per_k_turns']
+    player.turns_remaining_in_round = payload['k']
+    if hasattr(player, 'reset_game'):
+        player.reset_game()
+
+
+"""
+    Main loop of a worker process. The players of the sessions given to the worker live here for
+    the whole session, with their transposition tables and caches, and every move of a session is
+    played by the same worker.
+    When a session is closed its player is kept, one for every player module and color, and the next
+    session of the same player and color gets it instead of building and calibrating a cold one.
+
+    Arguments:
+    connection: the worker end of a multiprocessing pipe.
+"""
+
+
+def worker_main(connection):
+    players = {}
+    # The (player module, color) of every session, and the kept player of each.
+    player_keys = {}
+    idle_players = {}
+    while True:
+        try:
+            request = connection.recv()
+        except EOFError:
+            # The server is gone.
+            return
+        if request is None:
+            return
+        op, session, payload = request
+        try:
+            if op == 'open':
+                key = (payload['player'], payload['color'])
+                player = idle_players.pop(key, None)
+                warm = player is not None
+                if warm:
+                    reset_player(player, payload)
+                else:
+                    module = importlib.import_module('players.' + payload['player'])
+                    player = module.Player(payload['setup_time'], payload['color'],
+                                           payload['time_per_k_turns'], payload['k'])
+                players[session] = player
+                player_keys[session] = key
+                connection.send({'ok': True, 'warm': warm})
+            elif op == 'move':
+                state, moves = payload
+                start = time.process_time()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    move = players[session].get_move(state, moves)
+                elapsed = time.process_time() - start
+                keys = [move_key(possible) for possible in moves]
+                connection.send({'ok': True, 'move': keys.index(move_key(move)), 'time': elapsed})
+            elif op == 'close':
+                player = players.pop(session, None)
+                key = player_keys.pop(session, None)
+                if hasattr(player, 'game_over'):
+                    player.game_over()
+                if player is not None:
+                    idle_players.setdefault(key, player)
+                connection.send({'ok': True})
+        except Exception as error:
+            connection.send({'ok': False, 'error': '{}: {}'.format(type(error).__name__, error)})
+
+
+class WorkerLost(Exception):
+    pass
+
+
+class Worker:
+    """
+        A worker process, the pipe to it and the thread that talks to it. call blocks, and is run
+        in the thread of its worker, one request at a time, so the event loop keeps serving the
+        other sessions and a long move on one worker never holds up the requests of another.
+        call raises WorkerLost when the process is gone.
+    """
+
+    def __init__(self, context):
+        self.connection, worker_connection = context.Pipe()
+        self.process = context.Process(target=worker_main, args=(worker_connection,), daemon=True)
+        self.process.start()
+        self.thread = ThreadPoolExecutor(max_workers=1)
+        self.sessions = 0
+
+    def call(self, op, session, payload=None):
+        try:
+            self.connection.send((op, session, payload))
+            return self.connection.recv()
+        except (EOFError, OSError) as error:
+            raise WorkerLost('worker {} died: {}'.format(self.process.pid, type(error).__name__))
+
+    def stop(self):
+        self.thread.shutdown()
+        try:
+            self.connection.send(None)
+        except OSError:
+            pass
+        self.process.join()
+
+    """
+        Let go of a worker that died. Run in the thread of the worker, after the requests that
+        were already waiting for it, which fail at once.
+    """
+
+    def discard(self):
+        self.connection.close()
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.thread.shutdown(wait=False)
+
+
+# ===============================================================================
+# Sessions
+# ===============================================================================
+
+class Session:
+    """
+        A player in one game, with the round clock the server enforces for it:
+        at most time_per_k_turns seconds of the player's process time for every k turns.
+    """
+
+    def __init__(self, session_id, worker, time_per_k_turns, k):
+        self.session_id = session_id
+        self.worker = worker
+        self.time_per_k_turns = time_per_k_turns
+        self.k = k
+        self.turns_remaining_in_round = k
+        self.time_remaining_in_round = time_per_k_turns
+
+    """
+        Charge a move to the round clock.
+
+        :return: False if the player exceeded the time of the round.
+    """
+
+    def charge(self, seconds):
+        self.time_remaining_in_round -= seconds
+        if self.time_remaining_in_round < 0:
+            return False
+        self.turns_remaining_in_round -= 1
+        if self.turns_remaining_in_round == 0:
+            self.turns_remaining_in_round = self.k
+            self.time_remaining_in_round = self.time_per_k_turns
+        return True
+
+
+# ===============================================================================
+# Server
+# ===============================================================================
+
+class GameServer:
+    """
+        Long lived server that hosts many concurrent games against a pool of worker processes.
+
+        Clients open sessions over a unix socket, and every session is placed on the worker with
+        the fewest sessions, where its player stays warm until the session is closed, and then
+        waits there for the next session of the same player and color.
+        get_move requests wait for a free slot when MAX_PENDING_MOVES of them are already waiting
+        for workers; while a connection waits nothing more is read from it, so busy clients slow
+        down instead of piling up requests. Sessions beyond max_sessions are refused.
+        A worker that dies is replaced by a new one, and its sessions, whose players died with it,
+        are forfeited: their requests are answered with an error until the client closes them.
+
+        Arguments:
+        workers: the number of worker processes.
+        max_sessions: the number of sessions that can be open at the same time.
+        max_pending: the number of get_move requests that can wait for the workers.
+        shared_table_slots: when given, the workers share a transposition table of this size.
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS, max_sessions=MAX_SESSIONS, max_pending=MAX_PENDING_MOVES,
+                 shared_table_slots=None):
+        self.shared_table = None
+        if shared_table_slots:
+            self.shared_table = SharedTranspositionTable.create(slots=shared_table_slots)
+            os.environ[SHARED_TABLE_ENV] = self.shared_table.memory.name
+        self.context = multiprocessing.get_context('spawn')
+        self.workers = [Worker(self.context) for _ in range(workers)]
+        self.max_sessions = max_sessions
+        self.pending = asyncio.Semaphore(max_pending)
+        self.sessions = {}
+        # Sessions of workers that died, until their clients close them.
+        self.forfeited = set()
+        self.session_ids = itertools.count(1)
+
+    async def call(self, worker, op, session_id, payload=None):
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(worker.thread, worker.call, op, session_id, payload)
+        except WorkerLost as error:
+            self.replace_worker(worker)
+            return {'ok': False, 'error': str(error)}
+
+    """
+        Start a new worker in place of one that died, and forfeit the sessions of the dead one.
+    """
+
+    def replace_worker(self, worker):
+        if worker not in self.workers:
+            return
+        self.workers[self.workers.index(worker)] = Worker(self.context)
+        for session_id, session in list(self.sessions.items()):
+            if session.worker is worker:
+                del self.sessions[session_id]
+                self.forfeited.add(session_id)
+        worker.thread.submit(worker.discard)
+
+    def unknown_session(self, session_id):
+        if session_id in self.forfeited:
+            return {'ok': False, 'error': 'worker died'}
+        return {'ok': False, 'error': 'unknown session'}
+
+    async def open_session(self, request):
+        if len(self.sessions) >= self.max_sessions:
+            return {'ok': False, 'error': 'busy'}
+        worker = min(self.workers, key=lambda candidate: candidate.sessions)
+        session_id = next(self.session_ids)
+        reply = await self.call(worker, 'open', session_id, request)
+        if not reply['ok']:
+            return reply
+        worker.sessions += 1
+        self.sessions[session_id] = Session(session_id, worker, request['time_per_k_turns'], request['k'])
+        return {'ok': True, 'session': session_id, 'warm': reply['warm']}
+
+    async def close_session(self, session_id):
+        session = self.sessions.pop(session_id, None)
+        if session is None:
+            reply = self.unknown_session(session_id)
+            self.forfeited.discard(session_id)
+            return reply
+        session.worker.sessions -= 1
+        return await self.call(session.worker, 'close', session_id)
+
+    async def get_move(self, request):
+        session = self.sessions.get(request['session'])
+        if session is None:
+            return self.unknown_session(request['session'])
+        async with self.pending:
+            reply = await self.call(session.worker, 'move', session.session_id, (request['state'], request['moves']))
+        if reply['ok'] and not session.charge(reply['time']):
+            await self.close_session(session.session_id)
+            return {'ok': False, 'error': 'time forfeit'}
+        return reply
+
+    async def handle_request(self, request):
+        op = request.get('op')
+        if op == 'open':
+            return await self.open_session(request)
+        if op == 'move':
+            return await self.get_move(request)
+        if op == 'close':
+            return await self.close_session(request['session'])
+        return {'ok': False, 'error': 'unknown op {}'.format(op)}
+
+    """
+        Serve one client connection, its requests are answered in order.
+        The sessions it opened are closed when it disconnects.
+    """
+
+    async def handle_connection(self, reader, writer):
+        opened = set()
+        try:
+            while True:
+                try:
+                    request = await read_message(reader)
+                except asyncio.IncompleteReadError:
+                    break
+                reply = await self.handle_request(request)
+                if request.get('op') == 'open' and reply['ok']:
+                    opened.add(reply['session'])
+                elif request.get('op') == 'close':
+                    opened.discard(request.get('session'))
+                await write_message(writer, reply)
+        finally:
+            for session_id in opened:
+                if session_id in self.sessions:
+                    await self.close_session(session_id)
+                self.forfeited.discard(session_id)
+            writer.close()
+
+    async def serve(self, path=DEFAULT_SOCKET):
+        if os.path.exists(path):
+            os.remove(path)
+        # Created with no access for the others, and narrowed to the owner before any client is accepted.
+        previous_umask = os.umask(0o077)
+        try:
+            server = await asyncio.start_unix_server(self.handle_connection, path)
+        finally:
+            os.umask(previous_umask)
+        os.chmod(path, SOCKET_MODE)
+        async with server:
+            await server.serve_forever()
+
+    def stop(self):
+        for worker in self.workers:
+            worker.stop()
+        if self.shared_table is not None:
+            self.shared_table.close()
+            self.shared_table.unlink()
+
+
+# ===============================================================================
+# Client
+# ===============================================================================
+
+class GameClient:
+    """
+        Blocking client for a harness that plays its games through the server.
+        The requests of a connection are answered one at a time, so concurrent games should use
+        a client each.
+    """
+
+    def __init__(self, path=DEFAULT_SOCKET):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(path)
+
+    def request(self, message):
+        send_message(self.sock, message)
+        reply = receive_message(self.sock)
+        if not reply['ok']:
+            raise RuntimeError(reply['error'])
+        return reply
+
+    def open_session(self, player, color, setup_time, time_per_k_turns, k):
+        return self.request({'op': 'open', 'player': player, 'color': color, 'setup_time': setup_time,
+                             'time_per_k_turns': time_per_k_turns, 'k': k})['session']
+
+    """
+        :return: the move the player chose, one of possible_moves.
+    """
+
+    def get_move(self, session, game_state, possible_moves):
+        reply = self.request({'op': 'move', 'session': session, 'state': game_state, 'moves': possible_moves})
+        return possible_moves[reply['move']]
+
+    def close_session(self, session):
+        self.request({'op': 'close', 'session': session})
+
+    def close(self):
+        self.sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve checkers players to many concurrent games.')
+    parser.add_argument('--socket', default=DEFAULT_SOCKET, help='path of the unix socket')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--max-sessions', type=int, default=MAX_SESSIONS)
+    parser.add_argument('--max-pending', type=int, default=MAX_PENDING_MOVES)
+    parser.add_argument('--shared-table-slots', type=int, default=None,
+                        help='share a transposition table of this many entries between the workers')
+    args = parser.parse_args()
+
+    server = GameServer(args.workers, args.max_sessions, args.max_pending, args.shared_table_slots)
+    # Stop the same way on a terminate signal as on ctrl-c, so the workers and the shared table are released.
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        asyncio.run(server.serve(args.socket))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
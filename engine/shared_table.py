@@ -0,0 +1,213 @@
+# ===============================================================================
+# Imports
+# ===============================================================================
+import os
+import struct
+import sys
+from players.engine.persistent_store import stable_hash
+from players.engine.transposition import TranspositionTable, NEGATED_FLAG
+
+# ===============================================================================
+# Globals
+# ===============================================================================
+# Worker processes attach to the table named in this environment variable.
+SHARED_TABLE_ENV = 'AI2_SHARED_TABLE'
+SHARED_TABLE_SLOTS = 1 << 20
+
+MAGIC = b'AI2SHTT3'
+# magic, number of slots, number of used slots
+HEADER = struct.Struct('<8sQQ')
+# A 64 bit word of the shared memory: the count of used slots, or the bits of a value.
+WORD = struct.Struct('<Q')
+USED_SLOTS_OFFSET = 16
+# hash xor data xor value bits, data, value bits
+SLOT = struct.Struct('<QQQ')
+# The value is kept as a 64 bit float, the zero-window searches tell apart values NULL_WINDOW apart.
+VALUE = struct.Struct('<d')
+NO_SQUARE = 63
+# data bits: depth (8) | flag (2) | origin (6) | target (6) | used (1)
+USED = 1 << 22
+
+
+# ===============================================================================
+# Helpers
+# ===============================================================================
+
+"""
+    :return: the data and the value bits of a slot.
+"""
+
+
+def pack_data(depth, flag, value, move):
+    if move is None:
+        origin = target = NO_SQUARE
+    else:
+        origin = move[0][0] * 8 + move[0][1]
+        target = move[1][0] * 8 + move[1][1]
+    value_bits = WORD.unpack(VALUE.pack(value))[0]
+    return min(depth, 255) | flag << 8 | origin << 10 | target << 16 | USED, value_bits
+
+
+def unpack_data(data, value_bits):
+    value = VALUE.unpack(WORD.pack(value_bits))[0]
+    depth = data & 0xFF
+    flag = data >> 8 & 0x3
+    origin = data >> 10 & 0x3F
+    target = data >> 16 & 0x3F
+    # The jumped squares are not kept, find_move matches such a move by its origin and target.
+    move = None if origin == NO_SQUARE else (divmod(origin, 8), divmod(target, 8), None)
+    return depth, flag, value, move
+
+
+"""
+    Attach to shared memory before python 3.13, which has no way to leave it out of the resource tracker.
+    Attaching registers the memory with the resource tracker, and a tracker of our own would unlink it
+    when this process exits although the creator owns it. A process started by the creator shares its
+    tracker and must leave the registration alone. Telling them apart reads a private attribute of
+    multiprocessing, which is why this is kept out of the table.
+"""
+
+
+def attach_untracked(name):
+    from multiprocessing import shared_memory, resource_tracker
+    own_tracker = getattr(resource_tracker._resource_tracker, '_fd', None) is None
+    memory = shared_memory.SharedMemory(name=name)
+    if own_tracker:
+        resource_tracker.unregister(memory._name, 'shared_memory')
+    return memory
+
+
+# ===============================================================================
+# Shared transposition table
+# ===============================================================================
+
+class SharedTranspositionTable(TranspositionTable):
+    """
+        A transposition table in shared memory, used by all the processes that attach to it.
+
+        The table is an array of 24 byte slots, the slot of a position is its stable hash modulo
+        the number of slots. A slot holds the data (depth, bound and move packed in 64 bits), the
+        bits of the value as a 64 bit float, and the hash xor both. There are no locks: a reader
+        that sees a slot while another process is writing it gets a check that does not match and
+        treats it as a miss. The header counts the used slots, it is not locked either, so with
+        writers in several processes the count is approximate.
+        A slot is replaced by a different position always, and by the same position only when
+        the new result is at least as deep.
+
+        Like the persistent store the values are from the point of view of the player to move in
+        the canonical position, so red and black players share the table.
+
+        Arguments:
+        memory: the multiprocessing.shared_memory.SharedMemory of the table.
+        color: the color of the searching player.
+    """
+
+    def __init__(self, memory, color):
+        TranspositionTable.__init__(self, symmetric=True, color=color)
+        self.memory = memory
+        self.buffer = memory.buf
+        magic, self.slots, _ = HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC:
+            raise ValueError('{} is not a shared transposition table'.format(memory.name))
+
+    """
+        Create a new empty table.
+
+        Arguments:
+        name: the name other processes attach with, None for a generated name.
+        slots: the number of entries.
+    """
+
+    @classmethod
+    def create(cls, name=None, slots=SHARED_TABLE_SLOTS, color=None):
+        # multiprocessing is imported by the processes that use a shared table only.
+        from multiprocessing import shared_memory
+        memory = shared_memory.SharedMemory(name=name, create=True, size=HEADER.size + slots * SLOT.size)
+        HEADER.pack_into(memory.buf, 0, MAGIC, slots, 0)
+        return cls(memory, color)
+
+    """
+        Attach to a table created by another process.
+    """
+
+    @classmethod
+    def attach(cls, name, color=None):
+        if sys.version_info >= (3, 13):
+            # The creator owns the memory, it is left out of the resource tracker of this process.
+            from multiprocessing import shared_memory
+            memory = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            memory = attach_untracked(name)
+        return cls(memory, color)
+
+    def slot_offset(self, position_hash):
+        return HEADER.size + (position_hash % self.slots) * SLOT.size
+
+    def lookup(self, state, depth=0):
+        key, symmetry = self.key(state)
+        position_hash = stable_hash(key)
+        check, data, value_bits = SLOT.unpack_from(self.buffer, self.slot_offset(position_hash))
+        if not data & USED or check ^ data ^ value_bits != position_hash:
+            return None
+        entry_depth, flag, value, move = unpack_data(data, value_bits)
+        if key[0] != self.color:
+            flag, value = NEGATED_FLAG[flag], -value
+        return self.from_canonical((entry_depth, flag, value, move), symmetry)
+
+    def store(self, state, depth, flag, value, move):
+        key, symmetry = self.key(state)
+        depth, flag, value, move = self.to_canonical((depth, flag, value, move), symmetry)
+        if key[0] != self.color:
+            flag, value = NEGATED_FLAG[flag], -value
+        position_hash = stable_hash(key)
+        offset = self.slot_offset(position_hash)
+        check, data, value_bits = SLOT.unpack_from(self.buffer, offset)
+        if data & USED and check ^ data ^ value_bits == position_hash and unpack_data(data, value_bits)[0] > depth:
+            return
+        if not data & USED:
+            used_slots = WORD.unpack_from(self.buffer, USED_SLOTS_OFFSET)[0]
+            WORD.pack_into(self.buffer, USED_SLOTS_OFFSET, used_slots + 1)
+        data, value_bits = pack_data(depth, flag, value, move)
+        SLOT.pack_into(self.buffer, offset, position_hash ^ data ^ value_bits, data, value_bits)
+
+    """
+        Nothing to save, the table lives as long as the process that created it.
+    """
+
+    def save(self):
+        pass
+
+    """
+        The shared memory has a fixed size and is owned by the process that created it,
+        it is not part of the budget of the players.
+    """
+
+    def memory_usage(self):
+        return 0
+
+    def shrink(self, fraction):
+        pass
+
+    def close(self):
+        self.buffer = None
+        self.memory.close()
+
+    def unlink(self):
+        self.memory.unlink()
+
+    def __len__(self):
+        return WORD.unpack_from(self.buffer, USED_SLOTS_OFFSET)[0]
+
+
+"""
+    Attach to the table named in the AI2_SHARED_TABLE environment variable.
+
+    :return: the table, None if the variable is not set.
+"""
+
+
+def attach_from_environment(color):
+    name = os.environ.get(SHARED_TABLE_ENV)
+    if not name:
+        return None
+    return SharedTranspositionTable.attach(name, color)
@@ -0,0 +1,304 @@
+# ===============================================================================
+# Imports
+# ===============================================================================
+import argparse
+import contextlib
+import copy
+import gc
+import importlib
+import io
+import json
+import multiprocessing
+import os
+import random
+import threading
+import time
+from checkers.game_state import GameState
+
+# ===============================================================================
+# Globals
+# ===============================================================================
+DEFAULT_PLAYERS = ['improved_better_h_player', 'improved_player']
+DEFAULT_GAMES = 2
+DEFAULT_TURNS = 60
+DEFAULT_TIME_PER_K_TURNS = 1.0
+DEFAULT_K = 5
+SETUP_TIME = 2
+# Collect garbage more often than the default while there is GC pressure.
+GC_THRESHOLD = (100, 5, 5)
+# Objects of the garbage thread that are allocated between two pauses.
+GARBAGE_BATCH = 1000
+
+
+# ===============================================================================
+# Load
+# ===============================================================================
+
+def pin(cpus):
+    if cpus and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, cpus)
+
+
+def spin(cpus):
+    pin(cpus)
+    while True:
+        pass
+
+
+class Load:
+    """
+        Competition for the CPU of the games: processes that spin on the same CPUs as the game,
+        a thread of the game process that makes reference cycles for the garbage collector,
+        and more spinning processes during the first seconds of every game, as when many games
+        start on a host at the same time.
+
+        Arguments:
+        contention: the number of spinning processes.
+        cpus: the CPUs the game and the spinning processes are pinned to, None for no pinning.
+        gc_pressure: reference cycles made per second, 0 for none.
+        slow_start: seconds at the start of every game with another `contention` spinning processes.
+    """
+
+    def __init__(self, contention=0, cpus=None, gc_pressure=0, slow_start=0):
+        self.contention = contention
+        self.cpus = cpus
+        self.gc_pressure = gc_pressure
+        self.slow_start = slow_start
+        self.context = multiprocessing.get_context('spawn')
+        self.spinners = []
+        self.stopping = threading.Event()
+        self.garbage_thread = None
+        self.gc_threshold = gc.get_threshold()
+
+    def start_spinners(self, count):
+        spinners = [self.context.Process(target=spin, args=(self.cpus,), daemon=True) for _ in range(count)]
+        for spinner in spinners:
+            spinner.start()
+        return spinners
+
+    def start(self):
+        pin(self.cpus)
+        self.spinners = self.start_spinners(self.contention)
+        if self.gc_pressure:
+            self.gc_threshold = gc.get_threshold()
+            gc.set_threshold(*GC_THRESHOLD)
+            self.garbage_thread = threading.Thread(target=self.make_garbage, daemon=True)
+            self.garbage_thread.start()
+
+    def make_garbage(self):
+        pause = GARBAGE_BATCH / self.gc_pressure
+        while not self.stopping.is_set():
+            for _ in range(GARBAGE_BATCH):
+                cycle = []
+                cycle.append(cycle)
+            time.sleep(pause)
+
+    """
+        Start the extra spinning processes of a new game, they are stopped by a timer.
+    """
+
+    def game_started(self):
+        if not self.slow_start or not self.contention:
+            return
+        spinners = self.start_spinners(self.contention)
+        timer = threading.Timer(self.slow_start, lambda: [spinner.terminate() for spinner in spinners])
+        timer.daemon = True
+        timer.start()
+
+    def stop(self):
+        self.stopping.set()
+        for spinner in self.spinners:
+            spinner.terminate()
+        gc.set_threshold(*self.gc_threshold)
+
+
+# ===============================================================================
+# Referee
+# ===============================================================================
+
+class RefereeClock:
+    """
+        The clock of the referee, which is not the clock of the player: it reads the wall clock
+        with a skew, so the harness can check how much disagreement between the two clocks the
+        time management of a player survives.
+
+        Arguments:
+        offset: seconds the referee adds to every move, as the delay between starting its clock and the player's.
+        drift: how much faster the referee's clock runs, 0.01 counts 1.01 seconds for every second.
+        jitter: the largest error of a reading, every reading is off by a uniform amount within it.
+        seed: the seed of the jitter.
+        clock: the wall clock that is skewed.
+    """
+
+    def __init__(self, offset=0.0, drift=0.0, jitter=0.0, seed=None, clock=time.perf_counter):
+        self.offset = offset
+        self.drift = drift
+        self.jitter = jitter
+        self.rng = random.Random(seed)
+        self.clock = clock
+
+    def read(self):
+        return self.clock() * (1 + self.drift) + self.rng.uniform(-self.jitter, self.jitter)
+
+    """
+        :return: the time of a move the referee started to time at the reading start.
+    """
+
+    def elapsed(self, start):
+        return max(0.0, self.read() - start + self.offset)
+
+
+class PlayerReport:
+    """
+        What the referee saw of a player: the time of every move on the referee clock against the
+        time the player gave itself and against the time left in the round, and the time of every round
+        against time_per_k_turns.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.moves = 0
+        self.move_overruns = []
+        self.over_time = []
+        self.rounds = 0
+        self.round_overruns = []
+        self.depths = []
+        self.wall_time = 0.0
+        self.process_time = 0.0
+
+    def summary(self):
+        def stats(values):
+            return {'count': len(values), 'mean': sum(values) / len(values) if values else 0.0,
+                    'max': max(values) if values else 0.0}
+        return {'player': self.name, 'moves': self.moves, 'rounds': self.rounds,
+                'move_overruns': stats(self.move_overruns), 'round_overruns': stats(self.round_overruns),
+                'over_time': stats(self.over_time),
+                'move_overrun_rate': len(self.move_overruns) / max(self.moves, 1),
+                'round_overrun_rate': len(self.round_overruns) / max(self.rounds, 1),
+                'mean_depth': sum(self.depths) / len(self.depths) if self.depths else None,
+                'wall_time': self.wall_time, 'process_time': self.process_time}
+
+
+"""
+    Play a game with a referee that measures the moves with its own clock, as a host under load
+    sees them, while the players keep measuring their own process time.
+    A move is over time when it takes longer on the referee clock than what is left of the round.
+
+    Arguments:
+    players: dictionary from color to (player, PlayerReport).
+    turns: the maximal number of turns of the game.
+    time_per_k_turns, k: the round budget the referee enforces.
+    clock: the RefereeClock, None for the wall clock without a skew.
+"""
+
+
+def play_game(players, turns, time_per_k_turns, k, clock=None):
+    clock = clock or RefereeClock()
+    state = GameState()
+    round_times = {color: [] for color in players}
+    for _ in range(turns):
+        moves = state.get_possible_moves()
+        if not moves:
+            break
+        player, report = players[state.curr_player]
+        wall_start, process_start, referee_start = time.perf_counter(), time.process_time(), clock.read()
+        with contextlib.redirect_stdout(io.StringIO()):
+            move = player.get_move(copy.deepcopy(state), moves)
+        referee = clock.elapsed(referee_start)
+        wall, process = time.perf_counter() - wall_start, time.process_time() - process_start
+        report.moves += 1
+        report.wall_time += wall
+        report.process_time += process
+        allowed = getattr(player, 'time_for_current_move', None)
+        if allowed is not None and referee > allowed:
+            report.move_overruns.append(referee - allowed)
+        info = getattr(player, 'last_search_info', None)
+        if info and info.get('depth'):
+            report.depths.append(info['depth'])
+        times = round_times[state.curr_player]
+        time_left = time_per_k_turns - sum(times)
+        if referee > time_left:
+            report.over_time.append(referee - time_left)
+        times.append(referee)
+        if len(times) == k:
+            report.rounds += 1
+            if sum(times) > time_per_k_turns:
+                report.round_overruns.append(sum(times) - time_per_k_turns)
+            times.clear()
+        state.perform_move(move)
+
+
+"""
+    Play games between every pair of the players, with both colors, under the load.
+
+    :return: the summary of every player.
+"""
+
+
+def run(player_names, games, turns, time_per_k_turns, k, load, clock=None):
+    reports = {name: PlayerReport(name) for name in player_names}
+    pairs = [(red, black) for red in player_names for black in player_names if red != black] or \
+            [(player_names[0], player_names[0])]
+    load.start()
+    try:
+        for game in range(games):
+            for red, black in pairs:
+                players = {}
+                for color, name in (('r', red), ('b', black)):
+                    module = importlib.import_module('players.' + name)
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        players[color] = (module.Player(SETUP_TIME, color, time_per_k_turns, k), reports[name])
+                load.game_started()
+                play_game(players, turns, time_per_k_turns, k, clock)
+                for player, _ in players.values():
+                    if hasattr(player, 'game_over'):
+                        player.game_over()
+    finally:
+        load.stop()
+    return [report.summary() for report in reports.values()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check that the players keep their time under CPU contention '
+                                                 'and a drifting referee clock.')
+    parser.add_argument('--players', nargs='+', default=DEFAULT_PLAYERS)
+    parser.add_argument('--games', type=int, default=DEFAULT_GAMES, help='games of every pair with every color')
+    parser.add_argument('--turns', type=int, default=DEFAULT_TURNS)
+    parser.add_argument('--time-per-k-turns', type=float, default=DEFAULT_TIME_PER_K_TURNS)
+    parser.add_argument('--k', type=int, default=DEFAULT_K)
+    parser.add_argument('--contention', type=int, default=0, help='processes spinning next to the games')
+    parser.add_argument('--cpus', type=int, nargs='*', default=None, help='pin the games and spinners to these CPUs')
+    parser.add_argument('--gc-pressure', type=float, default=0, help='reference cycles made per second')
+    parser.add_argument('--slow-start', type=float, default=0,
+                        help='seconds of double contention at the start of every game')
+    parser.add_argument('--clock-offset', type=float, default=0.0,
+                        help='seconds the referee clock adds to every move')
+    parser.add_argument('--clock-drift', type=float, default=0.0,
+                        help='how much faster the referee clock runs, 0.01 for 1%%')
+    parser.add_argument('--clock-jitter', type=float, default=0.0,
+                        help='the largest error in seconds of a reading of the referee clock')
+    parser.add_argument('--seed', type=int, default=None, help='seed of the jitter of the referee clock')
+    parser.add_argument('--json', action='store_true', help='print the summaries as JSON')
+    args = parser.parse_args()
+
+    load = Load(args.contention, args.cpus, args.gc_pressure, args.slow_start)
+    clock = RefereeClock(args.clock_offset, args.clock_drift, args.clock_jitter, args.seed)
+    summaries = run(args.players, args.games, args.turns, args.time_per_k_turns, args.k, load, clock)
+    if args.json:
+        print(json.dumps(summaries, indent=2))
+        return
+    for summary in summaries:
+        print('{player}: {moves} moves, {over} over their time ({rate:.1%}, worst by {worst:.3f}s), '
+              '{over_time} over the time left in the round, '
+              '{rounds} rounds, {round_over} over the round budget (worst by {round_worst:.3f}s), '
+              'mean depth {depth}'.format(
+                  player=summary['player'], moves=summary['moves'], over=summary['move_overruns']['count'],
+                  rate=summary['move_overrun_rate'], worst=summary['move_overruns']['max'],
+                  over_time=summary['over_time']['count'],
+                  rounds=summary['rounds'], round_over=summary['round_overruns']['count'],
+                  round_worst=summary['round_overruns']['max'],
+                  depth='{:.1f}'.format(summary['mean_depth']) if summary['mean_depth'] else 'unknown'))
+
+
+if __name__ == '__main__':
+    main()
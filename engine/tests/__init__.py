@@ -0,0 +1,53 @@
+# ===============================================================================
+# Imports
+# ===============================================================================
+import random
+from checkers.game_state import GameState
+from players.engine.game_record import parse_fen
+
+
+# ===============================================================================
+# Positions
+# ===============================================================================
+
+"""
+    Build a game state from a PDN FEN such as W:W21,22,K30:B1-12, where W is the red player.
+
+    :return: the state.
+"""
+
+
+def state_from_fen(fen, turns_since_last_jump=0):
+    board, player = parse_fen(fen)
+    state = GameState()
+    state.board = board
+    state.curr_player = player
+    state.turns_since_last_jump = turns_since_last_jump
+    return state
+
+
+"""
+    Play random legal moves from the opening.
+
+    Arguments:
+    seed: the seed of the random moves.
+    count: the number of states.
+    max_plies: the longest game played to reach a state.
+
+    :return: list of states where the player to move has moves.
+"""
+
+
+def random_states(seed, count, max_plies=60):
+    rng = random.Random(seed)
+    states = []
+    while len(states) < count:
+        state = GameState()
+        for _ in range(rng.randrange(max_plies)):
+            moves = state.get_possible_moves()
+            if not moves:
+                break
+            state.perform_move(rng.choice(moves))
+        if state.get_possible_moves():
+            states.append(state)
+    return states
@@ -0,0 +1,74 @@
+# ===============================================================================
+# Imports
+# ===============================================================================
+import os
+import tempfile
+import unittest
+from unittest import mock
+from players import improved_better_h_player
+from players.engine import analyse
+from players.engine.game_record import parse_fen, pdn_fen
+from players.engine.tests import state_from_fen
+
+# Red takes the last black piece.
+WON_FEN = 'W:W22:B18'
+# Red has to give away its last piece.
+LOST_FEN = 'W:W29:BK22,K15'
+QUIET_FEN = 'W:W21,22,23,24,25,26,27,28,29,30,31,32:B1,2,3,4,5,6,7,8,9,10,11,12'
+
+
+# ===============================================================================
+# Analysis of a position
+# ===============================================================================
+
+class AnalysePositionTest(unittest.TestCase):
+    def setUp(self):
+        patch = mock.patch.object(improved_better_h_player, 'PERSISTENT_STORE', False)
+        patch.start()
+        self.addCleanup(patch.stop)
+        analyse.worker_players.clear()
+        self.addCleanup(analyse.worker_players.clear)
+        analyse.init_worker('improved_better_h_player', 3, None, None)
+
+    def analyse_fen(self, fen):
+        board, player = parse_fen(fen)
+        return analyse.analyse_position((0, ('test', board, player, None)))
+
+    def test_won_position(self):
+        result = self.analyse_fen(WON_FEN)
+        self.assertEqual(result['result'], 'win')
+        self.assertIsNone(result['score'])
+        self.assertEqual(result['move'], '22x15')
+
+    def test_lost_position(self):
+        self.assertEqual(state_from_fen(LOST_FEN).get_possible_moves()[0].origin_loc, (0, 0))
+        result = self.analyse_fen(LOST_FEN)
+        self.assertEqual(result['result'], 'loss')
+        self.assertIsNone(result['score'])
+
+    def test_undecided_position(self):
+        result = self.analyse_fen(QUIET_FEN)
+        self.assertNotIn('result', result)
+        self.assertIsInstance(result['score'], float)
+        self.assertEqual(result['depth'], 3)
+        self.assertEqual(result['fen'], QUIET_FEN)
+        self.assertEqual(len(result['principal_variation']), 3)
+
+
+# ===============================================================================
+# Positions
+# ===============================================================================
+
+class ReadPositionsTest(unittest.TestCase):
+    def test_fen_lines_and_tags(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'positions.pdn')
+            with open(path, 'w') as positions_file:
+                positions_file.write('[Event "test"]\n[FEN "{}"]\n\n{}\n'.format(WON_FEN, QUIET_FEN))
+            positions = list(analyse.read_positions(path))
+        self.assertEqual([pdn_fen(board, player) for _, board, player, _ in positions], [WON_FEN, QUIET_FEN])
+        self.assertEqual([played for _, _, _, played in positions], [None, None])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+# ===============================================================================
+# Imports
+# ===============================================================================
+import copy
+import random
+import unittest
+from checkers.game_state import GameState
+from players.engine.bitboard import BitboardState, PackedMove, search_state, root_move
+from players.engine.keys import position_key
+from players.engine.transposition import move_key
+from players.engine.tests import state_from_fen
+
+# A red king on 22 that takes 18, 10 and 9, landing on 15, 6 and 13.
+TRIPLE_JUMP_FEN = 'W:WK22:B9,10,18'
+
+
+def move_keys(moves):
+    return sorted(move_key(move) for move in moves)
+
+
+# ===============================================================================
+# Moves
+# ===============================================================================
+
+class BitboardMovesTest(unittest.TestCase):
+    def assertSameState(self, state, bitboard):
+        self.assertEqual(bitboard.board, state.board)
+        self.assertEqual(bitboard.curr_player, state.curr_player)
+        self.assertEqual(bitboard.turns_since_last_jump, state.turns_since_last_jump)
+        self.assertEqual(position_key(bitboard), position_key(state))
+
+    def test_random_games_match_the_framework(self):
+        rng = random.Random(5)
+        for _ in range(40):
+            state = GameState()
+            bitboard = BitboardState.from_state(state)
+            for _ in range(120):
+                self.assertSameState(state, bitboard)
+                moves = state.get_possible_moves()
+                self.assertEqual(move_keys(bitboard.get_possible_moves()), move_keys(moves))
+                if not moves:
+                    break
+                move = rng.choice(bitboard.get_possible_moves())
+                state.perform_move([played for played in moves if move_key(played) == move_key(move)][0])
+                bitboard.perform_move(move)
+
+    def test_packed_jumps_map_back_to_the_ordered_jump(self):
+        state = state_from_fen(TRIPLE_JUMP_FEN)
+        moves = state.get_possible_moves()
+        packed, = BitboardState.from_state(state).get_possible_moves()
+        # A packed move only keeps the set of jumped squares, the framework move has their order.
+        self.assertEqual(sorted(packed.jumped_locs), sorted(moves[0].jumped_locs))
+        self.assertEqual(root_move(packed, moves).jumped_locs, [(3, 3), (5, 3), (5, 1)])
+
+    def test_copies_are_independent(self):
+        bitboard = BitboardState.from_state(GameState())
+        board = bitboard.board
+        child = copy.deepcopy(bitboard)
+        child.perform_move(child.get_possible_moves()[0])
+        self.assertEqual(bitboard.board, board)
+        self.assertEqual(bitboard.curr_player, 'r')
+        self.assertNotEqual(child.board, board)
+
+
+# ===============================================================================
+# Root
+# ===============================================================================
+
+class RootTest(unittest.TestCase):
+    def test_search_state_and_root_move(self):
+        state = GameState()
+        moves = state.get_possible_moves()
+        searched = search_state(state, moves)
+        self.assertIsInstance(searched, BitboardState)
+        for move in searched.get_possible_moves():
+            self.assertIsInstance(move, PackedMove)
+            self.assertIn(root_move(move, moves), moves)
+            self.assertEqual(move_key(root_move(move, moves)), move_key(move))
+        self.assertIs(root_move(moves[0], moves), moves[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+# ===============================================================================
+# Imports
+# ===============================================================================
+import contextlib
+import io
+import math
+import unittest
+from unittest import mock
+from checkers.game_state import GameState
+from players import improved_player, improved_better_h_player
+from players.engine.calibration import Calibration, DEFAULT_BRANCHING_FACTOR, SPEED_SMOOTHING, \
+    MIN_BRANCHING_FACTOR, MAX_BRANCHING_FACTOR
+
+
+# ===============================================================================
+# Calibration
+# ===============================================================================
+
+class CalibrationTest(unittest.TestCase):
+    def test_benchmark_gives_the_evaluation_a_game_state(self):
+        evaluated = []
+
+        def evaluate(state):
+            evaluated.append(len(state.get_possible_moves()))
+            return 0.0
+
+        calibration = Calibration(evaluate, 0.1)
+        self.assertTrue(evaluated)
+        self.assertEqual(set(evaluated), {7})
+        self.assertGreater(calibration.nodes_per_second, 0)
+        self.assertGreater(calibration.safety_margin, 0)
+
+    def test_update_and_predict(self):
+        calibration = Calibration(lambda state: 0.0, 0.1)
+        calibration.nodes_per_second = 1000.0
+        calibration.update(4000, 2.0, DEFAULT_BRANCHING_FACTOR + 1)
+        self.assertAlmostEqual(calibration.nodes_per_second, 1000.0 + SPEED_SMOOTHING * (2000.0 - 1000.0))
+        self.assertAlmostEqual(calibration.branching_factor, DEFAULT_BRANCHING_FACTOR + SPEED_SMOOTHING)
+        self.assertAlmostEqual(calibration.predict_time(1300),
+                               1300 * calibration.branching_factor / calibration.nodes_per_second)
+
+    def test_branching_factor_is_clamped(self):
+        calibration = Calibration(lambda state: 0.0, 0.1)
+        for _ in range(50):
+            calibration.update(1000, 1.0, 29.0)
+        self.assertLessEqual(calibration.branching_factor, MAX_BRANCHING_FACTOR)
+        for _ in range(50):
+            calibration.update(1000, 1.0, 1.1)
+        self.assertGreaterEqual(calibration.branching_factor, MIN_BRANCHING_FACTOR)
+
+    def test_player_calibrates_with_the_utility_it_searches_with(self):
+        player = improved_player.Player(0.4, 'r', 10, 5)
+        self.assertEqual(player.calibration.evaluate, player.utility)
+
+
+# ===============================================================================
+# Calibration of the iterative deepening
+# ===============================================================================
+
+class DeepeningCalibrationTest(unittest.TestCase):
+    def get_move(self, player, state):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return player.get_move(state, state.get_possible_moves())
+
+    def test_depths_served_from_the_table_are_not_sampled(self):
+        with mock.patch.object(improved_better_h_player, 'PERSISTENT_STORE', False), \
+                contextlib.redirect_stdout(io.StringIO()):
+            player = improved_better_h_player.Player(2, 'r', 200, 5)
+        player.max_depth = 4
+        self.get_move(player, GameState())
+        player.reset_game()
+        with mock.patch.object(player.calibration, 'update') as update:
+            self.get_move(player, GameState())
+        self.assertEqual(player.last_search_info['depth'], 4)
+        self.assertIsNone(update.call_args[0][2])
+
+    def test_next_depth_starts_while_most_of_the_time_is_left(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            player = improved_player.Player(0.4, 'r', 200, 5)
+        player.max_depth = 3
+        with mock.patch.object(player.calibration, 'predict_time', return_value=math.inf):
+            self.get_move(player, GameState())
+        self.assertEqual(player.last_search_info['depth'], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
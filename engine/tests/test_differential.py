@@ -0,0 +1,108 @@
+# ===============================================================================
+# Imports
+# ===============================================================================
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+from checkers.consts import EM, PAWN_COLOR
+from players import improved_better_h_player
+from players.engine import differential
+from players.engine import heuristic
+from players.engine.heuristic import Heuristic
+from players.engine.tests import state_from_fen
+
+
+# ===============================================================================
+# Positions
+# ===============================================================================
+
+class RandomPositionsTest(unittest.TestCase):
+    def test_positions_come_from_legal_games(self):
+        states = list(differential.random_positions(random.Random(1), 500))
+        self.assertEqual(len(states), 500)
+        for state in states:
+            pieces = [value for value in state.board.values() if value != EM]
+            self.assertLessEqual(len(pieces), 24)
+            self.assertNotIn(PAWN_COLOR['r'], [state.board[(7, col)] for col in range(1, 8, 2)])
+            self.assertNotIn(PAWN_COLOR['b'], [state.board[(0, col)] for col in range(0, 8, 2)])
+        self.assertLess(min(len([value for value in state.board.values() if value != EM]) for state in states), 24)
+
+    def test_positions_depend_on_the_seed_only(self):
+        def fens(seed):
+            return [differential.pdn_fen(state.board, state.curr_player)
+                    for state in differential.random_positions(random.Random(seed), 100)]
+        self.assertEqual(fens(2), fens(2))
+        self.assertNotEqual(fens(2), fens(3))
+
+
+# ===============================================================================
+# Checks
+# ===============================================================================
+
+class ChecksTest(unittest.TestCase):
+    def setUp(self):
+        patch = mock.patch.object(improved_better_h_player, 'PERSISTENT_STORE', False)
+        patch.start()
+        self.addCleanup(patch.stop)
+        differential.worker_players.clear()
+        self.addCleanup(differential.worker_players.clear)
+
+    def test_backends_match_the_reference(self):
+        for state in differential.random_positions(random.Random(4), 200):
+            for backend in differential.BACKENDS:
+                self.assertEqual(differential.failed_checks(backend, state), [])
+
+    def test_reference_does_not_share_the_heuristic_core(self):
+        for reference in (differential.REFERENCE_PLAYER, differential.REFERENCE_THREAT_PLAYER):
+            self.assertNotIsInstance(reference('r'), Heuristic)
+
+    def test_change_of_the_core_is_caught(self):
+        with mock.patch.object(Heuristic, 'LAST_ROW_PAWN', 0.9):
+            failed = differential.failed_checks('better_h_player', state_from_fen('W:W29,30,31,32:B1'))
+        self.assertIn('last_row/r', failed)
+        self.assertIn('utility/b', failed)
+
+    def test_change_of_the_normal_turn_weight_is_caught(self):
+        with mock.patch.object(heuristic, 'NORMAL_WEIGHT', 1.1):
+            failed = differential.failed_checks('better_h_player', state_from_fen('W:W29,30:B1,2'))
+        self.assertIn('threat_weight/r', failed)
+        self.assertIn('threat_weight/b', failed)
+
+    def test_change_of_the_threat_detection_is_caught(self):
+        state = state_from_fen('W:W18,19,22:B1')
+        with mock.patch.object(Heuristic, 'center_pieces', lambda self, state, piece_counts: piece_counts):
+            failed = differential.failed_checks('better_h_player', state)
+        self.assertIn('center_pieces/r', failed)
+        self.assertIn('threat_weight/r', failed)
+
+    def test_mismatch_is_shrunk(self):
+        def failed_checks(backend, state):
+            return ['pieces'] if sum(1 for value in state.board.values() if value != EM) >= 2 else []
+
+        state = state_from_fen('W:W21,22,K30:B1,2,K9')
+        with mock.patch.object(differential, 'failed_checks', failed_checks):
+            smaller = differential.shrink('backend', state, 'pieces')
+        self.assertEqual(sorted(value for value in smaller.board.values() if value != EM), ['b', 'b'])
+        self.assertEqual(smaller.curr_player, 'r')
+
+
+# ===============================================================================
+# Speed baseline
+# ===============================================================================
+
+class BaselineTest(unittest.TestCase):
+    def test_baselines_are_kept_by_host(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'baseline.json')
+            self.assertEqual(differential.load_baseline(path, 'first'), {})
+            differential.save_baseline(path, {'backend': 100.0}, 'first')
+            differential.save_baseline(path, {'backend': 5.0}, 'second')
+            differential.save_baseline(path, {'other': 7.0}, 'first')
+            self.assertEqual(differential.load_baseline(path, 'first'), {'backend': 100.0, 'other': 7.0})
+            self.assertEqual(differential.load_baseline(path, 'second'), {'backend': 5.0})
+
+
+if __name__ == '__main__':
+    unittest.main()
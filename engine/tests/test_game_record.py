@@ -0,0 +1,109 @@
+# ===============================================================================
+# Imports
+# ===============================================================================
+import math
+import os
+import tempfile
+import unittest
+from checkers.game_state import GameState
+from players.engine.game_record import GameRecordWriter, GameRecordReader, GameEnd, pdn_square, pdn_location, \
+    pdn_fen, parse_fen, pdn_move, played_move, infer_move, to_pdn
+from players.engine.tests import state_from_fen, random_states
+
+OPENING_FEN = 'W:W21,22,23,24,25,26,27,28,29,30,31,32:B1,2,3,4,5,6,7,8,9,10,11,12'
+# A red king on 22 that takes 18, 10 and 9, landing on 15, 6 and 13.
+TRIPLE_JUMP_FEN = 'W:WK22:B9,10,18'
+
+
+def triple_jump(state):
+    return [move for move in state.get_possible_moves() if len(move.jumped_locs) == 3][0]
+
+
+# ===============================================================================
+# PDN
+# ===============================================================================
+
+class PdnTest(unittest.TestCase):
+    def test_square_numbers(self):
+        self.assertEqual(pdn_square((7, 1)), 1)
+        self.assertEqual(pdn_square((7, 7)), 4)
+        self.assertEqual(pdn_square((0, 0)), 29)
+        self.assertEqual(pdn_square((0, 6)), 32)
+        self.assertEqual(pdn_square((2, 2)), 22)
+
+    def test_numbers_are_the_dark_squares(self):
+        locations = [pdn_location(number) for number in range(1, 33)]
+        self.assertEqual(sorted(locations), sorted(GameState().board))
+        for number, loc in enumerate(locations, 1):
+            self.assertEqual(pdn_square(loc), number)
+
+    def test_opening_position(self):
+        self.assertEqual(pdn_fen(GameState().board, 'r'), OPENING_FEN)
+        board, player = parse_fen(OPENING_FEN)
+        self.assertEqual((board, player), (GameState().board, 'r'))
+
+    def test_fen_round_trip(self):
+        for state in random_states(12, 20):
+            board, player = parse_fen(pdn_fen(state.board, state.curr_player))
+            self.assertEqual((board, player), (state.board, state.curr_player))
+
+    def test_moves(self):
+        state = GameState()
+        move = [move for move in state.get_possible_moves() if move.origin_loc == (2, 2) and
+                move.target_loc == (3, 3)][0]
+        self.assertEqual(pdn_move(played_move(move)), '22-18')
+        self.assertEqual(pdn_move(played_move(triple_jump(state_from_fen(TRIPLE_JUMP_FEN)))), '22x15x6x13')
+
+
+# ===============================================================================
+# Records
+# ===============================================================================
+
+class GameRecordTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'games.bin')
+
+    def test_jumps_keep_their_order(self):
+        state = state_from_fen(TRIPLE_JUMP_FEN)
+        move = triple_jump(state)
+        with GameRecordWriter(self.path) as writer:
+            writer.start_game(7, 'r', 1.0, 5, state.board, 'red', 'black')
+            writer.move(7, 'r', move, 0.5, 4, 1.25)
+            writer.end_game(7, 'r')
+        with GameRecordReader(self.path) as reader:
+            game, = reader.games()
+            record, = game.moves
+            self.assertEqual(record.jumped, tuple(move.jumped_locs))
+            self.assertEqual((record.depth, record.score, record.time), (4, 1.25, 0.5))
+            self.assertEqual(game.end, GameEnd(7, 'r'))
+            self.assertIn('1. 22x15x6x13 1-0', to_pdn(game))
+
+    def test_jumps_out_of_order_are_refused(self):
+        move = triple_jump(state_from_fen(TRIPLE_JUMP_FEN))
+        with GameRecordWriter(self.path) as writer:
+            with self.assertRaises(ValueError):
+                writer.move(7, 'r', (move.origin_loc, move.target_loc, tuple(reversed(move.jumped_locs))))
+
+    def test_inferred_jumps_are_in_order(self):
+        state = state_from_fen(TRIPLE_JUMP_FEN)
+        move = triple_jump(state)
+        after = GameState()
+        after.board = dict(state.board)
+        after.perform_move(move)
+        self.assertEqual(infer_move(state.board, after.board, 'r'), played_move(move))
+
+    def test_unknown_depth_and_score(self):
+        with GameRecordWriter(self.path) as writer:
+            writer.start_game(1, 'r', 1.0, 5, GameState().board)
+            writer.move(1, 'r', ((2, 2), (3, 3), ()))
+        with GameRecordReader(self.path) as reader:
+            game, = reader.games()
+            self.assertIsNone(game.end)
+            self.assertIsNone(game.moves[0].depth)
+            self.assertTrue(math.isnan(game.moves[0].score))
+
+
+if __name__ == '__main__':
+    unittest.main()
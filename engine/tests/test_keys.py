@@ -0,0 +1,62 @@
+# ===============================================================================
+# Imports
+# ===============================================================================
+import unittest
+from checkers.game_state import GameState
+from players.engine.keys import IDENTITY, ROTATE, SYMMETRIES, SQUARE_TRANSFORM, SWAP_COLOR, canonical_key, \
+    canonical_board, transform_move_key
+from players.engine.tests import random_states
+from players.engine.transposition import TranspositionTable, LOWER_BOUND, UPPER_BOUND, move_key
+
+
+"""
+    :return: the position with the colors swapped and the board turned around.
+"""
+
+
+def rotated(state):
+    twin = GameState()
+    twin.board = {SQUARE_TRANSFORM[ROTATE](loc): SWAP_COLOR[value] for loc, value in state.board.items()}
+    twin.curr_player = SWAP_COLOR[state.curr_player]
+    twin.turns_since_last_jump = state.turns_since_last_jump
+    return twin
+
+
+# ===============================================================================
+# Symmetries
+# ===============================================================================
+
+class SymmetryTest(unittest.TestCase):
+    def test_symmetries_keep_the_dark_squares(self):
+        dark = [(row, col) for row in range(8) for col in range(8) if (row + col) % 2 == 0]
+        for symmetry in SYMMETRIES:
+            self.assertEqual(sorted(SQUARE_TRANSFORM[symmetry](loc) for loc in dark), dark)
+
+    def test_twins_share_their_keys(self):
+        for state in random_states(5, 30):
+            twin = rotated(state)
+            self.assertEqual(canonical_key(state)[0], canonical_key(twin)[0])
+            self.assertEqual(canonical_board(state.board)[0], canonical_board(twin.board)[0])
+
+    def test_twin_has_the_rotated_moves(self):
+        for state in random_states(6, 30):
+            moves = sorted(transform_move_key(move_key(move), ROTATE) for move in state.get_possible_moves())
+            self.assertEqual(moves, sorted(move_key(move) for move in rotated(state).get_possible_moves()))
+
+    def test_move_keys_go_back_and_forth(self):
+        key = ((2, 2), (4, 4), ((3, 3),))
+        self.assertEqual(transform_move_key(key, IDENTITY), key)
+        self.assertEqual(transform_move_key(key, ROTATE), ((5, 5), (3, 3), ((4, 4),)))
+        self.assertEqual(transform_move_key(transform_move_key(key, ROTATE), ROTATE), key)
+
+    def test_symmetric_table_turns_the_entry_of_the_twin(self):
+        state = random_states(7, 1)[0]
+        move = move_key(state.get_possible_moves()[0])
+        table = TranspositionTable(symmetric=True)
+        table.store(state, 4, LOWER_BOUND, 1.25, move)
+        self.assertEqual(table.lookup(rotated(state)), (4, UPPER_BOUND, -1.25, transform_move_key(move, ROTATE)))
+        self.assertEqual(table.lookup(state), (4, LOWER_BOUND, 1.25, move))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+# ===============================================================================
+# Imports
+# ===============================================================================
+import contextlib
+import gc
+import io
+import math
+import unittest
+import weakref
+from unittest import mock
+from players import improved_better_h_player
+from players.engine.memory import MemoryBudget, parse_size, CACHE, TABLE, SHRINK_TARGET
+
+
+class Consumer:
+    """
+        A structure of entries of a fixed size that records when it is shrunk.
+    """
+
+    def __init__(self, entries, entry_bytes, shrunk):
+        self.entries = entries
+        self.entry_bytes = entry_bytes
+        self.shrunk = shrunk
+
+    def memory_usage(self):
+        return self.entries * self.entry_bytes
+
+    def shrink(self, fraction):
+        self.shrunk.append(self)
+        self.entries -= math.ceil(self.entries * fraction)
+
+
+# ===============================================================================
+# Memory budget
+# ===============================================================================
+
+class MemoryBudgetTest(unittest.TestCase):
+    def test_parse_size(self):
+        self.assertEqual(parse_size('256M'), 256 << 20)
+        self.assertEqual(parse_size('1.5kb'), 1536)
+        self.assertEqual(parse_size('1000'), 1000)
+
+    def test_caches_are_shrunk_before_tables(self):
+        shrunk = []
+        budget = MemoryBudget(1000)
+        table = Consumer(6, 100, shrunk)
+        cache = Consumer(6, 100, shrunk)
+        budget.add(table, TABLE)
+        budget.add(cache, CACHE)
+        self.assertTrue(budget.check())
+        self.assertEqual(shrunk, [cache, cache])
+        self.assertLessEqual(budget.usage(), SHRINK_TARGET * 1000)
+        self.assertEqual(table.entries, 6)
+
+    def test_exhausted_lasts_until_the_next_move(self):
+        budget = MemoryBudget(1000)
+        budget.add(Consumer(5, 100, []), CACHE)
+        self.assertFalse(budget.check(search_bytes=2000))
+        self.assertTrue(budget.exhausted)
+        # The search unwound and gave back its memory, the move still stops deepening.
+        self.assertFalse(budget.check(search_bytes=0))
+        self.assertTrue(budget.exhausted)
+        self.assertTrue(budget.new_move())
+        self.assertFalse(budget.exhausted)
+
+    def test_structures_of_players_that_are_gone_are_not_counted(self):
+        budget = MemoryBudget(1000)
+        consumer = Consumer(5, 100, [])
+        budget.add(consumer, TABLE)
+        self.assertEqual(budget.usage(), 500)
+        del consumer
+        gc.collect()
+        self.assertEqual(budget.usage(), 0)
+
+    def test_table_of_a_player_that_is_gone_is_released(self):
+        with mock.patch.object(improved_better_h_player, 'PERSISTENT_STORE', False), \
+                contextlib.redirect_stdout(io.StringIO()):
+            player = improved_better_h_player.Player(2, 'r', 200, 5)
+        table = weakref.ref(player.transposition_table)
+        del player
+        gc.collect()
+        self.assertIsNone(table())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+# ===============================================================================
+# Imports
+# ===============================================================================
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+from checkers.game_state import GameState
+from players import improved_better_h_player
+from players.engine import persistent_store
+from players.engine.persistent_store import PersistentStore, PERSIST_MIN_DEPTH
+from players.engine.tests import random_states
+from players.engine.transposition import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND, move_key
+
+KEY_A = ('r', 'a' * 64, 0)
+KEY_B = ('b', 'b' * 64, 3)
+JUMP = ((2, 2), (6, 6), ((3, 3), (5, 5)))
+
+
+# ===============================================================================
+# Store
+# ===============================================================================
+
+class PersistentStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def new_store(self, size=persistent_store.STORE_SIZE):
+        return PersistentStore('test', size=size, directory=self.directory.name)
+
+    def test_round_trip(self):
+        self.new_store().merge([(KEY_A, 5, LOWER_BOUND, 1.25, JUMP), (KEY_B, 3, EXACT, -0.5, None)])
+        store = self.new_store()
+        self.assertEqual(store.probe(KEY_A), (5, LOWER_BOUND, 1.25, JUMP))
+        self.assertEqual(store.probe(KEY_B), (3, EXACT, -0.5, None))
+        self.assertIsNone(store.probe(('r', 'c' * 64, 0)))
+
+    def test_merge_keeps_the_deeper_result(self):
+        self.new_store().merge([(KEY_A, 5, EXACT, 1.0, None)])
+        self.new_store().merge([(KEY_A, 4, EXACT, 2.0, None), (KEY_B, 4, EXACT, 3.0, None)])
+        self.new_store().merge([(KEY_B, 4, UPPER_BOUND, 4.0, None)])
+        store = self.new_store()
+        self.assertEqual(store.probe(KEY_A), (5, EXACT, 1.0, None))
+        self.assertEqual(store.probe(KEY_B), (4, UPPER_BOUND, 4.0, None))
+        self.assertEqual(store.generation, 3)
+
+    def test_full_store_drops_shallow_and_old_entries(self):
+        self.new_store(size=2).merge([(KEY_A, 9, EXACT, 1.0, None)])
+        for _ in range(40):
+            self.new_store(size=2).merge([(('b', 'd' * 64, 0), 1, EXACT, 0.0, None)])
+        self.new_store(size=2).merge([(KEY_B, 3, EXACT, 1.0, None), (('r', 'c' * 64, 0), 4, EXACT, 1.0, None)])
+        store = self.new_store(size=2)
+        self.assertIsNone(store.probe(KEY_A))
+        self.assertIsNotNone(store.probe(KEY_B))
+
+    def test_merge_without_entries_leaves_the_file(self):
+        self.new_store().merge([(KEY_A, 5, EXACT, 1.0, None)])
+        path = self.new_store().path
+        modified = os.stat(path).st_mtime_ns
+        self.new_store().merge([])
+        self.assertEqual(os.stat(path).st_mtime_ns, modified)
+        self.assertEqual(self.new_store().read_records()[0], 1)
+
+    def test_record_of_another_key_with_the_same_hash_is_a_miss(self):
+        self.new_store().merge([(KEY_A, 5, EXACT, 1.0, None)])
+        position_hash, check = persistent_store.hash_and_check(KEY_A)
+        with mock.patch.object(persistent_store, 'hash_and_check', return_value=(position_hash, check ^ 1)):
+            self.assertIsNone(self.new_store().probe(KEY_B))
+
+    def test_damaged_file_is_an_empty_store(self):
+        store = self.new_store()
+        os.makedirs(os.path.dirname(store.path), exist_ok=True)
+        with open(store.path, 'wb') as store_file:
+            store_file.write(b'not a store')
+        self.assertIsNone(store.probe(KEY_A))
+        store.merge([(KEY_A, 5, EXACT, 1.0, None)])
+        self.assertEqual(self.new_store().probe(KEY_A), (5, EXACT, 1.0, None))
+
+    def test_table_saves_and_loads_from_the_point_of_view_of_its_color(self):
+        state = random_states(8, 1)[0]
+        move = move_key(state.get_possible_moves()[0])
+        table = TranspositionTable(symmetric=True, store=self.new_store(), color='r')
+        table.store(state, PERSIST_MIN_DEPTH, LOWER_BOUND, 2.0, move)
+        table.store(random_states(9, 1)[0], PERSIST_MIN_DEPTH - 1, EXACT, 1.0, None)
+        table.save()
+        saved = self.new_store()
+        saved.open()
+        self.assertEqual(saved.count, 1)
+
+        same_color = TranspositionTable(symmetric=True, store=self.new_store(), color='r')
+        self.assertEqual(same_color.lookup(state, PERSIST_MIN_DEPTH), (PERSIST_MIN_DEPTH, LOWER_BOUND, 2.0, move))
+        other_color = TranspositionTable(symmetric=True, store=self.new_store(), color='b')
+        self.assertEqual(other_color.lookup(state, PERSIST_MIN_DEPTH), (PERSIST_MIN_DEPTH, UPPER_BOUND, -2.0, move))
+        # Shallow lookups do not go to the store.
+        self.assertIsNone(TranspositionTable(symmetric=True, store=self.new_store(), color='r').lookup(state))
+
+
+# ===============================================================================
+# End of game
+# ===============================================================================
+
+class GameOverTest(unittest.TestCase):
+    def test_new_game_is_not_saved_on_the_move_clock(self):
+        with mock.patch.object(improved_better_h_player, 'PERSISTENT_STORE', False), \
+                contextlib.redirect_stdout(io.StringIO()):
+            player = improved_better_h_player.Player(2, 'r', 200, 5)
+        player.transposition_table.save = mock.Mock()
+        player.update_game_history(GameState())
+        later = [state for state in random_states(10, 20) if len(state.board) and
+                 sum(1 for value in state.board.values() if value != ' ') < 24][0]
+        player.update_game_history(later)
+        self.assertEqual(len(player.game_history), 2)
+        state = GameState()
+        with contextlib.redirect_stdout(io.StringIO()):
+            player.get_move(state, state.get_possible_moves())
+        player.transposition_table.save.assert_not_called()
+        self.assertEqual(len(player.game_history), 1)
+
+    def test_game_over_saves_once_and_for_the_next_game_again(self):
+        with mock.patch.object(improved_better_h_player, 'PERSISTENT_STORE', False), \
+                contextlib.redirect_stdout(io.StringIO()):
+            player = improved_better_h_player.Player(2, 'r', 200, 5)
+        save = mock.Mock()
+        player.transposition_table.save = save
+        player.save_results.detach()
+        player.save_results = mock.Mock(side_effect=save)
+        player.game_over()
+        self.assertEqual(save.call_count, 1)
+        player.game_over()
+        self.assertEqual(save.call_count, 2)
+        self.assertTrue(player.save_results.alive)
+
+
+if __name__ == '__main__':
+    unittest.main()
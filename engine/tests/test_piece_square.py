@@ -0,0 +1,57 @@
+# ===============================================================================
+# Imports
+# ===============================================================================
+import unittest
+from checkers.game_state import GameState
+from players.engine.heuristic import Heuristic
+from players.engine.piece_square import PieceSquareTables, build_table, KING
+from players.engine.tests import state_from_fen, random_states
+
+TABLE_WEIGHTS = Heuristic().table_weights()
+# The terms of the heuristic that the tables replace.
+TABLE_TERMS = ['pawns_utility', 'kings_utility', 'last_row', 'center_board', 'middle_rows_not_center']
+
+
+class Terms(Heuristic):
+    """
+        The terms of the heuristic for a color, without a player around them.
+    """
+
+    def __init__(self, color):
+        self.color = color
+
+
+def terms_value(color, state):
+    terms = Terms(color)
+    return sum(mine - theirs for mine, theirs in (getattr(terms, name)(state) for name in TABLE_TERMS))
+
+
+# ===============================================================================
+# Piece-square tables
+# ===============================================================================
+
+class PieceSquareTablesTest(unittest.TestCase):
+    def test_tables_give_the_terms_of_the_heuristic(self):
+        tables = {color: PieceSquareTables(TABLE_WEIGHTS, color) for color in ('r', 'b')}
+        for state in random_states(21, 200, max_plies=120):
+            for color, table in tables.items():
+                self.assertAlmostEqual(table.evaluate(state.board), terms_value(color, state), places=9)
+
+    def test_opening_is_even(self):
+        for color in ('r', 'b'):
+            self.assertAlmostEqual(PieceSquareTables(TABLE_WEIGHTS, color).evaluate(GameState().board), 0)
+
+    def test_set_weights_rebuilds_the_table(self):
+        state = state_from_fen('W:WK22,K30:B1')
+        tables = PieceSquareTables(TABLE_WEIGHTS, 'r')
+        before = tables.evaluate(state.board)
+        tables.set_weights(dict(TABLE_WEIGHTS, **{KING: TABLE_WEIGHTS[KING] + 1}))
+        self.assertAlmostEqual(tables.evaluate(state.board), before + 2)
+
+    def test_tables_are_built_once_per_weights_and_color(self):
+        self.assertIs(build_table(dict(TABLE_WEIGHTS), 'r'), build_table(TABLE_WEIGHTS, 'r'))
+        self.assertIsNot(build_table(TABLE_WEIGHTS, 'r'), build_table(TABLE_WEIGHTS, 'b'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+# ===============================================================================
+# Imports
+# ===============================================================================
+import random
+import unittest
+from players.engine.round_planner import RoundPlanner, turn_weight, NORMAL_WEIGHT, TYPICAL_MOVES, \
+    MAX_BRANCHING_FACTOR, MIN_TURN_SHARE
+
+ROUND_TIME = 10.0
+SAFETY_MARGIN = 0.05
+
+
+# ===============================================================================
+# Turn weight
+# ===============================================================================
+
+class TurnWeightTest(unittest.TestCase):
+    def test_forced_move_has_no_weight(self):
+        self.assertEqual(turn_weight(1.8, 1), 0.0)
+        self.assertEqual(turn_weight(1.8, 0), 0.0)
+
+    def test_weight_grows_with_threats_and_moves(self):
+        self.assertAlmostEqual(turn_weight(NORMAL_WEIGHT, TYPICAL_MOVES), NORMAL_WEIGHT)
+        self.assertGreater(turn_weight(1.5, TYPICAL_MOVES), turn_weight(NORMAL_WEIGHT, TYPICAL_MOVES))
+        self.assertGreater(turn_weight(NORMAL_WEIGHT, 12), turn_weight(NORMAL_WEIGHT, 4))
+        self.assertEqual(turn_weight(NORMAL_WEIGHT, 1000), MAX_BRANCHING_FACTOR)
+
+
+# ===============================================================================
+# Round planner
+# ===============================================================================
+
+class RoundPlannerTest(unittest.TestCase):
+    def play_round(self, planner, weights):
+        times = []
+        time_remaining = ROUND_TIME
+        for turn, weight in enumerate(weights):
+            time = planner.time_for_turn(weight, len(weights) - turn, time_remaining, SAFETY_MARGIN)
+            times.append(time)
+            time_remaining -= time + SAFETY_MARGIN
+        return times, time_remaining
+
+    def test_round_never_runs_over(self):
+        rng = random.Random(3)
+        planner = RoundPlanner()
+        for _ in range(200):
+            weights = [rng.choice([0.0, turn_weight(rng.choice([1.0, 1.3, 1.5, 1.8]), rng.randrange(1, 20))])
+                       for _ in range(5)]
+            times, time_remaining = self.play_round(planner, weights)
+            self.assertTrue(all(time >= 0 for time in times))
+            self.assertAlmostEqual(time_remaining, 0.0)
+
+    def test_even_turns_get_even_shares(self):
+        times, _ = self.play_round(RoundPlanner(), [NORMAL_WEIGHT] * 5)
+        for time in times:
+            self.assertAlmostEqual(time, ROUND_TIME / 5 - SAFETY_MARGIN)
+
+    def test_critical_turn_gets_more_time(self):
+        even = ROUND_TIME / 5 - SAFETY_MARGIN
+        self.assertGreater(RoundPlanner().time_for_turn(1.8, 5, ROUND_TIME, SAFETY_MARGIN), even)
+        self.assertLess(RoundPlanner().time_for_turn(0.5, 5, ROUND_TIME, SAFETY_MARGIN), even)
+
+    def test_forced_move_leaves_its_time_to_the_other_turns(self):
+        planner = RoundPlanner()
+        available = ROUND_TIME - 5 * SAFETY_MARGIN
+        forced = planner.time_for_turn(0.0, 5, ROUND_TIME, SAFETY_MARGIN)
+        self.assertAlmostEqual(forced, MIN_TURN_SHARE * available / 5)
+        next_turn = planner.time_for_turn(NORMAL_WEIGHT, 4, ROUND_TIME - SAFETY_MARGIN, SAFETY_MARGIN)
+        self.assertGreater(next_turn, ROUND_TIME / 5 - SAFETY_MARGIN)
+
+    def test_later_turns_keep_their_floor(self):
+        planner = RoundPlanner()
+        time_remaining = ROUND_TIME
+        for turns_remaining in range(5, 1, -1):
+            available = time_remaining - turns_remaining * SAFETY_MARGIN
+            floor = MIN_TURN_SHARE * available / turns_remaining
+            time = planner.time_for_turn(100.0, turns_remaining, time_remaining, SAFETY_MARGIN)
+            self.assertGreaterEqual(time, floor)
+            self.assertLessEqual(time, available - (turns_remaining - 1) * floor + 1e-9)
+            time_remaining -= time + SAFETY_MARGIN
+
+    def test_no_time_left(self):
+        self.assertEqual(RoundPlanner().time_for_turn(NORMAL_WEIGHT, 5, 0.1, SAFETY_MARGIN), 0.0)
+
+    def test_forecast_goes_back_to_the_usual_weight(self):
+        planner = RoundPlanner()
+        forecast = planner.forecast(1.8, 5)
+        self.assertEqual(forecast[0], 1.8)
+        self.assertTrue(all(later < earlier for earlier, later in zip(forecast, forecast[1:])))
+        self.assertTrue(all(weight > planner.usual_weight for weight in forecast))
+
+
+if __name__ == '__main__':
+    unittest.main()
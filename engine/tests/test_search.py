@@ -0,0 +1,186 @@
+# ===============================================================================
+# Imports
+# ===============================================================================
+import copy
+import unittest
+from checkers.consts import MAX_TURNS_NO_JUMP
+from players.engine.keys import position_key
+from players.engine.search import AlphaBetaSearch, DRAW_SCORE, NO_JUMP_DAMPING
+from players.engine.transposition import TranspositionTable, move_key
+from players.engine.heuristic import Heuristic
+from players.engine.piece_square import PieceSquareTables
+from players.engine.tests import state_from_fen, random_states
+from utils import INFINITY
+
+PIECE_VALUES = {'r': 1.0, 'R': 1.5, 'b': -1.0, 'B': -1.5}
+
+
+def never():
+    return False
+
+
+def material(color):
+    sign = 1 if color == 'r' else -1
+    return lambda state: sign * sum(PIECE_VALUES.get(value, 0) for value in state.board.values())
+
+
+def new_search(utility, color, **options):
+    return AlphaBetaSearch(utility, color, never, lambda state: False, **options)
+
+
+def tables(color):
+    piece_square_tables = PieceSquareTables(Heuristic().table_weights(), color)
+    return lambda state: piece_square_tables.evaluate(state.board)
+
+
+# ===============================================================================
+# Draws
+# ===============================================================================
+
+class DrawTest(unittest.TestCase):
+    def test_no_jump_limit_is_a_draw(self):
+        state = state_from_fen('W:W21,22:B1', MAX_TURNS_NO_JUMP)
+        search = new_search(lambda state: 5.0, 'r')
+        self.assertEqual(search.search(state, 3, -INFINITY, INFINITY, True), (DRAW_SCORE, None))
+
+    def test_repetition_is_a_draw(self):
+        # Every position is bad for red except the one that repeats the game, a draw.
+        state = state_from_fen('W:WK18:BK3')
+        moves = state.get_possible_moves()
+        repeated = copy.deepcopy(state)
+        repeated.perform_move(moves[-1])
+        search = new_search(lambda state: -1.0, 'r', history=[position_key(repeated)])
+        value, move = search.search(state, 1, -INFINITY, INFINITY, True)
+        self.assertEqual(value, DRAW_SCORE)
+        self.assertEqual((move.origin_loc, move.target_loc), (moves[-1].origin_loc, moves[-1].target_loc))
+
+    def test_leaf_is_pulled_towards_a_draw(self):
+        turns = MAX_TURNS_NO_JUMP // 2
+        search = new_search(lambda state: 4.0, 'r')
+        value = search.evaluate(state_from_fen('W:W21:B1', turns))
+        self.assertAlmostEqual(value, 4.0 * (1 - NO_JUMP_DAMPING * turns / MAX_TURNS_NO_JUMP))
+
+
+# ===============================================================================
+# Principal variation search and late move reductions
+# ===============================================================================
+
+class PrincipalVariationTest(unittest.TestCase):
+    def test_same_value_as_plain_alpha_beta(self):
+        for state in random_states(1, 20):
+            color = state.curr_player
+            plain = new_search(material(color), color).search(state, 4, -INFINITY, INFINITY, True)
+            pvs = new_search(material(color), color, principal_variation=True).search(
+                state, 4, -INFINITY, INFINITY, True)
+            self.assertAlmostEqual(pvs[0], plain[0])
+
+    def test_tactical_positions_are_not_reduced(self):
+        for state in random_states(2, 10):
+            color = state.curr_player
+            plain = new_search(material(color), color).search(state, 4, -INFINITY, INFINITY, True)
+            search = new_search(material(color), color, late_move_reductions=True, is_tactical=lambda state: True)
+            self.assertAlmostEqual(search.search(state, 4, -INFINITY, INFINITY, True)[0], plain[0])
+
+    def test_late_moves_are_reduced(self):
+        state = state_from_fen('W:W21,22,23,24,25,26,27,28:B1,2,3,4,5,6,7,8')
+        plain = new_search(material('r'), 'r')
+        reduced = new_search(material('r'), 'r', late_move_reductions=True)
+        plain.search(state, 5, -INFINITY, INFINITY, True)
+        reduced.search(state, 5, -INFINITY, INFINITY, True)
+        self.assertLess(reduced.nodes, plain.nodes)
+
+
+# ===============================================================================
+# MTD(f)
+# ===============================================================================
+
+class MtdfTest(unittest.TestCase):
+    def move_values(self, state, depth):
+        color = state.curr_player
+        values = {}
+        for move in state.get_possible_moves():
+            child = copy.deepcopy(state)
+            child.perform_move(move)
+            values[move_key(move)] = new_search(tables(color), color).search(
+                child, depth - 1, -INFINITY, INFINITY, False)[0]
+        return values
+
+    def test_same_value_and_move_as_alpha_beta(self):
+        unique = 0
+        for state in random_states(6, 25):
+            color = state.curr_player
+            value, move = new_search(tables(color), color).search(state, 4, -INFINITY, INFINITY, True)
+            search = new_search(tables(color), color, transposition_table=TranspositionTable())
+            mtdf_value, mtdf_move = search.mtdf(state, 4, 0.0)
+            self.assertAlmostEqual(mtdf_value, value)
+            values = self.move_values(state, 4)
+            self.assertAlmostEqual(values[move_key(mtdf_move)], value)
+            if sorted(values.values())[-2:].count(value) == 1:
+                unique += 1
+                self.assertEqual(move_key(mtdf_move), move_key(move))
+        self.assertGreater(unique, 0)
+
+    def test_guess_does_not_change_the_result(self):
+        state = random_states(7, 1)[0]
+        color = state.curr_player
+        results = set()
+        for guess in (-INFINITY, -3.0, 0.0, 3.0):
+            search = new_search(tables(color), color, transposition_table=TranspositionTable())
+            value, move = search.mtdf(state, 3, guess)
+            results.add((round(value, 9), move_key(move)))
+        self.assertEqual(len(results), 1)
+
+    def test_falls_back_on_the_previous_move_without_a_fail_high(self):
+        state = random_states(8, 1)[0]
+        color = state.curr_player
+        previous = state.get_possible_moves()[-1]
+        search = new_search(tables(color), color, transposition_table=TranspositionTable())
+        # Time runs out during the first pass, which fails low from a guess above the value.
+        search.no_more_time = lambda: search.nodes > 0
+        value, move = search.mtdf(state, 3, INFINITY - 1, previous)
+        self.assertIs(move, previous)
+
+    def test_falls_back_on_the_table_move(self):
+        state = random_states(9, 1)[0]
+        color = state.curr_player
+        table = TranspositionTable()
+        value, best = new_search(tables(color), color, transposition_table=table).search(
+            state, 3, -INFINITY, INFINITY, True)
+        search = new_search(tables(color), color, transposition_table=table)
+        search.no_more_time = lambda: search.nodes > 0
+        self.assertEqual(move_key(search.mtdf(state, 4, INFINITY - 1)[1]), move_key(best))
+
+
+# ===============================================================================
+# Selective deepening
+# ===============================================================================
+
+class SelectiveDeepeningTest(unittest.TestCase):
+    def setUp(self):
+        self.state = state_from_fen('W:W21,22,23,24,25,26,27,28:B1,2,3,4,5,6,7,8')
+
+    def test_extensions_stay_within_the_budget(self):
+        search = AlphaBetaSearch(material('r'), 'r', never, lambda state: True, max_extensions=10)
+        search.search(self.state, 2, -INFINITY, INFINITY, True)
+        self.assertEqual(search.extensions, 10)
+
+    def test_lines_stay_within_the_extension_plies(self):
+        plies = []
+
+        def utility(state):
+            plies.append(search.ply)
+            return 0.0
+
+        search = AlphaBetaSearch(utility, 'r', never, lambda state: True, max_extension_plies=2)
+        search.search(self.state, 2, -INFINITY, INFINITY, True)
+        self.assertGreater(search.extensions, 0)
+        self.assertEqual(max(plies), 2 + 2)
+
+    def test_no_extension_without_the_criterion(self):
+        search = new_search(material('r'), 'r')
+        search.search(self.state, 3, -INFINITY, INFINITY, True)
+        self.assertEqual(search.extensions, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
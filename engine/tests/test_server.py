@@ -0,0 +1,148 @@
+# ===============================================================================
+# Imports
+# ===============================================================================
+import asyncio
+import threading
+import unittest
+from checkers.game_state import GameState
+from players.engine.server import GameServer, Session
+
+OPEN = {'op': 'open', 'player': 'improved_player', 'color': 'r', 'setup_time': 0.5, 'time_per_k_turns': 50.0,
+        'k': 5}
+# Long enough for a worker to start and play, short enough to notice a request stuck behind another worker.
+TIMEOUT = 60
+
+
+# ===============================================================================
+# Server
+# ===============================================================================
+
+class GameServerTest(unittest.TestCase):
+    def setUp(self):
+        self.server = GameServer(workers=2)
+        self.addCleanup(self.server.stop)
+
+    def run_async(self, coroutine):
+        return asyncio.run(asyncio.wait_for(coroutine, TIMEOUT))
+
+    def move_request(self, session_id):
+        state = GameState()
+        return {'op': 'move', 'session': session_id, 'state': state, 'moves': state.get_possible_moves()}
+
+    def test_busy_worker_does_not_hold_up_the_others(self):
+        busy, free = self.server.workers
+        release = threading.Event()
+        busy.call = lambda op, session, payload=None: release.wait() and {'ok': True}
+
+        async def scenario():
+            blocked = [asyncio.ensure_future(self.server.call(busy, 'move', 0)) for _ in range(3)]
+            await asyncio.sleep(0.1)
+            reply = await self.server.call(free, 'open', 1, OPEN)
+            release.set()
+            await asyncio.gather(*blocked)
+            return reply
+
+        self.assertTrue(self.run_async(scenario())['ok'])
+
+    def test_full_server_refuses_new_sessions(self):
+        self.server.max_sessions = 1
+
+        async def scenario():
+            first = await self.server.handle_request(OPEN)
+            refused = await self.server.handle_request(OPEN)
+            await self.server.handle_request({'op': 'close', 'session': first['session']})
+            return first, refused
+
+        first, refused = self.run_async(scenario())
+        self.assertTrue(first['ok'])
+        self.assertEqual(refused, {'ok': False, 'error': 'busy'})
+
+    def test_moves_beyond_the_pending_limit_wait(self):
+        worker = self.server.workers[0]
+        release = threading.Event()
+        calls = []
+
+        def call(op, session, payload=None):
+            calls.append(op)
+            release.wait()
+            return {'ok': True, 'move': 0, 'time': 0.0}
+
+        worker.call = call
+        self.server.sessions[1] = Session(1, worker, 50.0, 5)
+
+        async def scenario():
+            self.server.pending = asyncio.Semaphore(1)
+            moves = [asyncio.ensure_future(self.server.handle_request(self.move_request(1))) for _ in range(2)]
+            await asyncio.sleep(0.2)
+            waiting = len(calls)
+            release.set()
+            return waiting, await asyncio.gather(*moves)
+
+        waiting, replies = self.run_async(scenario())
+        self.assertEqual(waiting, 1)
+        self.assertEqual(calls, ['move', 'move'])
+        self.assertTrue(all(reply['ok'] for reply in replies))
+
+    def test_move_over_the_round_time_forfeits_the_session(self):
+        worker = self.server.workers[0]
+        calls = []
+
+        def call(op, session, payload=None):
+            calls.append(op)
+            return {'ok': True, 'move': 0, 'time': 0.02}
+
+        worker.call = call
+        worker.sessions = 1
+        self.server.sessions[1] = Session(1, worker, 0.03, 5)
+
+        async def scenario():
+            return [await self.server.handle_request(self.move_request(1)) for _ in range(2)]
+
+        first, second = self.run_async(scenario())
+        self.assertTrue(first['ok'])
+        self.assertEqual(second, {'ok': False, 'error': 'time forfeit'})
+        self.assertEqual(calls, ['move', 'move', 'close'])
+        self.assertNotIn(1, self.server.sessions)
+        self.assertEqual(worker.sessions, 0)
+
+    def test_closed_player_is_kept_for_the_next_session(self):
+        async def scenario():
+            first = await self.server.handle_request(OPEN)
+            await self.server.handle_request(self.move_request(first['session']))
+            await self.server.handle_request({'op': 'close', 'session': first['session']})
+            second = await self.server.handle_request(OPEN)
+            move = await self.server.handle_request(self.move_request(second['session']))
+            return first, second, move
+
+        first, second, move = self.run_async(scenario())
+        self.assertFalse(first['warm'])
+        self.assertTrue(second['warm'])
+        self.assertTrue(move['ok'])
+
+    def test_dead_worker_forfeits_its_sessions_and_is_replaced(self):
+        async def scenario():
+            first = (await self.server.handle_request(OPEN))['session']
+            second = (await self.server.handle_request(OPEN))['session']
+            dead = self.server.sessions[first].worker
+            survivor = self.server.sessions[second].worker
+            self.assertIsNot(dead, survivor)
+            dead.process.kill()
+            dead.process.join()
+
+            lost = await self.server.handle_request(self.move_request(first))
+            self.assertFalse(lost['ok'])
+            self.assertIn('died', lost['error'])
+            self.assertNotIn(dead, self.server.workers)
+            self.assertEqual((await self.server.handle_request(self.move_request(first)))['error'], 'worker died')
+            self.assertTrue((await self.server.handle_request(self.move_request(second)))['ok'])
+
+            third = (await self.server.handle_request(OPEN))['session']
+            self.assertTrue((await self.server.handle_request(self.move_request(third)))['ok'])
+            self.assertFalse((await self.server.handle_request({'op': 'close', 'session': first}))['ok'])
+            self.assertNotIn(first, self.server.forfeited)
+
+        self.run_async(scenario())
+
+
+if __name__ == '__main__':
+    unittest.main()
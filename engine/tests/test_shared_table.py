@@ -0,0 +1,68 @@
+# ===============================================================================
+# Imports
+# ===============================================================================
+import unittest
+from players.engine.persistent_store import stable_hash
+from players.engine.search import NULL_WINDOW
+from players.engine.shared_table import SharedTranspositionTable, SLOT, pack_data, unpack_data
+from players.engine.tests import random_states
+from players.engine.transposition import EXACT, LOWER_BOUND, UPPER_BOUND, move_key
+
+
+# ===============================================================================
+# Shared table
+# ===============================================================================
+
+class SharedTableTest(unittest.TestCase):
+    def setUp(self):
+        self.table = SharedTranspositionTable.create(slots=1024, color='r')
+        self.addCleanup(self.table.unlink)
+        self.addCleanup(self.table.close)
+        self.states = random_states(11, 6)
+
+    def test_pack_and_unpack(self):
+        move = ((2, 2), (3, 3), ())
+        data, value_bits = pack_data(7, LOWER_BOUND, -0.1 + NULL_WINDOW, move)
+        self.assertEqual(unpack_data(data, value_bits), (7, LOWER_BOUND, -0.1 + NULL_WINDOW, ((2, 2), (3, 3), None)))
+
+    def test_values_keep_the_precision_of_the_search(self):
+        state = self.states[0]
+        value = 0.37 + NULL_WINDOW
+        self.table.store(state, 4, EXACT, value, None)
+        self.assertEqual(self.table.lookup(state)[2], value)
+        self.assertNotEqual(self.table.lookup(state)[2], 0.37)
+
+    def test_attached_table_sees_the_entries_from_its_point_of_view(self):
+        state = self.states[1]
+        move = move_key(state.get_possible_moves()[0])
+        self.table.store(state, 5, LOWER_BOUND, 1.5, move)
+        other = SharedTranspositionTable.attach(self.table.memory.name, color='b')
+        self.addCleanup(other.close)
+        depth, flag, value, (origin, target, _) = other.lookup(state)
+        self.assertEqual((depth, flag, value, origin, target), (5, UPPER_BOUND, -1.5, move[0], move[1]))
+
+    def test_used_slots_are_counted(self):
+        self.assertEqual(len(self.table), 0)
+        for state in self.states:
+            self.table.store(state, 2, EXACT, 0.0, None)
+        self.table.store(self.states[0], 3, EXACT, 0.0, None)
+        used = {stable_hash(self.table.key(state)[0]) % self.table.slots for state in self.states}
+        self.assertEqual(len(self.table), len(used))
+
+    def test_torn_slot_is_a_miss(self):
+        state = self.states[2]
+        self.table.store(state, 4, EXACT, 1.0, None)
+        offset = self.table.slot_offset(stable_hash(self.table.key(state)[0]))
+        check, data, value_bits = SLOT.unpack_from(self.table.buffer, offset)
+        SLOT.pack_into(self.table.buffer, offset, check, data, value_bits ^ 1)
+        self.assertIsNone(self.table.lookup(state))
+
+    def test_shallower_result_does_not_replace_a_deeper_one(self):
+        state = self.states[3]
+        self.table.store(state, 6, EXACT, 1.0, None)
+        self.table.store(state, 2, EXACT, 2.0, None)
+        self.assertEqual(self.table.lookup(state)[:3], (6, EXACT, 1.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+# ===============================================================================
+# Imports
+# ===============================================================================
+import unittest
+from players.engine.stress import RefereeClock, PlayerReport, play_game
+
+TIME_PER_K_TURNS = 1.0
+K = 5
+
+
+class FakeClock:
+    """
+        A wall clock that only moves when a player thinks.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TimedPlayer:
+    """
+        A player that thinks for a fixed time of the fake clock and gives itself a little more.
+    """
+
+    def __init__(self, clock, move_time):
+        self.clock = clock
+        self.move_time = move_time
+        self.time_for_current_move = 1.02 * move_time
+
+    def get_move(self, game_state, possible_moves):
+        self.clock.now += self.move_time
+        return possible_moves[0]
+
+
+# ===============================================================================
+# Referee clock
+# ===============================================================================
+
+class RefereeClockTest(unittest.TestCase):
+    def test_exact_clock(self):
+        wall = FakeClock()
+        clock = RefereeClock(clock=wall)
+        start = clock.read()
+        wall.now += 0.5
+        self.assertEqual(clock.elapsed(start), 0.5)
+
+    def test_offset_and_drift(self):
+        wall = FakeClock()
+        clock = RefereeClock(offset=0.01, drift=0.1, clock=wall)
+        start = clock.read()
+        wall.now += 2.0
+        self.assertAlmostEqual(clock.elapsed(start), 2.0 * 1.1 + 0.01)
+
+    def test_jitter_is_bounded_and_seeded(self):
+        wall = FakeClock()
+        readings = [RefereeClock(jitter=0.05, seed=7, clock=wall).read() for _ in range(2)]
+        self.assertEqual(readings[0], readings[1])
+        clock = RefereeClock(jitter=0.05, seed=7, clock=wall)
+        errors = [clock.read() for _ in range(1000)]
+        self.assertTrue(all(abs(error) <= 0.05 for error in errors))
+        self.assertGreater(max(errors) - min(errors), 0.05)
+        self.assertTrue(all(clock.elapsed(clock.read()) >= 0 for _ in range(100)))
+
+
+# ===============================================================================
+# Referee
+# ===============================================================================
+
+class RefereeTest(unittest.TestCase):
+    def play(self, move_time, clock_factory):
+        wall = FakeClock()
+        reports = {color: PlayerReport(color) for color in ('r', 'b')}
+        players = {color: (TimedPlayer(wall, move_time), reports[color]) for color in ('r', 'b')}
+        play_game(players, 2 * K, TIME_PER_K_TURNS, K, clock_factory(wall))
+        return reports
+
+    def test_moves_in_time_on_an_exact_clock(self):
+        reports = self.play(0.95 * TIME_PER_K_TURNS / K, lambda wall: RefereeClock(clock=wall))
+        for report in reports.values():
+            self.assertEqual((report.moves, report.rounds), (K, 1))
+            self.assertEqual(report.over_time, [])
+            self.assertEqual(report.move_overruns, [])
+            self.assertEqual(report.round_overruns, [])
+
+    def test_drift_puts_the_last_move_of_the_round_over_time(self):
+        reports = self.play(0.95 * TIME_PER_K_TURNS / K, lambda wall: RefereeClock(drift=0.1, clock=wall))
+        for report in reports.values():
+            self.assertEqual(len(report.move_overruns), K)
+            self.assertEqual(len(report.over_time), 1)
+            self.assertAlmostEqual(report.over_time[0], 0.95 * 1.1 - TIME_PER_K_TURNS)
+            self.assertEqual(len(report.round_overruns), 1)
+
+    def test_offset_is_added_to_every_move(self):
+        reports = self.play(0.1, lambda wall: RefereeClock(offset=0.15, clock=wall))
+        for report in reports.values():
+            self.assertEqual(len(report.move_overruns), K)
+            self.assertEqual(len(report.over_time), 1)
+            self.assertAlmostEqual(report.summary()['round_overruns']['max'], K * 0.25 - TIME_PER_K_TURNS)
+
+
+if __name__ == '__main__':
+    unittest.main()
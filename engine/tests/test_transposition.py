@@ -0,0 +1,190 @@
+# ===============================================================================
+# Imports
+# ===============================================================================
+import contextlib
+import copy
+import io
+import unittest
+from unittest import mock
+from checkers.game_state import GameState
+from players import improved_better_h_player
+from players.engine import deepening
+from players.engine.keys import position_key
+from players.engine.search import AlphaBetaSearch
+from players.engine.tests import state_from_fen, random_states
+from players.engine.transposition import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND, find_move, \
+    move_key
+from utils import INFINITY, run_with_limited_time, ExceededTimeError
+
+MOVE = ((5, 1), (4, 0), ())
+
+
+# ===============================================================================
+# Table
+# ===============================================================================
+
+class TranspositionTableTest(unittest.TestCase):
+    def test_store_and_lookup(self):
+        table = TranspositionTable()
+        state = state_from_fen('W:W21,22:B1,2')
+        self.assertIsNone(table.lookup(state))
+        table.store(state, 3, EXACT, 1.5, MOVE)
+        self.assertEqual(table.lookup(copy.deepcopy(state)), (3, EXACT, 1.5, MOVE))
+
+    def test_turns_since_last_jump_are_part_of_the_key(self):
+        table = TranspositionTable()
+        table.store(state_from_fen('W:W21,22:B1,2', 0), 3, EXACT, 1.5, MOVE)
+        self.assertIsNone(table.lookup(state_from_fen('W:W21,22:B1,2', 10)))
+
+    def test_shallower_result_does_not_replace_a_deeper_one_of_the_same_move(self):
+        table = TranspositionTable()
+        state = state_from_fen('W:W21,22:B1,2')
+        table.store(state, 5, EXACT, 1.5, MOVE)
+        table.store(state, 2, EXACT, -1.0, None)
+        self.assertEqual(table.lookup(state)[0], 5)
+        table.new_move()
+        table.store(state, 2, EXACT, -1.0, None)
+        self.assertEqual(table.lookup(state), (2, EXACT, -1.0, None))
+
+    def test_full_table_drops_shallow_and_old_entries(self):
+        states = [state for state in random_states(3, 60) if state.turns_since_last_jump == 0]
+        states = list({position_key(state): state for state in states}.values())[:8]
+        table = TranspositionTable(size=4)
+        table.store(states[0], 9, EXACT, 0.0, None)
+        table.store(states[1], 1, EXACT, 0.0, None)
+        table.store(states[2], 6, EXACT, 0.0, None)
+        table.store(states[3], 6, EXACT, 0.0, None)
+        table.new_move()
+        table.store(states[4], 1, EXACT, 0.0, None)
+        self.assertIsNotNone(table.lookup(states[4]))
+        self.assertIsNone(table.lookup(states[1]))
+        self.assertIsNotNone(table.lookup(states[0]))
+        self.assertEqual(len(table), 4)
+
+    def test_full_table_drops_old_deep_entries(self):
+        states = [state for state in random_states(3, 60) if state.turns_since_last_jump == 0]
+        states = list({position_key(state): state for state in states}.values())[:5]
+        table = TranspositionTable(size=4)
+        table.store(states[0], 9, EXACT, 0.0, None)
+        # Many moves later the deep entry is older than it is deep.
+        for _ in range(20):
+            table.new_move()
+        for state in states[1:]:
+            table.store(state, 1, EXACT, 0.0, None)
+        self.assertIsNone(table.lookup(states[0]))
+        self.assertIsNotNone(table.lookup(states[4]))
+
+    def test_cutoff(self):
+        table = TranspositionTable()
+        self.assertEqual(table.cutoff((4, EXACT, 1.0, None), 3, -INFINITY, INFINITY), 1.0)
+        self.assertIsNone(table.cutoff((2, EXACT, 1.0, None), 3, -INFINITY, INFINITY))
+        self.assertEqual(table.cutoff((4, LOWER_BOUND, 2.0, None), 3, 0.0, 1.0), 2.0)
+        self.assertIsNone(table.cutoff((4, LOWER_BOUND, 0.5, None), 3, 0.0, 1.0))
+        self.assertEqual(table.cutoff((4, UPPER_BOUND, -1.0, None), 3, 0.0, 1.0), -1.0)
+        self.assertIsNone(table.cutoff((4, UPPER_BOUND, 0.5, None), 3, 0.0, 1.0))
+
+    def test_repetition_draws_are_not_stored(self):
+        state = state_from_fen('W:WK18:BK3')
+        repeated = copy.deepcopy(state)
+        repeated.perform_move(state.get_possible_moves()[-1])
+        table = TranspositionTable()
+        search = AlphaBetaSearch(lambda state: -1.0, 'r', lambda: False, lambda state: False,
+                                 history=[position_key(repeated)], transposition_table=table)
+        search.search(state, 2, -INFINITY, INFINITY, True)
+        self.assertIsNone(table.lookup(state))
+        self.assertGreater(search.repetitions, 0)
+
+        table = TranspositionTable()
+        search = AlphaBetaSearch(lambda state: -1.0, 'r', lambda: False, lambda state: False,
+                                 transposition_table=table)
+        search.search(state, 2, -INFINITY, INFINITY, True)
+        self.assertIsNotNone(table.lookup(state))
+
+
+# ===============================================================================
+# Resuming the search of the expected position
+# ===============================================================================
+
+class ResumeTest(unittest.TestCase):
+    def setUp(self):
+        with mock.patch.object(improved_better_h_player, 'PERSISTENT_STORE', False), \
+                contextlib.redirect_stdout(io.StringIO()):
+            self.player = improved_better_h_player.Player(2, 'r', 200, 5)
+        self.player.max_depth = 5
+
+    def get_move(self, state):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return self.player.get_move(copy.deepcopy(state), state.get_possible_moves())
+
+    def assertLegal(self, move, state):
+        self.assertIn(move_key(move), [move_key(legal) for legal in state.get_possible_moves()])
+
+    """
+        Play the first move and the reply the player expects.
+
+        :return: the state of our next move.
+    """
+
+    def play_expected_reply(self):
+        state = GameState()
+        state.perform_move(self.get_move(state))
+        reply = self.player.last_search_info['principal_variation'][1]
+        state.perform_move(find_move(state.get_possible_moves(), move_key(reply)))
+        self.assertEqual(position_key(state), self.player.expected_key)
+        return state
+
+    def test_expected_position_resumes_from_the_proven_depth(self):
+        state = self.play_expected_reply()
+        proven_depth = self.player.proven_depth
+        self.assertEqual(proven_depth, 3)
+        move = self.get_move(state)
+        self.assertLegal(move, state)
+        self.assertEqual(self.player.reuse_stats['reused'], 1)
+        self.assertEqual(self.player.reuse_stats['saved_iterations'], proven_depth - 2)
+        self.assertEqual(self.player.last_search_info['depth'], 5)
+
+    def test_move_is_proven_before_the_resumed_iteration(self):
+        state = self.play_expected_reply()
+        depths = []
+
+        def first_iteration_only(function, args, kwargs, time_limit):
+            depths.append(args[1])
+            if len(depths) > 1:
+                raise ExceededTimeError
+            return run_with_limited_time(function, args, kwargs, time_limit)
+
+        with mock.patch.object(deepening, 'run_with_limited_time', first_iteration_only):
+            move = self.get_move(state)
+        self.assertEqual(depths, [1, 3])
+        self.assertEqual(self.player.last_search_info['depth'], 1)
+        self.assertLegal(move, state)
+
+    def test_principal_variation_is_only_followed_for_the_analyser(self):
+        self.player.max_depth = None
+        self.player.time_remaining_in_round = 5
+        state = GameState()
+        with mock.patch.object(AlphaBetaSearch, 'principal_variation_moves', autospec=True,
+                               side_effect=AlphaBetaSearch.principal_variation_moves) as principal_variation_moves:
+            move = self.get_move(state)
+        self.assertEqual([call[0][2] for call in principal_variation_moves.call_args_list], [1])
+        self.assertEqual(self.player.last_search_info['principal_variation'], [move])
+
+    def test_timed_out_resumed_iteration_plays_the_proven_move(self):
+        state = self.play_expected_reply()
+        proven_move = find_move(state.get_possible_moves(), self.player.transposition_table.lookup(state)[3])
+
+        # Depth 1 chooses another move than the one proven on the previous move.
+        def first_iteration_only(function, args, kwargs, time_limit):
+            if args[1] > 1:
+                raise ExceededTimeError
+            (value, _), run_time = run_with_limited_time(function, args, kwargs, time_limit)
+            other = next(move for move in args[0].get_possible_moves() if move_key(move) != move_key(proven_move))
+            return (value, other), run_time
+
+        with mock.patch.object(deepening, 'run_with_limited_time', first_iteration_only):
+            move = self.get_move(state)
+        self.assertEqual(move_key(move), move_key(proven_move))
+
+
+if __name__ == '__main__':
+    unittest.main()
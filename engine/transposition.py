@@ -0,0 +1,330 @@
+# ===============================================================================
+# Imports
+# ===============================================================================
+import itertools
+import math
+from players.engine.keys import IDENTITY, position_key, canonical_key, canonical_board, \
+    transform_value, transform_move_key, SWAPS_COLORS
+from players.engine.persistent_store import PERSIST_MIN_DEPTH
+from players.engine.memory import TABLE_ENTRY_BYTES, CACHE_ENTRY_BYTES
+
+# ===============================================================================
+# Globals
+# ===============================================================================
+# How the stored value relates to the minimax value of the position.
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+# Negating a value turns a lower bound into an upper bound.
+NEGATED_FLAG = {EXACT: EXACT, LOWER_BOUND: UPPER_BOUND, UPPER_BOUND: LOWER_BOUND}
+
+TABLE_SIZE = 200000
+# When the table is full an entry loses one ply of priority for every TABLE_AGE_PENALTY moves since it was stored.
+TABLE_AGE_PENALTY = 2
+# The part of the entries dropped to make room when the table is full.
+REPLACE_FRACTION = 0.25
+EVALUATION_CACHE_SIZE = 200000
+
+
+# ===============================================================================
+# Helpers
+# ===============================================================================
+
+"""
+    Identify a move by its squares, so it can be stored without keeping the move object
+    and found again among the moves of another copy of the same position.
+
+    :return: a hashable key of the move.
+"""
+
+
+def move_key(move):
+    return move.origin_loc, move.target_loc, tuple(sorted(move.jumped_locs))
+
+
+"""
+    :return: the move in moves that has the given key, None if there is no such move.
+             A key without jumped squares matches the first move with its origin and target.
+"""
+
+
+def find_move(moves, key):
+    if key is None:
+        return None
+    for move in moves:
+        if key[2] is None:
+            if (move.origin_loc, move.target_loc) == key[:2]:
+                return move
+        elif move_key(move) == key:
+            return move
+    return None
+
+
+# ===============================================================================
+# Transposition table
+# ===============================================================================
+
+class TranspositionTable:
+    """
+        Results of searched positions, kept for the whole game so that a position searched while
+        choosing one move is not searched again from scratch while choosing the next one.
+        Every entry is (depth, flag, value, move key), where flag tells if value is the exact
+        minimax value or only a lower or upper bound of it.
+        The key has the number of turns since last jump, the value of a position depends on how
+        close it is to the draw by MAX_TURNS_NO_JUMP.
+        A result replaces the entry of its position when it is at least as deep or the entry was
+        stored while choosing an earlier move. When the table is full, the REPLACE_FRACTION of
+        the entries with the lowest depth, counting one ply less for every TABLE_AGE_PENALTY
+        moves since they were stored, is dropped to make room for the new positions.
+        new_move is expected to be called whenever the player starts choosing a move.
+
+        With symmetric=True the positions are kept under their canonical key, so a position and
+        its color swapped twin, with the board turned around, share a single entry. The value, bound and move are
+        turned into the frame of the canonical position when stored and back when probed.
+
+        A symmetric table can be backed by a players.engine.persistent_store.PersistentStore.
+        A deep position that is not in the table is looked up in the store, and save adds the
+        deep entries of the table to the store, so what was learnt in one game is used in the next.
+        The store keeps values from the point of view of the player to move, color is needed to
+        turn them into values from the point of view of the searching player.
+
+        Arguments:
+        size: the maximal number of entries.
+        symmetric: keep one entry for all the symmetric positions.
+        store: a PersistentStore or None, only for a symmetric table.
+        color: the color of the searching player, needed with a store.
+    """
+
+    def __init__(self, size=TABLE_SIZE, symmetric=False, store=None, color=None):
+        self.size = size
+        self.symmetric = symmetric
+        self.persistent_store = store
+        self.color = color
+        self.entries = {}
+        # The move every entry was stored while choosing.
+        self.generations = {}
+        self.generation = 0
+        # Keys that were already looked for in the store, forgotten when there are size of them.
+        self.loaded = set()
+        self.hits = 0
+        self.probes = 0
+
+    """
+        :return: the key of the position in the table and the symmetry that leads to it.
+    """
+
+    def key(self, state):
+        key, symmetry = canonical_key(state) if self.symmetric else (position_key(state), IDENTITY)
+        return key + (state.turns_since_last_jump,), symmetry
+
+    """
+        Start choosing a new move, the entries stored so far get older.
+    """
+
+    def new_move(self):
+        self.generation += 1
+
+    """
+        Put an entry in the table, making room for it if the table is full.
+    """
+
+    def put(self, key, entry):
+        if key not in self.entries and len(self.entries) >= self.size:
+            self.shrink(REPLACE_FRACTION)
+        self.entries[key] = entry
+        self.generations[key] = self.generation
+
+    """
+        :return: the priority of the entry to stay in the table, its depth less its age.
+    """
+
+    def priority(self, key):
+        return self.entries[key][0] - (self.generation - self.generations[key]) / TABLE_AGE_PENALTY
+
+    """
+        :return: the entry of the position in its own frame, None if it was never searched.
+                 With a store, a position that is needed to at least PERSIST_MIN_DEPTH and is not in the table
+                 to that depth is looked for in the store, once.
+    """
+
+    def lookup(self, state, depth=0):
+        key, symmetry = self.key(state)
+        entry = self.entries.get(key)
+        if self.persistent_store is not None and depth >= PERSIST_MIN_DEPTH and \
+                (entry is None or entry[0] < depth) and key not in self.loaded:
+            entry = self.load(key) or entry
+        if entry is None:
+            return None
+        return self.from_canonical(entry, symmetry)
+
+    """
+        Turn an entry of a position into an entry of its symmetric position, and back:
+        the value is negated and the bound swapped if the symmetry swaps the colors,
+        and the squares of the move are moved.
+    """
+
+    def to_canonical(self, entry, symmetry):
+        if symmetry == IDENTITY:
+            return entry
+        depth, flag, value, move = entry
+        if SWAPS_COLORS[symmetry]:
+            flag = NEGATED_FLAG[flag]
+        return depth, flag, transform_value(value, symmetry), transform_move_key(move, symmetry)
+
+    from_canonical = to_canonical
+
+    """
+        Same as lookup, counted in the hit rate of the table.
+    """
+
+    def probe(self, state, depth=0):
+        self.probes += 1
+        entry = self.lookup(state, depth)
+        if entry is not None:
+            self.hits += 1
+        return entry
+
+    """
+        Keep the result of a search of the position, unless a deeper result was already kept
+        while choosing the current move.
+    """
+
+    def store(self, state, depth, flag, value, move):
+        key, symmetry = self.key(state)
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] > depth and self.generations[key] == self.generation:
+            return
+        self.put(key, self.to_canonical((depth, flag, value, move), symmetry))
+
+    """
+        Decide what the search can learn from an entry for the window (alpha, beta).
+
+        :return: the value to return for the position, None if it has to be searched.
+    """
+
+    def cutoff(self, entry, depth, alpha, beta):
+        entry_depth, flag, value, _ = entry
+        if entry_depth < depth:
+            return None
+        if flag == EXACT:
+            return value
+        if flag == LOWER_BOUND and value >= beta:
+            return value
+        if flag == UPPER_BOUND and value <= alpha:
+            return value
+        return None
+
+    """
+        Copy an entry of the store into the table.
+
+        :return: the deeper of the entries of the table and the store in the frame of the canonical position,
+                 None if the store does not have the position.
+    """
+
+    def load(self, key):
+        if len(self.loaded) >= self.size:
+            self.loaded.clear()
+        self.loaded.add(key)
+        stored = self.persistent_store.probe(key)
+        if stored is None:
+            return None
+        depth, flag, value, move = stored
+        if key[0] != self.color:
+            flag, value = NEGATED_FLAG[flag], -value
+        old = self.entries.get(key)
+        if old is not None and old[0] >= depth:
+            return old
+        entry = (depth, flag, value, move)
+        self.put(key, entry)
+        return entry
+
+    """
+        :return: the estimated bytes of the entries, for the memory budget.
+    """
+
+    def memory_usage(self):
+        return (len(self.entries) + len(self.loaded)) * TABLE_ENTRY_BYTES
+
+    """
+        Drop the part of the entries with the lowest priority, to save memory or make room.
+
+        Arguments:
+        fraction: the part of the entries to drop.
+    """
+
+    def shrink(self, fraction):
+        self.loaded.clear()
+        drop = math.ceil(len(self.entries) * fraction)
+        kept = sorted(self.entries, key=self.priority)[drop:]
+        # New dictionaries, deleting keys does not give back the memory of the old ones.
+        self.entries = {key: self.entries[key] for key in kept}
+        self.generations = {key: self.generations[key] for key in kept}
+
+    """
+        Add the entries searched to at least PERSIST_MIN_DEPTH to the store.
+    """
+
+    def save(self):
+        if self.persistent_store is None:
+            return
+        entries = []
+        for key, (depth, flag, value, move) in self.entries.items():
+            if depth < PERSIST_MIN_DEPTH:
+                continue
+            if key[0] != self.color:
+                flag, value = NEGATED_FLAG[flag], -value
+            entries.append((key, depth, flag, value, move))
+        try:
+            self.persistent_store.merge(entries)
+        except OSError as error:
+            print('could not save the search results: {}'.format(error))
+
+    def __len__(self):
+        return len(self.entries)
+
+
+# ===============================================================================
+# Evaluation cache
+# ===============================================================================
+
+class EvaluationCache:
+    """
+        Remember the utility of boards, one entry for a board and all its symmetric boards.
+        The utility only reads the board, so the player to move is not part of the key.
+        When the cache is full it is emptied.
+
+        Arguments:
+        utility: the evaluation function of the player.
+        size: the maximal number of entries.
+    """
+
+    def __init__(self, utility, size=EVALUATION_CACHE_SIZE):
+        self.utility = utility
+        self.size = size
+        self.values = {}
+        self.hits = 0
+        self.calls = 0
+
+    def __call__(self, state):
+        self.calls += 1
+        key, symmetry = canonical_board(state.board)
+        value = self.values.get(key)
+        if value is not None:
+            self.hits += 1
+            return transform_value(value, symmetry)
+        value = self.utility(state)
+        if len(self.values) >= self.size:
+            self.values.clear()
+        self.values[key] = transform_value(value, symmetry)
+        return value
+
+    def memory_usage(self):
+        return len(self.values) * CACHE_ENTRY_BYTES
+
+    """
+        Drop the oldest part of the entries to save memory.
+    """
+
+    def shrink(self, fraction):
+        drop = math.ceil(len(self.values) * fraction)
+        self.values = dict(itertools.islice(self.values.items(), drop, None))